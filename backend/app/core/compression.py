@@ -0,0 +1,115 @@
+"""Response compression for JSON payloads (gzip, or Brotli when installed).
+
+Only complete `application/json` bodies are compressed. Streaming responses
+(SSE, NDJSON/CSV exports) pass through untouched, so they are never buffered.
+A compressed body is a different representation, so its ETag gets the
+encoding as a suffix (`"<tag>-gzip"`); conditional_get accepts both forms.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Bodies at least this large are compressed in the threadpool, not on the event loop
+THREADPOOL_MIN_SIZE = 64 * 1024
+ENCODINGS = ("br", "gzip")
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Tag the ETag of a compressed body with its content-coding."""
+    weak, _, tag = etag.rpartition('"')[0].partition('"')
+    return f'{weak}"{tag}-{encoding}"'
+
+
+def _accepted_encoding(accept_encoding: str):
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Compress JSON responses of at least `minimum_size` bytes.
+
+    Args:
+        app: ASGI app to wrap
+        minimum_size: Smaller bodies are sent as-is
+        gzip_level: gzip compression level (1-9)
+        brotli_quality: Brotli quality (0-11); low values favour latency
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _accepted_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message = {}
+        body_parts = []
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                passthrough = (
+                    not headers.get("content-type", "").startswith("application/json")
+                    or "content-encoding" in headers
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(body_parts)
+            headers = MutableHeaders(raw=start_message["headers"])
+            if len(body) >= self.minimum_size:
+                if len(body) >= THREADPOOL_MIN_SIZE:
+                    body = await run_in_threadpool(self._compress, body, encoding)
+                else:
+                    body = self._compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["etag"], encoding)
+            headers["Content-Length"] = str(len(body))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,50 @@
+"""Settings read from environment variables (see `.env.example`)."""
+import os
+from dataclasses import dataclass
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def env_str(name: str, default: str) -> str:
+    value = os.getenv(name)
+    return value if value not in (None, "") else default
+
+
+@dataclass(frozen=True)
+class StorageSettings:
+    """Database URL, SQLite PRAGMA profile and connection pool sizing."""
+    database_url: str
+    journal_mode: str  # WAL lets readers run while the planner writes
+    synchronous: str  # NORMAL is durable enough with WAL and much faster than FULL
+    mmap_size: int  # bytes of the DB file mapped into memory
+    cache_size: int  # page cache; negative values are KiB
+    busy_timeout_ms: int  # wait this long for a lock instead of failing
+    temp_store: str
+    pool_size: int
+    max_overflow: int
+    read_pool_size: int
+    read_max_overflow: int
+
+
+def get_storage_settings() -> StorageSettings:
+    return StorageSettings(
+        database_url=env_str("DATABASE_URL", "sqlite:///./hackathon.db"),
+        journal_mode=env_str("SQLITE_JOURNAL_MODE", "WAL"),
+        synchronous=env_str("SQLITE_SYNCHRONOUS", "NORMAL"),
+        mmap_size=env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+        cache_size=env_int("SQLITE_CACHE_SIZE", -64 * 1024),
+        busy_timeout_ms=env_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+        temp_store=env_str("SQLITE_TEMP_STORE", "MEMORY"),
+        pool_size=env_int("DB_POOL_SIZE", 5),
+        max_overflow=env_int("DB_MAX_OVERFLOW", 5),
+        read_pool_size=env_int("DB_READ_POOL_SIZE", 10),
+        read_max_overflow=env_int("DB_READ_MAX_OVERFLOW", 10),
+    )
@@ -1,12 +1,91 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./hackathon.db"
+from app.core.config import get_storage_settings
+
+storage = get_storage_settings()
+
+SQLALCHEMY_DATABASE_URL = storage.database_url
+
+# asyncio driver per backend, used by the async read engine
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite"}
+
+
+def _async_url(database_url: str) -> URL:
+    """Same database URL with the backend's asyncio driver."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(
+            f"DATABASE_URL backend '{backend}' has no async driver configured "
+            f"(supported: {', '.join(_ASYNC_DRIVERS)})"
+        )
+    return url.set(drivername=_ASYNC_DRIVERS[backend])
+
+
+ASYNC_DATABASE_URL = _async_url(SQLALCHEMY_DATABASE_URL)
+
+
+def _apply_sqlite_profile(engine, read_only: bool = False):
+    """Apply the configured PRAGMAs to every new SQLite connection of an engine."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {int(storage.busy_timeout_ms)}")
+        if not read_only:
+            # Persistent setting of the database file; only writers switch it
+            cursor.execute(f"PRAGMA journal_mode = {storage.journal_mode}")
+        cursor.execute(f"PRAGMA synchronous = {storage.synchronous}")
+        cursor.execute(f"PRAGMA mmap_size = {int(storage.mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size = {int(storage.cache_size)}")
+        cursor.execute(f"PRAGMA temp_store = {storage.temp_store}")
+        if read_only:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+
+def _connect_args():
+    if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+        return {"check_same_thread": False, "timeout": storage.busy_timeout_ms / 1000}
+    return {}
+
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args=_connect_args(),
+    pool_size=storage.pool_size,
+    max_overflow=storage.max_overflow,
 )
+_apply_sqlite_profile(engine)
+
+# Separate pool for GET routes: read-only connections that never take the
+# write lock, so with WAL they proceed while the planner commits
+read_engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args=_connect_args(),
+    pool_size=storage.read_pool_size,
+    max_overflow=storage.read_max_overflow,
+)
+_apply_sqlite_profile(read_engine, read_only=True)
+
+# Async read engine for the hot list/detail routes: requests wait on the
+# event loop instead of occupying a threadpool worker
+async_read_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=_connect_args(),
+    pool_size=storage.read_pool_size,
+    max_overflow=storage.read_max_overflow,
+)
+_apply_sqlite_profile(async_read_engine.sync_engine, read_only=True)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
@@ -16,3 +95,14 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,204 @@
+"""Small versioned schema migration runner.
+
+`Base.metadata.create_all` only creates missing tables; it never changes
+existing ones. Schema changes for existing databases are therefore listed
+here as numbered migrations, applied once each at startup and recorded in
+the `schema_migrations` table. Migrations must be idempotent, because a
+freshly created database already has the current schema.
+"""
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.database import Base
+
+_migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    _migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def _add_column_if_missing(conn: Connection, table: str, column: str, ddl: str) -> None:
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column not in existing:
+        conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl}'))
+
+
+def _add_pinned_flags(conn: Connection) -> None:
+    _add_column_if_missing(conn, "worker__job", "pinned", "BOOLEAN NOT NULL DEFAULT 0")
+    _add_column_if_missing(conn, "job__stock", "pinned", "BOOLEAN NOT NULL DEFAULT 0")
+
+
+def _create_declared_indexes(conn: Connection) -> None:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+# R*Tree indexes over job and branch coordinates (see app/services/geo_index.py).
+# The rtree id is the rowid of the indexed row; triggers keep both in sync.
+GEO_INDEXED_TABLES = ("job", "branch")
+
+
+def _create_geo_index(conn: Connection) -> None:
+    if conn.dialect.name != "sqlite":
+        return
+    for table in GEO_INDEXED_TABLES:
+        rtree = f"{table}_rtree"
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {rtree} USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+        ))
+        has_coords = "new.latitude IS NOT NULL AND new.longitude IS NOT NULL"
+        insert_new = (f"INSERT INTO {rtree} VALUES "
+                      f"(new.rowid, new.latitude, new.latitude, new.longitude, new.longitude)")
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {rtree}_insert AFTER INSERT ON {table} "
+            f"WHEN {has_coords} BEGIN {insert_new}; END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {rtree}_update AFTER UPDATE OF latitude, longitude ON {table} "
+            f"BEGIN DELETE FROM {rtree} WHERE id = old.rowid; "
+            f"INSERT INTO {rtree} SELECT new.rowid, new.latitude, new.latitude, new.longitude, new.longitude "
+            f"WHERE {has_coords}; END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {rtree}_delete AFTER DELETE ON {table} "
+            f"BEGIN DELETE FROM {rtree} WHERE id = old.rowid; END"
+        ))
+    rebuild_geo_index(conn)
+
+
+def rebuild_geo_index(conn: Connection) -> None:
+    """
+    Repopulate the R*Tree tables from the base tables.
+
+    Needed after a VACUUM, which may renumber the rowids the index refers to.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    for table in GEO_INDEXED_TABLES:
+        rtree = f"{table}_rtree"
+        conn.execute(text(f"DELETE FROM {rtree}"))
+        conn.execute(text(
+            f"INSERT INTO {rtree} SELECT rowid, latitude, latitude, longitude, longitude FROM {table} "
+            f"WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        ))
+
+
+# Denormalized per-worker schedule (see app/services/worker_schedule.py): one
+# row per worker assignment with the job fields a calendar shows. Triggers
+# on worker__job, job and worker keep it in sync with every write path.
+SCHEDULE_JOB_COLUMNS = (
+    "start_datetime", "end_datetime", "job_name", "city", "street",
+    "house_number", "postal_code", "latitude", "longitude",
+)
+
+
+def _create_worker_schedule(conn: Connection) -> None:
+    if conn.dialect.name != "sqlite":
+        return
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS worker_schedule ("
+        "worker_id VARCHAR(36) NOT NULL, job_id VARCHAR(36) NOT NULL, "
+        "start_datetime DATETIME, end_datetime DATETIME, job_name VARCHAR, city VARCHAR, street VARCHAR, "
+        "house_number VARCHAR, postal_code VARCHAR, latitude FLOAT, longitude FLOAT, "
+        "pinned BOOLEAN NOT NULL DEFAULT 0, "
+        "UNIQUE (worker_id, job_id))"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_worker_schedule_worker_start ON worker_schedule (worker_id, start_datetime, job_id)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_worker_schedule_job ON worker_schedule (job_id)"
+    ))
+
+    job_columns = ", ".join(SCHEDULE_JOB_COLUMNS)
+    job_values = ", ".join(f"j.{column}" for column in SCHEDULE_JOB_COLUMNS)
+    insert_new = (f"INSERT OR REPLACE INTO worker_schedule (worker_id, job_id, {job_columns}, pinned) "
+                  f"SELECT new.worker_id, new.job_id, {job_values}, new.pinned FROM job j WHERE j.job_id = new.job_id")
+    delete_old = "DELETE FROM worker_schedule WHERE worker_id = old.worker_id AND job_id = old.job_id"
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS worker_schedule_assign AFTER INSERT ON worker__job "
+        f"BEGIN {insert_new}; END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS worker_schedule_reassign AFTER UPDATE ON worker__job "
+        f"BEGIN {delete_old}; {insert_new}; END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS worker_schedule_unassign AFTER DELETE ON worker__job "
+        f"BEGIN {delete_old}; END"
+    ))
+    set_columns = ", ".join(f"{column} = new.{column}" for column in SCHEDULE_JOB_COLUMNS)
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS worker_schedule_job_update AFTER UPDATE OF {job_columns} ON job "
+        f"BEGIN UPDATE worker_schedule SET {set_columns} WHERE job_id = new.job_id; END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS worker_schedule_job_delete AFTER DELETE ON job "
+        "BEGIN DELETE FROM worker_schedule WHERE job_id = old.job_id; END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS worker_schedule_worker_delete AFTER DELETE ON worker "
+        "BEGIN DELETE FROM worker_schedule WHERE worker_id = old.worker_id; END"
+    ))
+    rebuild_worker_schedule(conn)
+
+
+def rebuild_worker_schedule(conn: Connection) -> None:
+    """Repopulate worker_schedule from worker__job and job."""
+    if conn.dialect.name != "sqlite":
+        return
+    job_columns = ", ".join(SCHEDULE_JOB_COLUMNS)
+    job_values = ", ".join(f"j.{column}" for column in SCHEDULE_JOB_COLUMNS)
+    conn.execute(text("DELETE FROM worker_schedule"))
+    conn.execute(text(
+        f"INSERT INTO worker_schedule (worker_id, job_id, {job_columns}, pinned) "
+        f"SELECT wj.worker_id, wj.job_id, {job_values}, wj.pinned "
+        f"FROM worker__job wj JOIN job j ON j.job_id = wj.job_id"
+    ))
+
+
+# (version, description, upgrade function) in ascending version order
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "pinned flag on worker__job and job__stock", _add_pinned_flags),
+    (2, "indexes for hot query paths", _create_declared_indexes),
+    (3, "index on job.city for filtered job lists", _create_declared_indexes),
+    (4, "R*Tree geo index on job and branch coordinates", _create_geo_index),
+    (5, "materialized per-worker schedule", _create_worker_schedule),
+]
+
+
+def run_migrations(engine: Engine, verbose: bool = True) -> List[int]:
+    """
+    Apply all migrations newer than the recorded schema version.
+
+    Each migration runs in its own transaction together with its version record.
+
+    Returns:
+        Versions that were applied
+    """
+    _migration_metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        applied = {row.version for row in conn.execute(schema_migrations.select())}
+
+    newly_applied = []
+    for version, description, upgrade in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=version, description=description, applied_at=datetime.now()
+            ))
+        newly_applied.append(version)
+        if verbose:
+            print(f"Applied migration {version}: {description}")
+    return newly_applied
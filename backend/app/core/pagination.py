@@ -0,0 +1,61 @@
+"""Cursor-based (keyset) pagination helpers for list endpoints.
+
+A cursor encodes the sort key of the last row of a page. The next page
+continues with rows sorted after that key, which an index can seek to
+directly, instead of counting past `skip` rows like OFFSET does.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor holding `size` key values; invalid cursors are a 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def page_size(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def finish_page(response: Response, rows: Sequence, limit: int, *cursor_of) -> List:
+    """
+    Trim a result fetched with `limit + 1` rows to `limit` and set the next-cursor header.
+
+    Args:
+        response: Response to set the header on
+        rows: Rows of the page plus (possibly) one look-ahead row
+        limit: Page size
+        cursor_of: Functions that extract the sort key values from a row
+    """
+    rows = list(rows)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*(key(last) for key in cursor_of))
+    return rows
+
+
+def optional_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Cursor values are JSON; datetimes travel as ISO strings."""
+    return datetime.fromisoformat(value) if value is not None else None
@@ -0,0 +1,37 @@
+"""Fast JSON encoding for large responses.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise; both produce the same JSON as pydantic for plain dicts of
+str/int/float/bool/None/datetime values.
+"""
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode plain Python data (dicts, lists, scalars, datetimes) as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response for content that is already plain data (no pydantic models)."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
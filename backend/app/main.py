@@ -1,27 +1,50 @@
 import os
-from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+from sqlalchemy import inspect, select
 
 load_dotenv()
 
 from app.core.database import engine, Base
+from app.core.compression import CompressionMiddleware
+from app.core.config import env_int
+from app.core.migrations import run_migrations
+from app.core.pagination import NEXT_CURSOR_HEADER
 import app.models.models  # Import models to register them with Base
+from app.models.models import Branch
 
-# Check if database exists, if not initialize and seed it
-DB_PATH = Path(__file__).parent.parent / "hackathon.db"
-if not DB_PATH.exists():
-    print("Database not found. Initializing database...")
-    from seed.seed import seed_database
+# Check if the configured database (DATABASE_URL) is empty, if so initialize
+# and seed it. Seeding runs a full planner solve; with SEED_ON_STARTUP=0 the
+# tables are only created and seeding is left to `python init_db.py`.
+SEED_ON_STARTUP = env_int("SEED_ON_STARTUP", 1)
+
+
+def _database_is_empty() -> bool:
+    """True for a new database or one whose tables were never filled."""
+    if not inspect(engine).has_table(Branch.__tablename__):
+        return True
+    with engine.connect() as conn:
+        return conn.execute(select(Branch.branch_id).limit(1)).first() is None
+
+
+if _database_is_empty():
+    print("Database is empty. Initializing database...")
     Base.metadata.create_all(bind=engine)
-    print("Database tables created. Seeding data...")
-    seed_database()
-    print("Database initialization complete!")
+    if SEED_ON_STARTUP:
+        from seed.seed import seed_database
+        print("Database tables created. Seeding data...")
+        seed_database()
+        print("Database initialization complete!")
+    else:
+        print("Database tables created. Run `python init_db.py` to seed data.")
 else:
     # Ensure tables exist (in case schema changed)
     Base.metadata.create_all(bind=engine)
 
+# Bring existing databases up to the current schema (columns, indexes)
+run_migrations(engine)
+
 app = FastAPI()
 
 # CORS
@@ -36,19 +59,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# gzip/Brotli for JSON bodies above this size
+app.add_middleware(CompressionMiddleware, minimum_size=env_int("COMPRESSION_MIN_BYTES", 1024))
+
+
+
+@app.get("/health", tags=["health"])
+def health():
+    """Readiness probe: answers as soon as the app is up (no database access)."""
+    return {"status": "ok"}
+
+
 # Register routers
+# The solver (OR-Tools) and LLM (google-genai) stacks are imported on first
+# use, not here; see `python startup_report.py`
 from app.routers import jobs as jobs_router
 from app.routers import workers as workers_router
 from app.routers import items as items_router
 from app.routers import roles as roles_router
 from app.routers import planner_test as planner_test_router # for testing planner
+from app.routers import planner as planner_router
 from app.routers import ask as ask_router
+from app.routers import geo as geo_router
+from app.routers import export as export_router
+from app.routers import dashboard as dashboard_router
 
 app.include_router(jobs_router.router)
 app.include_router(workers_router.router)
 app.include_router(items_router.router)
 app.include_router(roles_router.router)
 app.include_router(planner_test_router.router) # for testing planner
+app.include_router(planner_router.router)
 app.include_router(ask_router.router)
+app.include_router(geo_router.router)
+app.include_router(export_router.router)
+app.include_router(dashboard_router.router)
@@ -8,6 +8,8 @@ from sqlalchemy import (
     DateTime,
     Integer,
     Text,
+    Boolean,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -23,6 +25,10 @@ worker__job = Table(
     Base.metadata,
     Column("worker_id", String(36), ForeignKey("worker.worker_id"), primary_key=True),
     Column("job_id", String(36), ForeignKey("job.job_id"), primary_key=True),
+    # Pinned rows are set by a dispatcher and kept fixed by the planner
+    Column("pinned", Boolean, nullable=False, default=False, server_default="0"),
+    # The primary key covers lookups by worker; this one covers lookups by job
+    Index("ix_worker__job_job_id", "job_id"),
 )
 
 worker__role = Table(
@@ -30,6 +36,7 @@ worker__role = Table(
     Base.metadata,
     Column("worker_id", String(36), ForeignKey("worker.worker_id"), primary_key=True),
     Column("role_id", String(36), ForeignKey("role.role_id"), primary_key=True),
+    Index("ix_worker__role_role_id", "role_id"),
 )
 
 job__role = Table(
@@ -38,12 +45,16 @@ job__role = Table(
     Column("job_id", String(36), ForeignKey("job.job_id"), primary_key=True),
     Column("role_id", String(36), ForeignKey("role.role_id"), primary_key=True),
     Column("required_quantity", Integer, nullable=True),
+    Index("ix_job__role_role_id", "role_id"),
 )
 
 
 # Association object for job-item with quantity
 class JobItem(Base):
     __tablename__ = "job__item"
+    __table_args__ = (
+        Index("ix_job__item_item_id", "item_id"),
+    )
     
     job_id = Column(String(36), ForeignKey("job.job_id"), primary_key=True)
     item_id = Column(String(36), ForeignKey("item.item_id"), primary_key=True)
@@ -60,6 +71,8 @@ job__stock = Table(
     Column("job_id", String(36), ForeignKey("job.job_id"), primary_key=True),
     Column("stock_id", String(36), ForeignKey("stock.stock_id"), primary_key=True),
     Column("assigned_quantity", Integer, nullable=True),
+    Column("pinned", Boolean, nullable=False, default=False, server_default="0"),
+    Index("ix_job__stock_stock_id", "stock_id"),
 )
 
 
@@ -88,7 +101,7 @@ class Worker(Base):
     worker_first_name = Column(String, nullable=True)
     worker_last_name = Column(String, nullable=True)
     worker_phone_number = Column(String, nullable=True)
-    fk_branch_id = Column(String(36), ForeignKey("branch.branch_id"), nullable=True)
+    fk_branch_id = Column(String(36), ForeignKey("branch.branch_id"), nullable=True, index=True)
 
     branch = relationship("Branch", back_populates="workers")
     jobs = relationship("Job", secondary=worker__job, back_populates="workers")
@@ -127,12 +140,12 @@ class Job(Base):
     longitude = Column(Float, nullable=True)
     latitude = Column(Float, nullable=True)
     country = Column(String, nullable=True)
-    city = Column(String, nullable=True)
+    city = Column(String, nullable=True, index=True)
     house_number = Column(String, nullable=True)
     street = Column(String, nullable=True)
     postal_code = Column(String, nullable=True)
-    start_datetime = Column(DateTime, nullable=True)
-    end_datetime = Column(DateTime, nullable=True)
+    start_datetime = Column(DateTime, nullable=True, index=True)
+    end_datetime = Column(DateTime, nullable=True, index=True)
 
     workers = relationship("Worker", secondary=worker__job, back_populates="jobs")
     item_links = relationship("JobItem", back_populates="job", cascade="all, delete-orphan")
@@ -145,8 +158,8 @@ class Stock(Base):
 
     stock_id = Column(String(36), primary_key=True, default=generate_uuid)
     quantity = Column(Integer, nullable=False, default=0)
-    fk_branch_id = Column(String(36), ForeignKey("branch.branch_id"), nullable=False)
-    fk_item_id = Column(String(36), ForeignKey("item.item_id"), nullable=False)
+    fk_branch_id = Column(String(36), ForeignKey("branch.branch_id"), nullable=False, index=True)
+    fk_item_id = Column(String(36), ForeignKey("item.item_id"), nullable=False, index=True)
 
     branch = relationship("Branch", back_populates="stocks")
     item = relationship("Item", back_populates="stocks")
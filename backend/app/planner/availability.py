@@ -0,0 +1,95 @@
+"""Worker availability as packed bit arrays over fixed time slots.
+
+Each worker has one row of bits over the horizon, one bit per slot
+(15 minutes by default); a set bit means busy. Busy intervals are widened
+to whole slots, so a query never reports a worker free who is not, but may
+report one busy who is free for part of a slot.
+
+"Who is free between A and B" is then a single vectorized AND of every row
+with a window mask.
+"""
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .util import naive_utc
+
+SLOT_MINUTES = 15
+
+
+class AvailabilityIndex:
+    """
+    Busy slots per worker between `horizon_start` and `horizon_end`.
+
+    Args:
+        worker_ids: Workers covered by the index (row order)
+        intervals: (worker_id, start, end) busy intervals; unknown workers and
+            intervals without times are ignored
+        horizon_start, horizon_end: Time range covered by the bits
+        slot_minutes: Slot granularity
+    """
+
+    def __init__(self, worker_ids: Iterable[str], intervals: Iterable[Tuple[str, datetime, datetime]],
+                 horizon_start: datetime, horizon_end: datetime, slot_minutes: int = SLOT_MINUTES):
+        self.slot = timedelta(minutes=slot_minutes)
+        # All index math is on naive times, like the stored job times
+        horizon_start, horizon_end = naive_utc(horizon_start), naive_utc(horizon_end)
+        self.horizon_start = horizon_start
+        self.slots = max(1, math.ceil((horizon_end - horizon_start) / self.slot))
+        self.horizon_end = horizon_start + self.slots * self.slot
+        self.worker_ids: List[str] = list(worker_ids)
+        self.rows: Dict[str, int] = {worker_id: row for row, worker_id in enumerate(self.worker_ids)}
+
+        busy = np.zeros((len(self.worker_ids), self.slots), dtype=bool)
+        for worker_id, start, end in intervals:
+            row = self.rows.get(worker_id)
+            if row is None or start is None or end is None:
+                continue
+            first, last = self._slot_range(start, end)
+            if first < last:
+                busy[row, first:last] = True
+        self._bits = np.packbits(busy, axis=1)
+
+    def _slot_range(self, start: datetime, end: datetime) -> Tuple[int, int]:
+        """Slots touched by [start, end), clipped to the horizon."""
+        start, end = naive_utc(start), naive_utc(end)
+        first = math.floor((start - self.horizon_start) / self.slot)
+        last = math.ceil((end - self.horizon_start) / self.slot)
+        return max(first, 0), min(last, self.slots)
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        """True if [start, end) lies within the horizon."""
+        start, end = naive_utc(start), naive_utc(end)
+        return self.horizon_start <= start and end <= self.horizon_end
+
+    def busy_mask(self, start: datetime, end: datetime) -> np.ndarray:
+        """Boolean array (one entry per worker, in `worker_ids` order): busy at some point of the window."""
+        first, last = self._slot_range(start, end)
+        if first >= last or not len(self.worker_ids):
+            return np.zeros(len(self.worker_ids), dtype=bool)
+        window = np.zeros(self.slots, dtype=bool)
+        window[first:last] = True
+        return np.bitwise_and(self._bits, np.packbits(window)).any(axis=1)
+
+    def free_workers(self, start: datetime, end: datetime,
+                     candidates: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Workers without busy slots in [start, end).
+
+        Args:
+            candidates: Optional boolean mask over `worker_ids` to restrict the result
+        """
+        free = ~self.busy_mask(start, end)
+        if candidates is not None:
+            free &= candidates
+        return [self.worker_ids[row] for row in np.flatnonzero(free)]
+
+    def is_free(self, worker_id: str, start: datetime, end: datetime) -> bool:
+        row = self.rows.get(worker_id)
+        return row is None or not self.busy_mask(start, end)[row]
+
+    @property
+    def nbytes(self) -> int:
+        return self._bits.nbytes
@@ -0,0 +1,91 @@
+"""Job conflict graph: pairs of jobs a single worker cannot both do."""
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from .models import Job
+from .util import haversine_distances
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _max_distance_km(lats: np.ndarray, lons: np.ndarray) -> float:
+    """
+    Upper bound for the great circle distance between any two of the points.
+
+    Any pair is joined by an east-west leg along a parallel plus a north-south
+    leg along a meridian. The east-west leg is longest on the parallel closest
+    to the equator within the latitude range, and the longitude difference
+    never exceeds 180 degrees; no great circle is longer than half the globe.
+    """
+    lat_min, lat_max = np.radians(lats.min()), np.radians(lats.max())
+    widest = 0.0 if lat_min <= 0.0 <= lat_max else min(abs(lat_min), abs(lat_max))
+    lon_span = min(np.radians(lons.max() - lons.min()), np.pi)
+    bound = EARTH_RADIUS_KM * (np.cos(widest) * lon_span + (lat_max - lat_min))
+    return float(min(bound, np.pi * EARTH_RADIUS_KM))
+
+
+def build_conflict_pairs(jobs: List[Job], avg_speed_kmh: float = 50.0) -> List[Tuple[int, int]]:
+    """
+    Find all pairs of jobs that cannot be done by the same worker.
+
+    Two jobs conflict if their time windows overlap, or if the gap between
+    them is shorter than the travel time from one job site to the other.
+
+    Jobs are sorted by start time and swept once. Since no trip takes longer
+    than the travel time across the bounding box of all job sites
+    (see `_max_distance_km`), only jobs
+    starting before `end + max_travel` of the current job can conflict with
+    it. Travel times for that window are computed in one vectorized row of
+    the job-to-job travel-time matrix. The result is independent of workers,
+    so it is computed once and shared by all of them.
+
+    Args:
+        jobs: Jobs to check (jobs without start/end time never conflict)
+        avg_speed_kmh: Average travel speed
+
+    Returns:
+        List of (j1_idx, j2_idx) index pairs into `jobs`, with j1_idx < j2_idx
+    """
+    timed = [
+        idx for idx, job in enumerate(jobs)
+        if job.start_datetime is not None and job.end_datetime is not None
+    ]
+    if len(timed) < 2:
+        return []
+
+    index = np.array(timed)
+    starts = np.array([jobs[i].start_datetime.timestamp() for i in timed]) / 3600.0
+    ends = np.array([jobs[i].end_datetime.timestamp() for i in timed]) / 3600.0
+    lats = np.array([jobs[i].latitude for i in timed], dtype=float)
+    lons = np.array([jobs[i].longitude for i in timed], dtype=float)
+
+    order = np.argsort(starts, kind="stable")
+    index, starts, ends, lats, lons = index[order], starts[order], ends[order], lats[order], lons[order]
+
+    max_travel_hours = _max_distance_km(lats, lons) / avg_speed_kmh
+
+    pairs = []
+    for a in range(len(index) - 1):
+        # Later-starting jobs beyond this bound are always reachable in time
+        stop = np.searchsorted(starts, ends[a] + max_travel_hours, side="left")
+        if stop <= a + 1:
+            continue
+        window = slice(a + 1, stop)
+        travel = haversine_distances(lats[a], lons[a], lats[window], lons[window]) / avg_speed_kmh
+        # Feasible if either job can be finished with enough time to reach the other
+        a_then_b = ends[a] + travel <= starts[window]
+        b_then_a = ends[window] + travel <= starts[a]
+        for b in np.nonzero(~(a_then_b | b_then_a))[0] + a + 1:
+            j1, j2 = int(index[a]), int(index[b])
+            pairs.append((min(j1, j2), max(j1, j2)))
+    return pairs
+
+
+def conflicts_by_job(pairs: List[Tuple[int, int]]) -> Dict[int, Set[int]]:
+    """Adjacency view of the conflict pairs: job index -> conflicting job indices."""
+    adjacency: Dict[int, Set[int]] = {}
+    for j1, j2 in pairs:
+        adjacency.setdefault(j1, set()).add(j2)
+        adjacency.setdefault(j2, set()).add(j1)
+    return adjacency
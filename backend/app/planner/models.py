@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Dict, List, Optional
 
@@ -42,6 +42,8 @@ class Job:
     end_datetime: datetime
     required_roles: Dict[str, int]  # {role_id: quantity}
     required_items: Dict[str, int]  # {item_id: quantity}
+    pinned_workers: List[str] = field(default_factory=list)  # fixed by a dispatcher
+    pinned_stocks: Dict[str, int] = field(default_factory=dict)  # {stock_id: quantity}, fixed by a dispatcher
 
 
 @dataclass
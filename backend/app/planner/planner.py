@@ -1,37 +1,105 @@
+import threading
 from collections import defaultdict
 from datetime import timedelta
-from typing import Dict, List, Tuple, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple, Optional
 
-from ortools.sat.python import cp_model
+import numpy as np
 
+from .availability import AvailabilityIndex
+from .conflicts import build_conflict_pairs, conflicts_by_job
 from .models import PlannerInput, Job, Worker, Stock
-from .util import (
-    haversine_distance,
-    calculate_travel_time,
-    time_intervals_overlap,
-    fits_in_8hour_shift
-)
+from .util import haversine_distance
+
+if TYPE_CHECKING:
+    from ortools.sat.python import cp_model
 
 # Global cache for previous solution (warm start)
 _previous_solution: Optional[Dict] = None
 
 
+def _cp_model():
+    """OR-Tools CP-SAT, imported on the first solve (it also pulls in pandas
+    and takes several hundred ms, which would otherwise delay app startup)."""
+    from ortools.sat.python import cp_model
+    return cp_model
+
+
+@lru_cache(maxsize=None)
+def _incumbent_callback_class():
+    """The solution callback class; it subclasses an OR-Tools type, so it is defined on first use."""
+
+    class _IncumbentCallback(_cp_model().CpSolverSolutionCallback):
+        """Forwards every improving solution found by CP-SAT to a plain callable."""
+
+        def __init__(self, extract: Callable[[Callable], Dict],
+                     on_solution: Callable[[Dict], None]):
+            super().__init__()
+            self._extract = extract
+            self._on_solution = on_solution
+            self.solution_count = 0
+
+        def on_solution_callback(self):
+            self.solution_count += 1
+            incumbent = {
+                "jobs": self._extract(self.Value),
+                "objective": self.ObjectiveValue(),
+                "best_bound": self.BestObjectiveBound(),
+                "wall_time": self.WallTime(),
+                "solution_index": self.solution_count
+            }
+            try:
+                self._on_solution(incumbent)
+            except Exception as e:
+                # Never let a subscriber error abort the search
+                print(f"Planner solution callback error: {e}")
+
+    return _IncumbentCallback
+
+
+def _stop_when_set(solver: "cp_model.CpSolver", stop_event: threading.Event, finished: threading.Event):
+    """Watcher thread: stop the search once `stop_event` is set (until the solve has finished)."""
+    while not finished.is_set():
+        if stop_event.wait(0.1):
+            solver.StopSearch()
+            return
+
+
 def compute_plan(planner_input: PlannerInput, 
-                max_time_seconds: float = 5.0) -> Dict:
+                max_time_seconds: float = 5.0,
+                on_solution: Optional[Callable[[Dict], None]] = None,
+                hints: Optional[Dict] = None,
+                stop_event: Optional[threading.Event] = None,
+                availability: Optional[AvailabilityIndex] = None) -> Dict:
     """
     Compute optimal worker and stock assignments to jobs using OR-Tools CP-SAT solver.
     
     Constraints:
     - Workers must have the required roles for a job
-    - Workers can only work one job at a time (no overlapping schedules)
+    - Workers can only work one job at a time (no overlapping schedules), and
+      need enough time between consecutive jobs to travel from one to the next
     - Workers must return to their branch within 8 hours
     - Workers must be able to reach the job in time
     - Stock items can only be assigned once (availability constraint)
     - Stock must have sufficient quantity for job requirements
+    - Pinned worker/stock assignments (Job.pinned_*) are kept as constants
     
     Args:
         planner_input: Input data containing jobs, workers, stocks, and branches
         max_time_seconds: Maximum solver time in seconds
+        on_solution: Optional callback invoked with every improving incumbent
+            ({"jobs", "objective", "best_bound", "wall_time", "solution_index"}).
+            Called from the solver thread, so it must be quick and thread-safe.
+        hints: Optional solution hints in warm-start format. When given they are
+            used instead of the previous solution, and the warm-start cache is
+            left untouched (for what-if runs that must not affect real planning).
+        stop_event: Optional event to cancel the run. Setting it stops the
+            search (StopSearch); the result then has status "CANCELLED" and
+            the warm-start cache is left untouched.
+        availability: Optional busy slots of the workers from commitments
+            outside this plan (e.g. jobs that keep their assignments while
+            only a few others are re-planned). Workers busy during a job
+            are not considered for it.
     
     Returns:
         Dictionary with structure:
@@ -47,6 +115,7 @@ def compute_plan(planner_input: PlannerInput,
         }
     """
     global _previous_solution
+    cp_model = _cp_model()
     
     jobs = planner_input.jobs
     workers = planner_input.workers
@@ -82,20 +151,53 @@ def compute_plan(planner_input: PlannerInput,
                 )
                 stock_job_distances[(s_idx, j_idx)] = dist
     
-    # Pre-compute job time intervals
-    job_intervals = {j_idx: (job.start_datetime, job.end_datetime) for j_idx, job in enumerate(jobs)}
-    
     # Pre-compute worker roles lookup
     worker_roles = {w_idx: set(worker.roles) for w_idx, worker in enumerate(workers)}
     
-    # Pre-compute stock-item mapping
-    stock_items = {s_idx: stock.item_id for s_idx, stock in enumerate(stocks)}
-    
     # Create CP-SAT model
     model = cp_model.CpModel()
     
     # === Variables ===
     
+    # Pinned (dispatcher-fixed) assignments become constants
+    worker_index = {worker.worker_id: w_idx for w_idx, worker in enumerate(workers)}
+    stock_index = {stock.stock_id: s_idx for s_idx, stock in enumerate(stocks)}
+    pinned_worker_jobs = set()
+    pinned_stock_jobs = {}
+    for j_idx, job in enumerate(jobs):
+        for worker_id in job.pinned_workers:
+            if worker_id in worker_index:
+                pinned_worker_jobs.add((worker_index[worker_id], j_idx))
+        for stock_id, qty in job.pinned_stocks.items():
+            if stock_id in stock_index and qty > 0:
+                pinned_stock_jobs[(stock_index[stock_id], j_idx)] = qty
+    
+    # Pairs of jobs no single worker can do (overlapping, or too little time
+    # to travel between them); shared by all workers
+    conflict_pairs = build_conflict_pairs(jobs)
+    job_conflicts = conflicts_by_job(conflict_pairs)
+    
+    # A pinned worker cannot take any job conflicting with the pinned one,
+    # so those candidates are pruned before any variable is created
+    pruned_worker_jobs = set()
+    for (w_idx, pinned_j_idx) in pinned_worker_jobs:
+        for j_idx in job_conflicts.get(pinned_j_idx, ()):
+            if (w_idx, j_idx) not in pinned_worker_jobs:
+                pruned_worker_jobs.add((w_idx, j_idx))
+    
+    # Workers busy elsewhere during a job are pruned the same way, with one
+    # vectorized bitmap lookup per job
+    if availability is not None and availability.worker_ids:
+        rows = np.array([availability.rows.get(w.worker_id, -1) for w in workers], dtype=int)
+        known = rows >= 0
+        for j_idx, job in enumerate(jobs):
+            if job.start_datetime is None or job.end_datetime is None:
+                continue
+            busy = availability.busy_mask(job.start_datetime, job.end_datetime)
+            for w_idx in np.flatnonzero(known & busy[np.maximum(rows, 0)]).tolist():
+                if (w_idx, j_idx) not in pinned_worker_jobs:
+                    pruned_worker_jobs.add((w_idx, j_idx))
+    
     # worker_job[w][j] = 1 if worker w is assigned to job j
     # Only create variables for feasible assignments (distance < 200km)
     worker_job = {}
@@ -104,7 +206,9 @@ def compute_plan(planner_input: PlannerInput,
         worker_job[w_idx] = {}
         for j_idx, job in enumerate(jobs):
             distance = worker_job_distances.get((w_idx, j_idx), 999)
-            if distance < 200:  # Filter infeasible long-distance assignments
+            if (w_idx, j_idx) in pinned_worker_jobs:
+                worker_job[w_idx][j_idx] = model.NewConstant(1)
+            elif distance < 200 and (w_idx, j_idx) not in pruned_worker_jobs:  # Filter infeasible long-distance assignments
                 worker_job[w_idx][j_idx] = model.NewBoolVar(f'worker_{w_idx}_job_{j_idx}')
                 feasible_worker_jobs.add((w_idx, j_idx))
             else:
@@ -120,7 +224,9 @@ def compute_plan(planner_input: PlannerInput,
         for j_idx, job in enumerate(jobs):
             # Only create var if job needs this item AND stock has it
             job_needs_qty = job.required_items.get(stock.item_id, 0)
-            if job_needs_qty > 0 and stock.quantity > 0:
+            if (s_idx, j_idx) in pinned_stock_jobs:
+                stock_job[s_idx][j_idx] = model.NewConstant(pinned_stock_jobs[(s_idx, j_idx)])
+            elif job_needs_qty > 0 and stock.quantity > 0:
                 max_qty = min(stock.quantity, job_needs_qty)
                 stock_job[s_idx][j_idx] = model.NewIntVar(
                     0, max_qty, f'stock_{s_idx}_job_{j_idx}_qty'
@@ -155,18 +261,19 @@ def compute_plan(planner_input: PlannerInput,
                 # No workers available with this role, job can't be satisfied
                 model.Add(job_satisfied[j_idx] == 0)
     
-    # 2. Worker time constraints: no overlapping jobs (optimized)
+    # 2. Worker time constraints: no conflicting jobs (overlap or travel gap)
+    # Only pairs where the worker is a candidate for both jobs need a constraint
+    candidate_worker_jobs = feasible_worker_jobs | pinned_worker_jobs
     for w_idx in range(len(workers)):
-        for j1_idx in range(len(jobs)):
-            for j2_idx in range(j1_idx + 1, len(jobs)):
-                start1, end1 = job_intervals[j1_idx]
-                start2, end2 = job_intervals[j2_idx]
-                
-                # If jobs overlap in time, worker can't do both
-                if time_intervals_overlap(start1, end1, start2, end2):
-                    model.Add(
-                        worker_job[w_idx][j1_idx] + worker_job[w_idx][j2_idx] <= 1
-                    )
+        for j1_idx, j2_idx in conflict_pairs:
+            if (w_idx, j1_idx) not in candidate_worker_jobs or (w_idx, j2_idx) not in candidate_worker_jobs:
+                continue
+            # Pins are never overridden, even if a dispatcher pinned two conflicting jobs
+            if (w_idx, j1_idx) in pinned_worker_jobs and (w_idx, j2_idx) in pinned_worker_jobs:
+                continue
+            model.Add(
+                worker_job[w_idx][j1_idx] + worker_job[w_idx][j2_idx] <= 1
+            )
     
     # 4. Worker reachability constraint (already handled in variable creation)
     # Variables for distance > 200km are set to constant 0
@@ -177,7 +284,9 @@ def compute_plan(planner_input: PlannerInput,
             stock_job[s_idx][j_idx]
             for j_idx in range(len(jobs))
         )
-        model.Add(total_assigned <= stock.quantity)
+        # Pinned quantities are honoured even if they exceed the recorded stock
+        pinned_qty = sum(qty for (ps_idx, _), qty in pinned_stock_jobs.items() if ps_idx == s_idx)
+        model.Add(total_assigned <= max(stock.quantity, pinned_qty))
     
     # 6. Item requirements: jobs must have required items (soft constraint)
     for j_idx, job in enumerate(jobs):
@@ -231,17 +340,18 @@ def compute_plan(planner_input: PlannerInput,
     model.Minimize(total_cost)
     
     # === Warm Start (seed with previous solution) ===
-    if _previous_solution:
+    warm_start = hints if hints is not None else _previous_solution
+    if warm_start:
         for (w_idx, j_idx) in feasible_worker_jobs:
             worker_id = workers[w_idx].worker_id
             job_id = jobs[j_idx].job_id
-            prev_val = _previous_solution.get(('worker', worker_id, job_id), 0)
+            prev_val = warm_start.get(('worker', worker_id, job_id), 0)
             model.AddHint(worker_job[w_idx][j_idx], prev_val)
         
         for (s_idx, j_idx) in feasible_stock_jobs.keys():
             stock_id = stocks[s_idx].stock_id
             job_id = jobs[j_idx].job_id
-            prev_val = _previous_solution.get(('stock', stock_id, job_id), 0)
+            prev_val = min(warm_start.get(('stock', stock_id, job_id), 0), feasible_stock_jobs[(s_idx, j_idx)])
             model.AddHint(stock_job[s_idx][j_idx], prev_val)
     
     # === Solve ===
@@ -250,19 +360,9 @@ def compute_plan(planner_input: PlannerInput,
     solver.parameters.log_search_progress = False
     solver.parameters.num_search_workers = 4  # Parallel search
     
-    status = solver.Solve(model)
-    
-    # === Extract solution ===
-    result = {
-        "jobs": {},
-        "status": solver.StatusName(status),
-        "solve_time": solver.WallTime()
-    }
-    
-    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        # Store solution for warm start
-        new_solution = {}
-        
+    def extract_assignments(value) -> Dict:
+        """Read the job -> workers/stocks assignment from a value accessor."""
+        assignments = {}
         for j_idx, job in enumerate(jobs):
             job_result = {
                 "workers": [],
@@ -271,27 +371,65 @@ def compute_plan(planner_input: PlannerInput,
             
             # Extract assigned workers
             for w_idx, worker in enumerate(workers):
-                val = solver.Value(worker_job[w_idx][j_idx])
-                if val == 1:
+                if (w_idx, j_idx) in pinned_worker_jobs:
+                    job_result["workers"].append(worker.worker_id)
+                elif (w_idx, j_idx) in feasible_worker_jobs and value(worker_job[w_idx][j_idx]) == 1:
                     job_result["workers"].append(worker.worker_id)
-                    # Store for warm start
-                    new_solution[('worker', worker.worker_id, job.job_id)] = val
             
             # Extract assigned stocks
             for s_idx, stock in enumerate(stocks):
-                qty = solver.Value(stock_job[s_idx][j_idx])
+                if (s_idx, j_idx) in pinned_stock_jobs:
+                    qty = pinned_stock_jobs[(s_idx, j_idx)]
+                elif (s_idx, j_idx) in feasible_stock_jobs:
+                    qty = value(stock_job[s_idx][j_idx])
+                else:
+                    continue
                 if qty > 0:
                     job_result["stocks"].append({
                         "stock_id": stock.stock_id,
                         "quantity": qty
                     })
-                    # Store for warm start
-                    new_solution[('stock', stock.stock_id, job.job_id)] = qty
             
-            result["jobs"][job.job_id] = job_result
+            assignments[job.job_id] = job_result
+        return assignments
+    
+    finished = threading.Event()
+    if stop_event is not None:
+        threading.Thread(target=_stop_when_set, args=(solver, stop_event, finished), daemon=True).start()
+    try:
+        if on_solution is not None:
+            callback = _incumbent_callback_class()(extract_assignments, on_solution)
+            status = solver.Solve(model, callback)
+        else:
+            status = solver.Solve(model)
+    finally:
+        finished.set()
+    
+    if stop_event is not None and stop_event.is_set():
+        return {"jobs": {}, "status": "CANCELLED", "solve_time": solver.WallTime()}
+    
+    # === Extract solution ===
+    result = {
+        "jobs": {},
+        "status": solver.StatusName(status),
+        "solve_time": solver.WallTime()
+    }
+    
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result["jobs"] = extract_assignments(solver.Value)
+        result["objective"] = solver.ObjectiveValue()
+        
+        # Store solution for warm start
+        new_solution = {}
+        for job_id, job_result in result["jobs"].items():
+            for worker_id in job_result["workers"]:
+                new_solution[('worker', worker_id, job_id)] = 1
+            for stock_assignment in job_result["stocks"]:
+                new_solution[('stock', stock_assignment["stock_id"], job_id)] = stock_assignment["quantity"]
         
         # Update global cache for next run
-        _previous_solution = new_solution
+        if hints is None:
+            _previous_solution = new_solution
     
     return result
 
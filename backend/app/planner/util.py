@@ -1,8 +1,22 @@
 """Utility functions for the planner."""
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from math import radians, sin, cos, sqrt, atan2
 from typing import Tuple
 
+import numpy as np
+
+
+def naive_utc(value: datetime) -> datetime:
+    """
+    Bring a datetime into the naive form job times are stored in.
+    
+    Aware values (e.g. ISO strings with "Z" from the frontend) are converted
+    to UTC and lose their offset; naive values are returned unchanged.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -31,6 +45,29 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return R * c
 
 
+def haversine_distances(lat: float, lon: float,
+                        lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Vectorized great circle distance from one point to many points.
+    
+    Args:
+        lat, lon: Coordinates of the origin
+        lats, lons: Arrays of destination coordinates
+    
+    Returns:
+        Array of distances in kilometers
+    """
+    R = 6371.0  # Earth radius in kilometers
+    
+    lat1_rad = np.radians(lat)
+    lat2_rad = np.radians(lats)
+    dlat = lat2_rad - lat1_rad
+    dlon = np.radians(lons) - np.radians(lon)
+    
+    a = np.sin(dlat / 2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2)**2
+    return 2 * R * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
 def estimate_travel_time(distance_km: float, avg_speed_kmh: float = 50.0) -> timedelta:
     """
     Estimate travel time based on distance.
@@ -4,4 +4,4 @@ This module intentionally left minimal — individual router modules
 live alongside and are imported from `main.py`.
 """
 
-__all__ = ["jobs", "workers", "roles", "items"]
+__all__ = ["jobs", "workers", "roles", "items", "planner", "geo", "export", "dashboard"]
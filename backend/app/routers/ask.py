@@ -1,50 +1,88 @@
-import os
-from fastapi import APIRouter, HTTPException
-from google import genai
+from typing import AsyncIterator
 
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.database import get_read_db
 from app import schemas
+from app.services.answer_cache import answer_cache, answer_key
+from app.services.ask_context import build_context
+from app.services.llm_client import LLMClient, get_llm_client
 
 router = APIRouter()
 
-def get_google_ai_client():
-    """Initialize Google AI client with error handling."""
-    api_key = os.getenv("UV_GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("UV_GOOGLE_API_KEY not set in environment")
-    print("API_KEY", api_key)
-    client = genai.Client(api_key=api_key)
-    return client
+SYSTEM_PROMPT = """You are a helpful assistant inside a data analytics dashboard.
+    Always answer shortly (max 3 sentences) and be precise.
+    If the data does not contain the answer, say so explicitly.
+    Do not make up answers.
+"""
+
+
+def build_prompt(question: str, context_text: str) -> str:
+    return f"{SYSTEM_PROMPT}\n\nPage data:\n{context_text}\n\nUser question: {question}"
+
+
+async def _prompt_for(request: schemas.AskRequest, db: Session) -> str:
+    context = await run_in_threadpool(build_context, db, request.question, request.pageContext)
+    return build_prompt(request.question, context.text)
+
 
 @router.post("/ask", response_model=schemas.AskResponse, tags=["ai"])
-async def ask_gpt(request: schemas.AskRequest):
+async def ask_gpt(request: schemas.AskRequest, db: Session = Depends(get_read_db),
+                  llm: LLMClient = Depends(get_llm_client)):
     """
-    Ask Google AI a question with page context.
+    Ask the LLM a question about the current data.
+
+    The context is built here from the database (KPIs plus the entities the
+    question mentions) within ASK_CONTEXT_TOKEN_BUDGET tokens. Answers are
+    cached until that data changes.
     """
+    key = answer_key(request.question, request.pageContext)
+    cached = answer_cache.get(key)
+    if cached is not None:
+        return schemas.AskResponse(answer=cached)
+
     try:
-        client = get_google_ai_client()
-        
-        system_prompt = """You are a helpful assistant inside a data analytics dashboard.
-            Always answer shortly (max 3 sentences) and be precise.
-            If the data does not contain the answer, say so explicitly.
-            Do not make up answers.
-        """
-        
-        context_text = f"Page data:\n{request.pageContext}\n"
-        user_message = f"{context_text}\nUser question: {request.question}"
-        
-        # Combine system prompt and user message
-        full_prompt = f"{system_prompt}\n\n{user_message}"
-        
-        # Generate response using Google AI
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=full_prompt
-        )
-        
-        answer = response.text if response and hasattr(response, 'text') else "No response from model."
-        
+        answer = await llm.generate(await _prompt_for(request, db))
+        answer_cache.put(key, answer)
         return schemas.AskResponse(answer=answer)
-        
+
+    except Exception as e:
+        print(f"Error calling LLM: {e}")
+        raise HTTPException(status_code=500, detail=f"Something went wrong: {str(e)}")
+
+
+@router.post("/ask/stream", tags=["ai"])
+async def ask_gpt_stream(request: schemas.AskRequest, db: Session = Depends(get_read_db),
+                         llm: LLMClient = Depends(get_llm_client)):
+    """
+    Like POST /ask, but the answer is streamed as plain text while the model produces it.
+
+    Errors before the first piece are reported as 500; a failure later
+    ends the stream early and the partial answer is not cached.
+    """
+    key = answer_key(request.question, request.pageContext)
+    cached = answer_cache.get(key)
+    if cached is not None:
+        return StreamingResponse(iter([cached]), media_type="text/plain; charset=utf-8")
+
+    try:
+        prompt = await _prompt_for(request, db)
     except Exception as e:
-        print(f"Error calling Google AI: {e}")
+        print(f"Error building /ask context: {e}")
         raise HTTPException(status_code=500, detail=f"Something went wrong: {str(e)}")
+
+    async def pieces() -> AsyncIterator[str]:
+        answer = []
+        try:
+            async for piece in llm.stream(prompt):
+                answer.append(piece)
+                yield piece
+        except Exception as e:
+            print(f"Error streaming from LLM: {e}")
+            return
+        answer_cache.put(key, "".join(answer))
+
+    return StreamingResponse(pieces(), media_type="text/plain; charset=utf-8")
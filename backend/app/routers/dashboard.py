@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_read_db
+from app import schemas
+from app.services.dashboard_service import dashboard_cache
+
+router = APIRouter()
+
+
+@router.get("/dashboard/summary", response_model=schemas.DashboardSummary, tags=["dashboard"])
+def get_dashboard_summary(horizon_days: int = Query(14, ge=1, le=90), db: Session = Depends(get_read_db)):
+    """Dashboard KPIs in one small response, cached until jobs or assignments change."""
+    return dashboard_cache.get_summary(db, horizon_days)
@@ -0,0 +1,50 @@
+"""Bulk export endpoints for BI tools."""
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.core.database import ReadSessionLocal
+from app.models.models import Job
+from app.services.job_export import EXPORT_FORMATS, iter_export_rows, to_csv, to_ndjson
+from app.services.job_queries import apply_job_filters
+
+router = APIRouter()
+
+_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _export_stream(query, encode):
+    # The session lives as long as the response is streaming
+    with ReadSessionLocal() as db:
+        yield from encode(iter_export_rows(db, query))
+
+
+@router.get("/export/jobs", tags=["export"])
+async def export_jobs(
+    format: str = Query("ndjson", description=", ".join(EXPORT_FORMATS)),
+    from_datetime: Optional[datetime] = None,
+    to_datetime: Optional[datetime] = None,
+    city: Optional[str] = None,
+    assigned: Optional[bool] = None,
+    role_id: Optional[str] = None,
+    item_id: Optional[str] = None,
+):
+    """
+    Export jobs with assigned workers, roles, items and stock allocations.
+
+    NDJSON and CSV are streamed from a server-side cursor.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    query = apply_job_filters(
+        select(Job),
+        from_datetime=from_datetime, to_datetime=to_datetime, city=city,
+        assigned=assigned, role_id=role_id, item_id=item_id
+    )
+    headers = {"Content-Disposition": f'attachment; filename="jobs.{format}"'}
+
+    encode = to_csv if format == "csv" else to_ndjson
+    return StreamingResponse(_export_stream(query, encode), media_type=_MEDIA_TYPES[format], headers=headers)
@@ -0,0 +1,68 @@
+"""Map queries: viewport (bounding box) and radius lookups for jobs and branches."""
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_read_db
+from app import schemas
+from app.services.geo_index import DEFAULT_CLUSTER_THRESHOLD, DEFAULT_GRID_SIZE, query_bbox, query_radius
+
+router = APIRouter()
+
+
+async def _bbox(db: AsyncSession, kind: str, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                cluster_threshold: int, grid_size: int):
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="min_lat/min_lon must not exceed max_lat/max_lon")
+    return await query_bbox(db, kind, min_lat, min_lon, max_lat, max_lon, cluster_threshold, grid_size)
+
+
+@router.get("/geo/jobs", response_model=schemas.GeoQueryResult, tags=["geo"])
+async def jobs_in_bbox(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    cluster_threshold: int = Query(DEFAULT_CLUSTER_THRESHOLD, ge=0),
+    grid_size: int = Query(DEFAULT_GRID_SIZE, ge=1, le=256),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Jobs inside the viewport; grid clusters instead of points above `cluster_threshold`."""
+    return await _bbox(db, "job", min_lat, min_lon, max_lat, max_lon, cluster_threshold, grid_size)
+
+
+@router.get("/geo/jobs/nearby", response_model=List[schemas.GeoPoint], tags=["geo"])
+async def jobs_nearby(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(20.0, gt=0, le=5000),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    return await query_radius(db, "job", lat, lon, radius_km, limit)
+
+
+@router.get("/geo/branches", response_model=schemas.GeoQueryResult, tags=["geo"])
+async def branches_in_bbox(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    cluster_threshold: int = Query(DEFAULT_CLUSTER_THRESHOLD, ge=0),
+    grid_size: int = Query(DEFAULT_GRID_SIZE, ge=1, le=256),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    return await _bbox(db, "branch", min_lat, min_lon, max_lat, max_lon, cluster_threshold, grid_size)
+
+
+@router.get("/geo/branches/nearby", response_model=List[schemas.GeoPoint], tags=["geo"])
+async def branches_nearby(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(20.0, gt=0, le=5000),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Branches within `radius_km`, nearest first, with their distance."""
+    return await query_radius(db, "branch", lat, lon, radius_km, limit)
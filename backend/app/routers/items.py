@@ -1,26 +1,65 @@
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, get_async_read_db
+from app.core.pagination import decode_cursor, finish_page, page_size
 from app.models.models import Item
 from app import schemas
+from app.services.response_cache import CachedView, conditional_get, resource_versions
+from app.services.stock_ledger import item_availability
+from app.services.stock_summary import load_stock_summaries
 
 router = APIRouter()
 
+# Stock figures include quantities reserved by planned jobs
+ITEM_RESOURCES = ("item", "job", "plan")
+ITEM_ADAPTER = TypeAdapter(schemas.Item)
+ITEM_LIST_ADAPTER = TypeAdapter(List[schemas.Item])
+
+# Default window of GET /items/{id}/availability
+AVAILABILITY_WINDOW_DAYS = 28
+
+
+def _item_with_stock(item: Item, summary: Optional[dict]) -> schemas.Item:
+    return schemas.Item(
+        item_id=item.item_id,
+        item_name=item.item_name,
+        item_description=item.item_description,
+        fk_branch_id=item.fk_branch_id,
+        **(summary or {})
+    )
+
+
 @router.get("/items", response_model=List[schemas.Item], tags=["items"])
-def read_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    items = db.query(Item).offset(skip).limit(limit).all()
-    
-    result = []
-    for item in items:
-        total_stock = sum(stock.quantity for stock in item.stocks)
-        item_data = schemas.Item.from_orm(item)
-        item_data.total_stock = total_stock
-        result.append(item_data)
-        
-    return result
+async def read_items(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                     cache: CachedView = Depends(conditional_get(*ITEM_RESOURCES)),
+                     db: AsyncSession = Depends(get_async_read_db)):
+    cached = cache.hit()
+    if cached is not None:
+        return cached
+    limit = page_size(limit)
+    query = select(Item).order_by(Item.item_id)
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        query = query.where(Item.item_id > after_id)
+    else:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit + 1))
+    items = finish_page(response, result.scalars().all(), limit, lambda item: item.item_id)
+
+    # Stock figures for the whole page in one aggregate query
+    summaries = await load_stock_summaries(db, [item.item_id for item in items])
+    return cache.store(
+        ITEM_LIST_ADAPTER,
+        [_item_with_stock(item, summaries.get(item.item_id)) for item in items],
+        response
+    )
 
 
 @router.post("/items", response_model=schemas.Item, tags=["items"])
@@ -28,28 +67,53 @@ def create_item(item: schemas.ItemCreate, db: Session = Depends(get_db)):
     db_item = Item(**item.dict())
     db.add(db_item)
     db.commit()
+    resource_versions.bump("item")
     db.refresh(db_item)
     return db_item
 
 @router.get("/items/{item_id}", response_model=schemas.Item, tags=["items"])
-def read_item(item_id: str, db: Session = Depends(get_db)):
-    from app.models.models import JobItem
-    
-    db_item = db.query(Item).filter(Item.item_id == item_id).first()
+async def read_item(item_id: str, response: Response,
+                    cache: CachedView = Depends(conditional_get(*ITEM_RESOURCES)),
+                    db: AsyncSession = Depends(get_async_read_db)):
+    cached = cache.hit()
+    if cached is not None:
+        return cached
+    result = await db.execute(select(Item).filter(Item.item_id == item_id))
+    db_item = result.scalars().first()
     if db_item is None:
         raise HTTPException(status_code=404, detail="Item not found")
-    
-    # Calculate total stock
-    total_stock = sum(stock.quantity for stock in db_item.stocks)
-    
-    # Create a schema instance with the extra field
-    item_data = schemas.Item.from_orm(db_item)
-    item_data.total_stock = total_stock
-    
-    return item_data
+
+    summaries = await load_stock_summaries(db, [item_id])
+    return cache.store(ITEM_ADAPTER, _item_with_stock(db_item, summaries.get(item_id)), response)
+
+@router.get("/items/{item_id}/availability", response_model=schemas.ItemAvailability, tags=["items"])
+def read_item_availability(item_id: str, from_datetime: Optional[datetime] = None,
+                           to_datetime: Optional[datetime] = None, branch_id: Optional[str] = None,
+                           db: Session = Depends(get_read_db)):
+    """
+    Projected on-hand quantity of an item per branch over time, from the
+    stock ledger (allocated stock is out from job start to job end).
+
+    The window defaults to the next AVAILABILITY_WINDOW_DAYS days from now.
+    """
+    if db.query(Item.item_id).filter(Item.item_id == item_id).first() is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    from_datetime = from_datetime or datetime.now()
+    to_datetime = to_datetime or from_datetime + timedelta(days=AVAILABILITY_WINDOW_DAYS)
+    try:
+        branches = item_availability(db, item_id, from_datetime, to_datetime, branch_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return schemas.ItemAvailability(
+        item_id=item_id,
+        from_datetime=from_datetime,
+        to_datetime=to_datetime,
+        min_available=sum(max(0, branch["min_on_hand"]) for branch in branches),
+        branches=branches,
+    )
 
 @router.get("/item/{item_id}/jobs", response_model=List[schemas.Job], tags=["items"])
-def read_jobs_by_item(item_id: str, db: Session = Depends(get_db)):
+def read_jobs_by_item(item_id: str, db: Session = Depends(get_read_db)):
     from app.models.models import JobItem, Job
     
     # Check if item exists
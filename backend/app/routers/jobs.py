@@ -1,15 +1,61 @@
-from typing import List
+import tempfile
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.core.database import get_db
-from app.models.models import Job, Item, Worker, Role, JobItem
+from app.core.database import get_db, get_read_db, get_async_read_db
+from app.core.pagination import decode_cursor, finish_page, optional_datetime, page_size
+from app.core.serialization import dumps
+from app.models.models import Job, Item, Worker, Role, JobItem, Stock
 from app import schemas
-from app.services.planner_service import fetch_and_run_planner_async
+from app.services.job_import import BULK_FORMATS, import_jobs
+from app.services.job_preview import preview_job
+from app.services.job_projection import fetch_job_rows, parse_fields, select_fields
+from app.services.job_queries import apply_job_filters, order_jobs_after
+from app.services.planner_service import fetch_and_run_planner_async, set_pinned_assignments
+from app.services.response_cache import CachedView, conditional_get, resource_versions
+from app.services.stock_ledger import check_shortages
 
 router = APIRouter()
 
+# Everything schemas.Job serializes; async sessions cannot lazy-load
+JOB_LOAD_OPTIONS = (
+    selectinload(Job.item_links).joinedload(JobItem.item),
+    selectinload(Job.workers).joinedload(Worker.branch),
+    selectinload(Job.workers).selectinload(Worker.roles),
+    selectinload(Job.roles),
+)
+
+# Resources a serialized job is built from (see app/services/response_cache.py)
+JOB_RESOURCES = ("job", "plan", "worker", "role", "item")
+JOB_ADAPTER = TypeAdapter(schemas.Job)
+JOB_LIST_ADAPTER = TypeAdapter(List[schemas.Job])
+
+
+def _pin_assignments(db: Session, job_id: str, job: schemas.JobCreate):
+    """Store the dispatcher's workers and stock for a job as pinned assignments."""
+    worker_ids = [
+        worker_id for (worker_id,) in
+        db.query(Worker.worker_id).filter(Worker.worker_id.in_(job.worker_ids))
+    ]
+    known_stocks = {
+        stock_id for (stock_id,) in
+        db.query(Stock.stock_id).filter(Stock.stock_id.in_([s.stock_id for s in job.stocks]))
+    }
+    stocks = {
+        s.stock_id: s.assigned_quantity
+        for s in job.stocks
+        if s.stock_id in known_stocks and s.assigned_quantity > 0
+    }
+    set_pinned_assignments(db, job_id, worker_ids, stocks)
+
+
 @router.post("/jobs", response_model=schemas.Job)
 def create_job(job: schemas.JobCreate, db: Session = Depends(get_db)):
     db_job = Job(
@@ -26,11 +72,6 @@ def create_job(job: schemas.JobCreate, db: Session = Depends(get_db)):
         end_datetime=job.end_datetime
     )
     
-    # Handle workers
-    if job.worker_ids:
-        workers = db.query(Worker).filter(Worker.worker_id.in_(job.worker_ids)).all()
-        db_job.workers = workers
-        
     # Handle items (with quantities)
     if job.items:
         for item_link in job.items:
@@ -43,7 +84,13 @@ def create_job(job: schemas.JobCreate, db: Session = Depends(get_db)):
         db_job.roles = roles
 
     db.add(db_job)
+    db.flush()
+    
+    # Handle workers and stock chosen by the dispatcher (pinned for the planner)
+    _pin_assignments(db, db_job.job_id, job)
+    
     db.commit()
+    resource_versions.bump("job")
     db.refresh(db_job)
     
     # Run planner to update assignments (async, returns immediately)
@@ -57,17 +104,146 @@ def create_job(job: schemas.JobCreate, db: Session = Depends(get_db)):
     db_job = db.query(Job).options(joinedload(Job.item_links).joinedload(JobItem.item)).filter(Job.job_id == db_job.job_id).first()
     return db_job
 
+
+@router.post("/jobs/shortage-check", response_model=List[schemas.StockShortage])
+def check_job_shortages(request: schemas.ShortageCheckRequest, db: Session = Depends(get_read_db)):
+    """
+    Items a new job in the given window would be short of, from the stock
+    ledger's projected levels. Nothing is written.
+    """
+    required = {}
+    for link in request.items:
+        required[link.item_id] = required.get(link.item_id, 0) + link.required_quantity
+    try:
+        return check_shortages(db, request.start_datetime, request.end_datetime, required, request.branch_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/jobs/preview", response_model=schemas.JobPreview)
+def preview_new_job(job: schemas.JobCreate, db: Session = Depends(get_read_db)):
+    """
+    Feasibility of an unsaved job (same body as POST /jobs): candidate workers
+    per role with distances, projected stock per item, conflicting jobs and
+    a trial assignment from a short solve of this job alone. Nothing is written.
+    """
+    try:
+        return preview_job(db, job)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Request bodies up to this size stay in memory while spooling
+BULK_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _bulk_format(request: Request, format: Optional[str]) -> str:
+    if format is not None:
+        if format not in BULK_FORMATS:
+            raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(BULK_FORMATS)}")
+        return format
+    content_type = request.headers.get("content-type", "")
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type or "json" in content_type:
+        return "ndjson"
+    raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson, or pass ?format=")
+
+
+@router.post("/jobs/bulk", response_model=schemas.BulkImportResult)
+async def bulk_create_jobs(request: Request, format: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Import many jobs from a streamed NDJSON or CSV body (see app/services/job_import.py).
+
+    Invalid rows are reported in the response and skipped. The planner runs
+    once after the import instead of once per job.
+    """
+    fmt = _bulk_format(request, format)
+
+    # Spool the upload (memory, then disk) and import it off the event loop
+    with tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_MAX_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        result = await run_in_threadpool(import_jobs, db, spool, fmt)
+
+    if result.created:
+        try:
+            fetch_and_run_planner_async()
+            result.planner_triggered = True
+        except Exception as e:
+            # Log error but don't fail the import
+            print(f"Planner error: {e}")
+    return result
+
 @router.get("/jobs", response_model=List[schemas.Job])
-def read_jobs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    jobs = db.query(Job).options(joinedload(Job.item_links).joinedload(JobItem.item)).offset(skip).limit(limit).all()
-    return jobs
+async def read_jobs(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    from_datetime: Optional[datetime] = None,
+    to_datetime: Optional[datetime] = None,
+    city: Optional[str] = None,
+    assigned: Optional[bool] = None,
+    role_id: Optional[str] = None,
+    item_id: Optional[str] = None,
+    fields: Optional[str] = None,
+    cache: CachedView = Depends(conditional_get(*JOB_RESOURCES)),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    List jobs ordered by start time, filtered on the server.
+
+    Pass the `X-Next-Cursor` response header back as `cursor` to get the
+    next page; `skip` is only honoured without a cursor. `fields` is a
+    comma-separated sparse fieldset, e.g. `fields=job_id,job_name,workers`.
+    """
+    cached = cache.hit()
+    if cached is not None:
+        return cached
+
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    limit = page_size(limit)
+    query = apply_job_filters(
+        select(Job),
+        from_datetime=from_datetime, to_datetime=to_datetime, city=city,
+        assigned=assigned, role_id=role_id, item_id=item_id
+    )
+    if cursor:
+        start, job_id = decode_cursor(cursor, 2)
+        try:
+            start = optional_datetime(start)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = order_jobs_after(query, start, job_id)
+    else:
+        query = order_jobs_after(query).offset(skip)
+
+    # Projection query to plain dicts; no ORM objects or pydantic validation
+    rows = await fetch_job_rows(db, query.limit(limit + 1), selected)
+    rows = finish_page(
+        response, rows, limit,
+        lambda row: row["start_datetime"].isoformat() if row["start_datetime"] else None,
+        lambda row: row["job_id"]
+    )
+    return cache.store_body(dumps(select_fields(rows, selected)), response)
 
 @router.get("/jobs/{job_id}", response_model=schemas.Job)
-def read_job(job_id: str, db: Session = Depends(get_db)):
-    db_job = db.query(Job).options(joinedload(Job.item_links).joinedload(JobItem.item)).filter(Job.job_id == job_id).first()
+async def read_job(job_id: str, response: Response,
+                   cache: CachedView = Depends(conditional_get(*JOB_RESOURCES)),
+                   db: AsyncSession = Depends(get_async_read_db)):
+    cached = cache.hit()
+    if cached is not None:
+        return cached
+    result = await db.execute(select(Job).options(*JOB_LOAD_OPTIONS).filter(Job.job_id == job_id))
+    db_job = result.scalars().first()
     if db_job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    return db_job
+    return cache.store(JOB_ADAPTER, db_job, response)
 
 @router.put("/jobs/{job_id}", response_model=schemas.Job)
 def update_job(job_id: str, job: schemas.JobCreate, db: Session = Depends(get_db)):
@@ -76,14 +252,12 @@ def update_job(job_id: str, job: schemas.JobCreate, db: Session = Depends(get_db
         raise HTTPException(status_code=404, detail="Job not found")
     
     # Update basic fields
-    job_data = job.dict(exclude={'worker_ids', 'items', 'role_ids'})
+    job_data = job.dict(exclude={'worker_ids', 'items', 'role_ids', 'stocks'})
     for key, value in job_data.items():
         setattr(db_job, key, value)
     
     # Update relationships
-    if job.worker_ids is not None:
-        workers = db.query(Worker).filter(Worker.worker_id.in_(job.worker_ids)).all()
-        db_job.workers = workers
+    _pin_assignments(db, job_id, job)
         
     if job.items is not None:
         # Clear existing links and add new ones
@@ -98,6 +272,7 @@ def update_job(job_id: str, job: schemas.JobCreate, db: Session = Depends(get_db
         db_job.roles = roles
         
     db.commit()
+    resource_versions.bump("job")
     db.refresh(db_job)
     
     # Run planner to update assignments (async, returns immediately)
@@ -119,6 +294,7 @@ def delete_job(job_id: str, db: Session = Depends(get_db)):
     
     db.delete(db_job)
     db.commit()
+    resource_versions.bump("job")
     
     # Run planner to update assignments for remaining jobs (async, returns immediately)
     try:
@@ -130,18 +306,22 @@ def delete_job(job_id: str, db: Session = Depends(get_db)):
     return {"message": "Job deleted successfully"}
 
 @router.get("/worker/{worker_id}/jobs", response_model=List[schemas.Job])
-def get_jobs_by_worker_id(worker_id: str, db: Session = Depends(get_db)):
+async def get_jobs_by_worker_id(worker_id: str, response: Response,
+                                cache: CachedView = Depends(conditional_get(*JOB_RESOURCES)),
+                                db: AsyncSession = Depends(get_async_read_db)):
+    cached = cache.hit()
+    if cached is not None:
+        return cached
+
     # Verify worker exists
-    worker = db.query(Worker).filter(Worker.worker_id == worker_id).first()
+    worker = await db.scalar(select(Worker.worker_id).filter(Worker.worker_id == worker_id))
     if worker is None:
         raise HTTPException(status_code=404, detail="Worker not found")
     
     # Get all jobs assigned to this worker via worker__job table
-    jobs = db.query(Job).join(Job.workers).filter(Worker.worker_id == worker_id).options(
-        joinedload(Job.item_links).joinedload(JobItem.item),
-        joinedload(Job.workers),
-        joinedload(Job.roles)
-    ).all()
+    result = await db.execute(
+        select(Job).join(Job.workers).filter(Worker.worker_id == worker_id).options(*JOB_LOAD_OPTIONS)
+    )
     
-    return jobs
+    return cache.store(JOB_LIST_ADAPTER, result.scalars().all(), response)
 
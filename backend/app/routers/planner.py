@@ -0,0 +1,132 @@
+"""Planner progress endpoints."""
+import asyncio
+import json
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app import schemas
+from app.services.plan_channel import plan_channel
+from app.services.planner_runs import RunFinishedError, RunNotFoundError, planner_runs
+from app.services.simulation_service import ScenarioError, SimulationBusyError, submit_simulation
+
+router = APIRouter()
+
+# Send an SSE comment this often so proxies keep idle connections open
+HEARTBEAT_SECONDS = 15.0
+
+
+def _format_sse(event: dict, event_id: Optional[int] = None) -> str:
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event.get('type', 'message')}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+@router.get("/planner/stream", tags=["planner"])
+async def stream_plan(request: Request,
+                      last_event_id: Optional[int] = Query(None, description="Resume after this event id"),
+                      last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")):
+    """
+    Server-Sent Events stream of planner runs.
+
+    Events of a run (all carry its `run_id`):
+        started    the solver was started (number of jobs, time limit)
+        incumbent  an improving solution (objective, bound and assignments)
+        committed  assignments were written; `changes` lists every changed
+                   job with its workers, added/removed workers and new stock
+                   quantities (`final` is false for intermediate commits)
+        completed  the run has finished
+        cancelled  the run was cancelled (DELETE /planner/runs/{run_id})
+        failed     the solver raised an error
+
+    Every event has an id. Reconnecting clients (EventSource sends
+    Last-Event-ID) get the events they missed, or a `resync` event when
+    those are no longer buffered and lists have to be re-fetched. Without
+    an id the latest event is replayed on connect.
+    """
+    queue = plan_channel.subscribe()
+    if last_event_id is None and last_event_id_header and last_event_id_header.isdigit():
+        last_event_id = int(last_event_id_header)
+
+    async def event_stream():
+        try:
+            sent = 0
+            if last_event_id is not None:
+                missed = plan_channel.events_since(last_event_id)
+                if missed is None:
+                    sent = plan_channel.sequence
+                    yield _format_sse({"type": "resync"}, sent)
+                for sequence, event in missed or []:
+                    sent = sequence
+                    yield _format_sse(event, sequence)
+            elif plan_channel.latest is not None:
+                sent = plan_channel.sequence
+                yield _format_sse(plan_channel.latest, sent)
+            while not await request.is_disconnected():
+                try:
+                    sequence, event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if sequence <= sent:
+                    # Already replayed above
+                    continue
+                sent = sequence
+                yield _format_sse(event, sequence)
+        finally:
+            plan_channel.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/planner/runs", response_model=List[schemas.PlannerRun], tags=["planner"])
+def list_planner_runs(state: Optional[str] = None, limit: int = Query(20, ge=1, le=100)):
+    """Recent planner runs, newest first, optionally filtered by state."""
+    return planner_runs.list(state=state, limit=limit)
+
+
+@router.get("/planner/runs/{run_id}", response_model=schemas.PlannerRun, tags=["planner"])
+def get_planner_run(run_id: str):
+    """State, timings, objective and assignment change counts of one run."""
+    try:
+        return planner_runs.get(run_id)
+    except RunNotFoundError:
+        raise HTTPException(status_code=404, detail="Planner run not found")
+
+
+@router.delete("/planner/runs/{run_id}", response_model=schemas.PlannerRun, status_code=202, tags=["planner"])
+def cancel_planner_run(run_id: str):
+    """
+    Cancel a queued or running planner run.
+
+    The solver search is stopped and the run's final plan is not committed
+    (intermediate commits that already happened stay). The run reports
+    state "cancelled" once the solver has returned.
+    """
+    try:
+        return planner_runs.cancel(run_id)
+    except RunNotFoundError:
+        raise HTTPException(status_code=404, detail="Planner run not found")
+    except RunFinishedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/planner/simulate", response_model=schemas.SimulationResult, tags=["planner"])
+async def simulate_plan(request: schemas.SimulationRequest):
+    """
+    What-if planning: apply job/worker/stock deltas to the current snapshot and
+    solve it with the committed plan as hints. Nothing is written to the database.
+    """
+    try:
+        future = submit_simulation(request)
+    except SimulationBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    try:
+        return await asyncio.wrap_future(future)
+    except ScenarioError as e:
+        raise HTTPException(status_code=400, detail=str(e))
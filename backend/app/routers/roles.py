@@ -1,18 +1,35 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import decode_cursor, finish_page, page_size
 from app.models.models import Role
 from app import schemas
+from app.services.response_cache import CachedView, conditional_get, resource_versions
 
 router = APIRouter()
 
+ROLE_LIST_ADAPTER = TypeAdapter(List[schemas.Role])
+
 @router.get("/roles", response_model=List[schemas.Role], tags=["roles"])
-def read_roles(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    roles = db.query(Role).offset(skip).limit(limit).all()
-    return roles
+def read_roles(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+               cache: CachedView = Depends(conditional_get("role")),
+               db: Session = Depends(get_read_db)):
+    cached = cache.hit()
+    if cached is not None:
+        return cached
+    limit = page_size(limit)
+    query = db.query(Role).order_by(Role.role_id)
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        query = query.filter(Role.role_id > after_id)
+    else:
+        query = query.offset(skip)
+    roles = finish_page(response, query.limit(limit + 1).all(), limit, lambda role: role.role_id)
+    return cache.store(ROLE_LIST_ADAPTER, roles, response)
 
 
 @router.post("/roles", response_model=schemas.Role, tags=["roles"])
@@ -20,5 +37,6 @@ def create_role(role: schemas.RoleCreate, db: Session = Depends(get_db)):
     db_role = Role(**role.dict())
     db.add(db_role)
     db.commit()
+    resource_versions.bump("role")
     db.refresh(db_role)
     return db_role
@@ -1,29 +1,109 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.core.database import get_db
+from app.core.database import get_async_read_db, get_read_db
+from app.core.pagination import decode_cursor, finish_page, page_size
 from app.models.models import Worker
 from app import schemas
+from app.services.availability_service import find_available_workers
+from app.services.response_cache import CachedView, conditional_get
+from app.services.worker_schedule import fetch_schedule
 
 router = APIRouter()
 
+WORKER_RESOURCES = ("worker", "role")
+WORKER_ADAPTER = TypeAdapter(schemas.WorkerBase)
+WORKER_LIST_ADAPTER = TypeAdapter(List[schemas.WorkerBase])
+SCHEDULE_RESOURCES = ("job", "plan", "worker")
+SCHEDULE_ADAPTER = TypeAdapter(List[schemas.ScheduleEntry])
+
 @router.get("/workers", response_model=List[schemas.WorkerBase], tags=["workers"])
-def list_workers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    workers = db.query(Worker).options(
+async def list_workers(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                       cache: CachedView = Depends(conditional_get(*WORKER_RESOURCES)),
+                       db: AsyncSession = Depends(get_async_read_db)):
+    cached = cache.hit()
+    if cached is not None:
+        return cached
+    limit = page_size(limit)
+    query = select(Worker).options(
         joinedload(Worker.branch),
-        joinedload(Worker.roles)
-    ).offset(skip).limit(limit).all()
-    return workers
+        selectinload(Worker.roles)
+    ).order_by(Worker.worker_id)
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        query = query.where(Worker.worker_id > after_id)
+    else:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit + 1))
+    workers = finish_page(response, result.scalars().all(), limit, lambda worker: worker.worker_id)
+    return cache.store(WORKER_LIST_ADAPTER, workers, response)
+
+
+@router.get("/workers/available", response_model=List[schemas.AvailableWorker], tags=["workers"])
+def list_available_workers(from_datetime: datetime, to_datetime: datetime, role_id: Optional[str] = None,
+                           branch_id: Optional[str] = None, radius_km: Optional[float] = Query(None, gt=0),
+                           db: Session = Depends(get_read_db)):
+    """
+    Workers without assigned jobs in the window, from the availability bitmaps.
+
+    Optionally only workers with `role_id`, and of `branch_id` (or, with
+    `radius_km`, of branches within that distance of it; nearest first).
+    Availability has 15-minute granularity.
+    """
+    try:
+        available = find_available_workers(db, from_datetime, to_datetime, role_id, branch_id, radius_km)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not available:
+        return []
+    workers = {
+        worker.worker_id: worker for worker in
+        db.query(Worker).options(joinedload(Worker.branch), selectinload(Worker.roles))
+        .filter(Worker.worker_id.in_([worker_id for worker_id, _ in available]))
+    }
+    return [
+        schemas.AvailableWorker.model_validate(workers[worker_id]).model_copy(update={"distance_km": distance})
+        for worker_id, distance in available
+    ]
 
 
 @router.get("/workers/{worker_id}", response_model=schemas.WorkerBase, tags=["workers"])
-def get_worker(worker_id: str, db: Session = Depends(get_db)):
-    w = db.query(Worker).options(
+async def get_worker(worker_id: str, response: Response,
+                     cache: CachedView = Depends(conditional_get(*WORKER_RESOURCES)),
+                     db: AsyncSession = Depends(get_async_read_db)):
+    cached = cache.hit()
+    if cached is not None:
+        return cached
+    result = await db.execute(select(Worker).options(
         joinedload(Worker.branch),
-        joinedload(Worker.roles)
-    ).filter(Worker.worker_id == worker_id).first()
+        selectinload(Worker.roles)
+    ).filter(Worker.worker_id == worker_id))
+    w = result.scalars().first()
     if not w:
         raise HTTPException(status_code=404, detail="Worker not found")
-    return w
+    return cache.store(WORKER_ADAPTER, w, response)
+
+
+@router.get("/workers/{worker_id}/schedule", response_model=List[schemas.ScheduleEntry], tags=["workers"])
+async def get_worker_schedule(worker_id: str, response: Response,
+                              from_datetime: Optional[datetime] = None, to_datetime: Optional[datetime] = None,
+                              cache: CachedView = Depends(conditional_get(*SCHEDULE_RESOURCES)),
+                              db: AsyncSession = Depends(get_async_read_db)):
+    """
+    A worker's assigned jobs ordered by start time, from the materialized schedule.
+
+    `from_datetime`/`to_datetime` restrict it to jobs starting in that window.
+    """
+    cached = cache.hit()
+    if cached is not None:
+        return cached
+    entries = await fetch_schedule(db, worker_id, from_datetime, to_datetime)
+    if not entries and await db.scalar(select(Worker.worker_id).filter(Worker.worker_id == worker_id)) is None:
+        raise HTTPException(status_code=404, detail="Worker not found")
+    return cache.store(SCHEDULE_ADAPTER, entries, response)
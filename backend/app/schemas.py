@@ -36,6 +36,9 @@ class WorkerBase(BaseModel):
     class Config:
         from_attributes = True
 
+class AvailableWorker(WorkerBase):
+    distance_km: Optional[float] = None  # from the queried branch
+
 class ItemBase(BaseModel):
     item_name: str
     item_description: Optional[str] = None
@@ -43,10 +46,20 @@ class ItemBase(BaseModel):
 class ItemCreate(ItemBase):
     pass
 
+class ItemBranchStock(BaseModel):
+    branch_id: str
+    branch_name: Optional[str] = None
+    quantity: int
+    reserved: int  # assigned to jobs (job__stock.assigned_quantity)
+    free: int
+
 class Item(ItemBase):
     item_id: str
     fk_branch_id: Optional[str] = None
     total_stock: int = 0
+    reserved_stock: int = 0
+    free_stock: int = 0
+    stock_by_branch: List[ItemBranchStock] = []
 
     class Config:
         from_attributes = True
@@ -71,16 +84,63 @@ class JobItemLinkBase(BaseModel):
 class JobItemLinkCreate(JobItemLinkBase):
     pass
 
+class StockLevel(BaseModel):
+    at: datetime
+    on_hand: int  # negative if more is allocated than stocked
+
+class BranchStockProjection(BaseModel):
+    branch_id: str
+    branch_name: Optional[str] = None
+    quantity: int
+    min_on_hand: int
+    levels: List[StockLevel] = []  # at the window start and at every change
+
+class ItemAvailability(BaseModel):
+    item_id: str
+    from_datetime: datetime
+    to_datetime: datetime
+    min_available: int  # summed over branches, never below 0 per branch
+    branches: List[BranchStockProjection] = []
+
+class ShortageCheckRequest(BaseModel):
+    start_datetime: datetime
+    end_datetime: datetime
+    items: List[JobItemLinkCreate] = []
+    branch_ids: Optional[List[str]] = None
+
+class StockShortage(BaseModel):
+    item_id: str
+    required: int
+    available: int
+    shortage: int
+
 class JobItemLink(JobItemLinkBase):
     item: Item
 
     class Config:
         from_attributes = True
 
+class JobStockLinkCreate(BaseModel):
+    stock_id: str
+    assigned_quantity: int = 1
+
 class JobCreate(JobBase):
-    worker_ids: List[str] = []
+    worker_ids: List[str] = []  # pinned: kept fixed by the planner
     items: List[JobItemLinkCreate] = []
     role_ids: List[str] = []
+    stocks: List[JobStockLinkCreate] = []  # pinned stock allocations
+
+class BulkRowError(BaseModel):
+    row: int  # 1-based data row (CSV header not counted)
+    error: str
+
+class BulkImportResult(BaseModel):
+    total_rows: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: List[BulkRowError] = []
+    errors_truncated: bool = False
+    planner_triggered: bool = False
 
 class Job(JobBase):
     job_id: str
@@ -91,9 +151,218 @@ class Job(JobBase):
     class Config:
         from_attributes = True
 
+class ScenarioJob(JobBase):
+    job_id: Optional[str] = None  # set to modify an existing job, omit to add one
+    items: List[JobItemLinkBase] = []
+    role_ids: List[str] = []
+
+class ScenarioWorker(BaseModel):
+    worker_id: Optional[str] = None  # set to modify an existing worker, omit to add one
+    fk_branch_id: str
+    role_ids: List[str] = []
+
+class ScenarioStock(BaseModel):
+    stock_id: Optional[str] = None  # set to modify an existing stock, omit to add one
+    fk_item_id: str
+    fk_branch_id: str
+    quantity: int
+
+class SimulationRequest(BaseModel):
+    jobs: List[ScenarioJob] = []
+    workers: List[ScenarioWorker] = []
+    stocks: List[ScenarioStock] = []
+    remove_job_ids: List[str] = []
+    remove_worker_ids: List[str] = []
+    remove_stock_ids: List[str] = []
+    offline_branch_ids: List[str] = []  # drops all workers and stock of these branches
+    max_time_seconds: float = 5.0
+
+class SimulatedStockAssignment(BaseModel):
+    stock_id: str
+    quantity: int
+
+class SimulatedJob(BaseModel):
+    job_id: str
+    workers: List[str] = []
+    stocks: List[SimulatedStockAssignment] = []
+    added_workers: List[str] = []
+    removed_workers: List[str] = []
+
+class SimulationResult(BaseModel):
+    status: str
+    objective: Optional[float] = None
+    solve_time: float = 0.0
+    total_jobs: int = 0
+    jobs_assigned: int = 0
+    jobs_changed: int = 0
+    unassigned_job_ids: List[str] = []
+    jobs: List[SimulatedJob] = []
+
+class PreviewCandidate(BaseModel):
+    worker_id: str
+    worker_first_name: Optional[str] = None
+    worker_last_name: Optional[str] = None
+    branch_id: Optional[str] = None
+    distance_km: float
+    available: bool  # not assigned to a conflicting job
+    pinned: bool = False
+
+class PreviewRole(BaseModel):
+    role_id: str
+    role_name: str
+    required: int
+    available: int
+    candidates: List[PreviewCandidate] = []
+
+class PreviewStock(BaseModel):
+    stock_id: str
+    branch_id: str
+    distance_km: float
+    available: int  # projected on hand for the whole job
+
+class PreviewItem(BaseModel):
+    item_id: str
+    required: int
+    available: int
+    stocks: List[PreviewStock] = []
+
+class PreviewConflict(BaseModel):
+    job_id: str
+    job_name: Optional[str] = None
+    start_datetime: datetime
+    end_datetime: datetime
+    reason: str  # "overlap" or "travel"
+    worker_ids: List[str] = []
+
+class PreviewAssignment(BaseModel):
+    status: str
+    feasible: bool  # all roles and items covered
+    workers: List[str] = []
+    stocks: List[SimulatedStockAssignment] = []
+    solve_time: float = 0.0
+
+class JobPreview(BaseModel):
+    roles: List[PreviewRole] = []
+    items: List[PreviewItem] = []
+    conflicts: List[PreviewConflict] = []
+    assignment: PreviewAssignment
+
+class ScheduleEntry(BaseModel):
+    job_id: str
+    job_name: Optional[str] = None
+    start_datetime: Optional[datetime] = None
+    end_datetime: Optional[datetime] = None
+    city: Optional[str] = None
+    street: Optional[str] = None
+    house_number: Optional[str] = None
+    postal_code: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    pinned: bool = False
+
+class PlannerRun(BaseModel):
+    run_id: str
+    state: str  # queued, running, succeeded, failed, cancelled
+    max_time_seconds: float
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    jobs: int = 0
+    solver_status: Optional[str] = None
+    objective: Optional[float] = None
+    best_bound: Optional[float] = None
+    incumbents: int = 0
+    solve_time: Optional[float] = None
+    jobs_changed: int = 0
+    workers_added: int = 0
+    workers_removed: int = 0
+    stocks_changed: int = 0
+    error: Optional[str] = None
+    cancel_requested: bool = False
+
+    class Config:
+        from_attributes = True
+
+class GeoPoint(BaseModel):
+    id: str
+    name: Optional[str] = None
+    latitude: float
+    longitude: float
+    distance_km: Optional[float] = None  # set by radius queries
+
+class GeoCluster(BaseModel):
+    latitude: float  # centroid of the points in the cell
+    longitude: float
+    count: int
+    min_lat: float
+    max_lat: float
+    min_lon: float
+    max_lon: float
+
+class GeoQueryResult(BaseModel):
+    total: int
+    clustered: bool = False
+    points: List[GeoPoint] = []
+    clusters: List[GeoCluster] = []
+
+class DashboardWorker(BaseModel):
+    worker_id: str
+    worker_first_name: Optional[str] = None
+    worker_last_name: Optional[str] = None
+
+class DashboardUpcomingJob(BaseModel):
+    job_id: str
+    job_name: Optional[str] = None
+    start_datetime: Optional[datetime] = None
+    city: Optional[str] = None
+    workers: List[DashboardWorker] = []
+
+class BranchUtilization(BaseModel):
+    branch_id: str
+    branch_name: Optional[str] = None
+    workers: int
+    active_workers: int  # assigned to at least one job in the horizon
+    busy_hours: float
+    utilization: float  # busy hours / (workers * working hours in the horizon)
+
+class RoleUtilization(BaseModel):
+    role_id: str
+    role_name: str
+    workers: int
+    jobs_requiring: int
+    busy_hours: float
+    utilization: float
+
+class ItemShortage(BaseModel):
+    item_id: str
+    item_name: Optional[str] = None
+    required: int  # by jobs that have not ended yet
+    allocated: int
+    shortage: int
+
+class JobsPerDay(BaseModel):
+    date: str
+    jobs: int
+    unassigned: int
+
+class DashboardSummary(BaseModel):
+    generated_at: datetime
+    horizon_days: int
+    total_jobs: int
+    assigned_jobs: int
+    unassigned_jobs: int
+    total_workers: int
+    active_workers: int
+    upcoming_jobs: List[DashboardUpcomingJob] = []
+    branch_utilization: List[BranchUtilization] = []
+    role_utilization: List[RoleUtilization] = []
+    item_shortages: List[ItemShortage] = []
+    jobs_per_day: List[JobsPerDay] = []
+
 class AskRequest(BaseModel):
-    pageContext: str
     question: str
+    pageContext: Optional[str] = None  # short hint only; the data context is built server-side
 
 class AskResponse(BaseModel):
     answer: str
\ No newline at end of file
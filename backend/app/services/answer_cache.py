@@ -0,0 +1,74 @@
+"""Cache of /ask answers keyed by the question and the version of its context.
+
+The context of a question is built from jobs, assignments, workers, items
+and roles, so the resource versions of those (see
+app/services/response_cache.py) identify it without rebuilding it. A
+repeated question on unchanged data is answered without calling the model.
+Entries expire after ASK_CACHE_TTL_SECONDS and the least recently used are
+evicted beyond ASK_CACHE_MAX_ENTRIES.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.config import env_float, env_int
+from app.services.response_cache import resource_versions
+
+ASK_CACHE_TTL_SECONDS = env_float("ASK_CACHE_TTL_SECONDS", 300.0)
+ASK_CACHE_MAX_ENTRIES = env_int("ASK_CACHE_MAX_ENTRIES", 512)
+
+_CONTEXT_RESOURCES = ("job", "plan", "worker", "item", "role")
+
+
+def context_version() -> Tuple:
+    return (resource_versions.epoch, *resource_versions.snapshot(_CONTEXT_RESOURCES))
+
+
+def answer_key(question: str, page_context: Optional[str] = None, version: Tuple = None) -> str:
+    """Hash of the normalized question, the page hint and the context version."""
+    normalized = " ".join(question.lower().split())
+    version = version if version is not None else context_version()
+    raw = "\x1f".join([normalized, page_context or "", ":".join(str(part) for part in version)])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class AnswerCache:
+    """Thread-safe LRU of answers with a time-to-live."""
+
+    def __init__(self, max_entries: int = ASK_CACHE_MAX_ENTRIES, ttl_seconds: float = ASK_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, answer: str) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+answer_cache = AnswerCache()
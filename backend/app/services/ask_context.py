@@ -0,0 +1,227 @@
+"""Server-side context for /ask, kept within a token budget.
+
+The prompt holds the compact dashboard KPIs plus only the jobs, workers,
+items, roles and branches that the question refers to (by name, city or
+id). Its size is bounded by the budget, not by the amount of data.
+"""
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import env_int
+from app.models.models import Branch, Item, Job, Role, Worker, job__role, worker__job, worker__role
+from app.services.dashboard_service import dashboard_cache
+from app.services.stock_summary import stock_by_branch_query
+
+ASK_CONTEXT_TOKEN_BUDGET = env_int("ASK_CONTEXT_TOKEN_BUDGET", 2000)
+# Rough size of a token for budgeting; no tokenizer is needed for that
+CHARS_PER_TOKEN = 4
+
+# Candidates fetched per entity type before ranking
+MAX_MATCHES = 25
+MAX_TERMS = 8
+SUMMARY_HORIZON_DAYS = 14
+
+_STOPWORDS = {
+    "the", "and", "for", "are", "was", "were", "which", "what", "when", "where", "who", "whom", "how",
+    "many", "much", "does", "did", "has", "have", "with", "from", "this", "that", "these", "those",
+    "there", "any", "all", "can", "will", "should", "would", "could", "about", "into", "next", "today",
+    "tomorrow", "week", "show", "list", "tell", "give", "job", "jobs", "worker", "workers", "item",
+    "items", "role", "roles", "branch", "branches", "assigned", "unassigned", "our", "their", "not",
+}
+_ID_PATTERN = re.compile(r"\b[0-9a-f]{8}(?:-[0-9a-f]{4}){0,3}(?:-[0-9a-f]{12})?\b")
+_WORD_PATTERN = re.compile(r"[\w-]+")
+
+
+@dataclass
+class AskContext:
+    text: str
+    estimated_tokens: int
+    entities: Dict[str, int] = field(default_factory=dict)  # entity type -> entries included
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def extract_terms(question: str) -> Tuple[List[str], List[str]]:
+    """Search terms (words) and id prefixes mentioned in a question."""
+    lowered = question.lower()
+    ids = list(dict.fromkeys(_ID_PATTERN.findall(lowered)))
+    words = [
+        word for word in _WORD_PATTERN.findall(lowered)
+        if len(word) >= 3 and word not in _STOPWORDS and not any(word.startswith(i) for i in ids)
+    ]
+    return list(dict.fromkeys(words))[:MAX_TERMS], ids
+
+
+def _matching(db: Session, columns, id_column, terms: List[str], ids: List[str], extra=(), outer_join=None):
+    """Rows whose searchable columns contain a term (or whose id starts with a mentioned id), best first."""
+    conditions = [column.ilike(f"%{term}%") for column in columns for term in terms]
+    conditions += [id_column.like(f"{prefix}%") for prefix in ids]
+    if not conditions:
+        return []
+    query = select(id_column, *columns, *extra)
+    if outer_join is not None:
+        query = query.outerjoin(*outer_join)
+    rows = db.execute(query.where(or_(*conditions)).limit(MAX_MATCHES * 4)).all()
+
+    def score(row) -> int:
+        text = " ".join(str(value).lower() for value in row[1:len(columns) + 1] if value)
+        hits = sum(term in text for term in terms)
+        return hits + 10 * any(str(row[0]).startswith(prefix) for prefix in ids)
+
+    return sorted(rows, key=score, reverse=True)[:MAX_MATCHES]
+
+
+def _short(entity_id: str) -> str:
+    return entity_id[:8]
+
+
+def _fmt_time(value) -> str:
+    return value.strftime("%Y-%m-%d %H:%M") if value else "?"
+
+
+def _job_lines(db: Session, terms: List[str], ids: List[str]) -> List[str]:
+    rows = _matching(
+        db, (Job.job_name, Job.city, Job.street, Job.postal_code), Job.job_id, terms, ids,
+        extra=(Job.start_datetime, Job.end_datetime),
+    )
+    if not rows:
+        return []
+    job_ids = [row[0] for row in rows]
+    workers = defaultdict(list)
+    for job_id, first, last in db.execute(
+        select(worker__job.c.job_id, Worker.worker_first_name, Worker.worker_last_name)
+        .join(Worker, Worker.worker_id == worker__job.c.worker_id)
+        .where(worker__job.c.job_id.in_(job_ids))
+    ):
+        workers[job_id].append(f"{first or ''} {last or ''}".strip())
+    roles = defaultdict(list)
+    for job_id, role_name in db.execute(
+        select(job__role.c.job_id, Role.role_name)
+        .join(Role, Role.role_id == job__role.c.role_id)
+        .where(job__role.c.job_id.in_(job_ids))
+    ):
+        roles[job_id].append(role_name)
+    return [
+        f"- job {_short(job_id)} '{name}' in {city or '?'} ({street or ''}), "
+        f"{_fmt_time(start)} to {_fmt_time(end)}; roles: {', '.join(roles[job_id]) or 'none'}; "
+        f"workers: {', '.join(workers[job_id]) or 'unassigned'}"
+        for job_id, name, city, street, _, start, end in rows
+    ]
+
+
+def _worker_lines(db: Session, terms: List[str], ids: List[str]) -> List[str]:
+    rows = _matching(
+        db, (Worker.worker_first_name, Worker.worker_last_name, Branch.branch_name), Worker.worker_id, terms, ids,
+        outer_join=(Branch, Branch.branch_id == Worker.fk_branch_id),
+    )
+    if not rows:
+        return []
+    worker_ids = [row[0] for row in rows]
+    roles = defaultdict(list)
+    for worker_id, role_name in db.execute(
+        select(worker__role.c.worker_id, Role.role_name)
+        .join(Role, Role.role_id == worker__role.c.role_id)
+        .where(worker__role.c.worker_id.in_(worker_ids))
+    ):
+        roles[worker_id].append(role_name)
+    job_counts = dict(db.execute(
+        select(worker__job.c.worker_id, func.count())
+        .where(worker__job.c.worker_id.in_(worker_ids))
+        .group_by(worker__job.c.worker_id)
+    ).all())
+    return [
+        f"- worker {_short(worker_id)} {first or ''} {last or ''} at {branch or '?'}; "
+        f"roles: {', '.join(roles[worker_id]) or 'none'}; assigned jobs: {job_counts.get(worker_id, 0)}"
+        for worker_id, first, last, branch in rows
+    ]
+
+
+def _item_lines(db: Session, terms: List[str], ids: List[str]) -> List[str]:
+    rows = _matching(db, (Item.item_name,), Item.item_id, terms, ids)
+    if not rows:
+        return []
+    totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for item_id, _, _, quantity, reserved in db.execute(stock_by_branch_query([row[0] for row in rows])):
+        totals[item_id][0] += quantity
+        totals[item_id][1] += reserved
+    return [
+        f"- item {_short(item_id)} '{name}': stock {totals[item_id][0]}, reserved {totals[item_id][1]}"
+        for item_id, name in rows
+    ]
+
+
+def _summary_lines(db: Session, terms: List[str]) -> Tuple[List[str], List[str]]:
+    """(Always included KPI lines, matched or remaining detail lines)."""
+    summary = dashboard_cache.get_summary(db, SUMMARY_HORIZON_DAYS)
+    kpis = [
+        f"Totals: {summary.total_jobs} jobs ({summary.unassigned_jobs} unassigned), "
+        f"{summary.total_workers} workers ({summary.active_workers} with assignments).",
+        "Upcoming: " + ("; ".join(
+            f"'{job.job_name}' at {_fmt_time(job.start_datetime)} "
+            f"({', '.join(w.worker_first_name or w.worker_id for w in job.workers) or 'unassigned'})"
+            for job in summary.upcoming_jobs
+        ) or "none"),
+    ]
+
+    def mentioned(name: Optional[str]) -> bool:
+        return bool(name) and any(term in name.lower() for term in terms)
+
+    matched, rest = [], []
+    for branch in summary.branch_utilization:
+        line = (f"- branch '{branch.branch_name}': {branch.active_workers}/{branch.workers} workers busy, "
+                f"utilization {branch.utilization:.0%} over {SUMMARY_HORIZON_DAYS} days")
+        (matched if mentioned(branch.branch_name) else rest).append(line)
+    for role in summary.role_utilization:
+        line = (f"- role '{role.role_name}': {role.workers} workers, {role.jobs_requiring} jobs need it, "
+                f"utilization {role.utilization:.0%}")
+        (matched if mentioned(role.role_name) else rest).append(line)
+    for shortage in summary.item_shortages:
+        rest.append(f"- shortage '{shortage.item_name}': required {shortage.required}, "
+                    f"allocated {shortage.allocated}")
+    return kpis, matched + rest
+
+
+def build_context(db: Session, question: str, page_context: Optional[str] = None,
+                  token_budget: int = ASK_CONTEXT_TOKEN_BUDGET) -> AskContext:
+    """
+    Build the data context for a question within `token_budget` tokens.
+
+    Args:
+        db: Database session
+        question: The user's question; its words and ids select the entities
+        page_context: Optional short hint from the client (e.g. the current page)
+        token_budget: Maximum estimated tokens of the returned context
+    """
+    terms, ids = extract_terms(question)
+    kpis, details = _summary_lines(db, terms)
+    sections = [
+        ("kpis", kpis),
+        ("jobs", _job_lines(db, terms, ids)),
+        ("workers", _worker_lines(db, terms, ids)),
+        ("items", _item_lines(db, terms, ids)),
+        ("details", details),
+    ]
+    if page_context:
+        # Client hints are capped so they cannot crowd out the data
+        hint = page_context[:token_budget * CHARS_PER_TOKEN // 4]
+        sections.insert(1, ("page", [f"Current page: {hint}"]))
+
+    # === Fill the budget in priority order ===
+    budget = token_budget * CHARS_PER_TOKEN
+    lines, entities = [], {}
+    for name, section in sections:
+        for line in section:
+            if len(line) + 1 > budget:
+                break
+            lines.append(line)
+            budget -= len(line) + 1
+            entities[name] = entities.get(name, 0) + 1
+    text = "\n".join(lines)
+    return AskContext(text=text, estimated_tokens=estimate_tokens(text), entities=entities)
@@ -0,0 +1,149 @@
+"""Worker availability index built from the committed plan, and "who is free" queries.
+
+The index (app/planner/availability.py) covers AVAILABILITY_HORIZON_DAYS
+from today and is rebuilt when jobs, assignments or workers change; every
+planner commit bumps the plan version and so refreshes it on the next
+query. Windows outside the horizon are answered with an overlap query.
+"""
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import env_int
+from app.models.models import Branch, Job, Worker, worker__job, worker__role
+from app.planner.availability import AvailabilityIndex
+from app.planner.util import haversine_distances, naive_utc
+from app.services.response_cache import resource_versions
+
+AVAILABILITY_HORIZON_DAYS = env_int("AVAILABILITY_HORIZON_DAYS", 28)
+
+_DEPENDS_ON = ("job", "plan", "worker")
+
+
+@dataclass
+class _Availability:
+    index: AvailabilityIndex
+    # Per worker, in index row order
+    branch_ids: np.ndarray
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+
+
+def _load(db: Session, horizon_start: datetime, horizon_end: datetime) -> _Availability:
+    workers = db.execute(
+        select(Worker.worker_id, Worker.fk_branch_id, Branch.latitude, Branch.longitude)
+        .outerjoin(Branch, Branch.branch_id == Worker.fk_branch_id)
+        .order_by(Worker.worker_id)
+    ).all()
+    intervals = db.execute(
+        select(worker__job.c.worker_id, Job.start_datetime, Job.end_datetime)
+        .join(Job, Job.job_id == worker__job.c.job_id)
+        .where(Job.start_datetime < horizon_end, Job.end_datetime > horizon_start)
+    ).all()
+    return _Availability(
+        index=AvailabilityIndex([w.worker_id for w in workers], intervals, horizon_start, horizon_end),
+        branch_ids=np.array([w.fk_branch_id for w in workers], dtype=object),
+        latitudes=np.array([np.nan if w.latitude is None else w.latitude for w in workers], dtype=float),
+        longitudes=np.array([np.nan if w.longitude is None else w.longitude for w in workers], dtype=float),
+    )
+
+
+class AvailabilityCache:
+    """Latest availability index, valid while versions and the day are unchanged."""
+
+    def __init__(self, horizon_days: int = AVAILABILITY_HORIZON_DAYS):
+        self.horizon_days = horizon_days
+        self._lock = threading.Lock()
+        self._key: Optional[Tuple] = None
+        self._value: Optional[_Availability] = None
+
+    def get(self, db: Session) -> _Availability:
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        key = (resource_versions.snapshot(_DEPENDS_ON), today)
+        with self._lock:
+            if self._key == key:
+                return self._value
+        value = _load(db, today, today + timedelta(days=self.horizon_days))
+        with self._lock:
+            self._key, self._value = key, value
+        return value
+
+    def index(self, db: Session) -> AvailabilityIndex:
+        return self.get(db).index
+
+
+availability_cache = AvailabilityCache()
+
+
+def _busy_in_window(db: Session, start: datetime, end: datetime) -> set:
+    return {
+        worker_id for (worker_id,) in db.execute(
+            select(worker__job.c.worker_id).distinct()
+            .join(Job, Job.job_id == worker__job.c.job_id)
+            .where(and_(Job.start_datetime < end, Job.end_datetime > start))
+        )
+    }
+
+
+def find_available_workers(db: Session, start: datetime, end: datetime, role_id: Optional[str] = None,
+                           branch_id: Optional[str] = None,
+                           radius_km: Optional[float] = None) -> List[Tuple[str, Optional[float]]]:
+    """
+    Workers with no assigned job in [start, end).
+
+    Args:
+        db: Database session
+        start, end: Time window
+        role_id: Only workers with this role
+        branch_id: Only workers of this branch, or with `radius_km` of branches
+            within that distance of it
+        radius_km: Radius around `branch_id`
+
+    Returns:
+        (worker_id, distance_km) pairs, nearest first when a branch is given
+
+    Raises:
+        ValueError: If the window is empty or the branch is unknown
+    """
+    start, end = naive_utc(start), naive_utc(end)
+    if end <= start:
+        raise ValueError("to_datetime must be after from_datetime")
+    availability = availability_cache.get(db)
+    index = availability.index
+    candidates = np.ones(len(index.worker_ids), dtype=bool)
+
+    # === Role and branch filters as vectorized masks ===
+    if role_id is not None:
+        with_role = [w for (w,) in db.execute(select(worker__role.c.worker_id).where(worker__role.c.role_id == role_id))]
+        candidates &= np.isin(np.array(index.worker_ids, dtype=object), with_role)
+
+    distances = None
+    if branch_id is not None:
+        branch = db.execute(
+            select(Branch.latitude, Branch.longitude).where(Branch.branch_id == branch_id)
+        ).first()
+        if branch is None:
+            raise ValueError(f"Unknown branch '{branch_id}'")
+        if radius_km is None:
+            candidates &= availability.branch_ids == branch_id
+        elif branch.latitude is not None and branch.longitude is not None:
+            distances = haversine_distances(branch.latitude, branch.longitude,
+                                            availability.latitudes, availability.longitudes)
+            candidates &= np.nan_to_num(distances, nan=np.inf) <= radius_km
+
+    # === Busy check ===
+    if index.covers(start, end):
+        free = index.free_workers(start, end, candidates)
+    else:
+        busy = _busy_in_window(db, start, end)
+        free = [index.worker_ids[row] for row in np.flatnonzero(candidates) if index.worker_ids[row] not in busy]
+
+    if distances is None:
+        return [(worker_id, None) for worker_id in free]
+    result = [(worker_id, round(float(distances[index.rows[worker_id]]), 3)) for worker_id in free]
+    return sorted(result, key=lambda pair: (pair[1], pair[0]))
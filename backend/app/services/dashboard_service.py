@@ -0,0 +1,255 @@
+"""Dashboard KPIs computed with aggregate SQL and cached between changes.
+
+The summary is cached per horizon and recomputed when a job, assignment,
+worker, item or role version changes (see app/services/response_cache.py),
+or after DASHBOARD_CACHE_TTL_SECONDS so time-relative figures move on.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import and_, case, distinct, func, or_, select
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.core.config import env_float
+from app.models.models import Branch, Item, Job, JobItem, Role, Stock, Worker, job__role, job__stock, worker__job, worker__role
+from app.services.response_cache import resource_versions
+
+DASHBOARD_CACHE_TTL_SECONDS = env_float("DASHBOARD_CACHE_TTL_SECONDS", 60.0)
+# Working hours per worker and day, the capacity utilization is measured against
+WORK_HOURS_PER_DAY = env_float("WORK_HOURS_PER_DAY", 8.0)
+UPCOMING_JOBS = 3
+
+_DEPENDS_ON = ("job", "plan", "worker", "item", "role")
+
+
+def _job_hours():
+    """Duration of a job in hours (SQLite julianday arithmetic)."""
+    return (func.julianday(Job.end_datetime) - func.julianday(Job.start_datetime)) * 24.0
+
+
+def _upcoming_jobs(db: Session, now: datetime) -> List[Dict]:
+    jobs = db.execute(
+        select(Job.job_id, Job.job_name, Job.start_datetime, Job.city)
+        .where(Job.start_datetime > now)
+        .order_by(Job.start_datetime, Job.job_id)
+        .limit(UPCOMING_JOBS)
+    ).all()
+    workers: Dict[str, List[Dict]] = {job.job_id: [] for job in jobs}
+    if jobs:
+        for job_id, worker_id, first_name, last_name in db.execute(
+            select(worker__job.c.job_id, Worker.worker_id, Worker.worker_first_name, Worker.worker_last_name)
+            .join(Worker, Worker.worker_id == worker__job.c.worker_id)
+            .where(worker__job.c.job_id.in_(list(workers)))
+        ):
+            workers[job_id].append({
+                "worker_id": worker_id, "worker_first_name": first_name, "worker_last_name": last_name
+            })
+    return [
+        {
+            "job_id": job.job_id, "job_name": job.job_name,
+            "start_datetime": job.start_datetime, "city": job.city,
+            "workers": workers[job.job_id],
+        }
+        for job in jobs
+    ]
+
+
+def _branch_utilization(db: Session, window: Tuple[datetime, datetime], capacity_hours: float) -> List[Dict]:
+    start, end = window
+    busy = (
+        select(
+            Worker.fk_branch_id.label("branch_id"),
+            func.count(distinct(worker__job.c.worker_id)).label("active_workers"),
+            func.coalesce(func.sum(_job_hours()), 0.0).label("busy_hours"),
+        )
+        .join(worker__job, worker__job.c.worker_id == Worker.worker_id)
+        .join(Job, Job.job_id == worker__job.c.job_id)
+        .where(Job.start_datetime < end, Job.end_datetime > start)
+        .group_by(Worker.fk_branch_id)
+        .subquery()
+    )
+    headcount = (
+        select(Worker.fk_branch_id.label("branch_id"), func.count().label("workers"))
+        .group_by(Worker.fk_branch_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            Branch.branch_id, Branch.branch_name,
+            func.coalesce(headcount.c.workers, 0),
+            func.coalesce(busy.c.active_workers, 0),
+            func.coalesce(busy.c.busy_hours, 0.0),
+        )
+        .join(headcount, headcount.c.branch_id == Branch.branch_id, isouter=True)
+        .join(busy, busy.c.branch_id == Branch.branch_id, isouter=True)
+        .order_by(Branch.branch_name)
+    )
+    return [
+        {
+            "branch_id": branch_id, "branch_name": branch_name,
+            "workers": workers, "active_workers": active_workers,
+            "busy_hours": round(busy_hours, 2),
+            "utilization": round(busy_hours / (workers * capacity_hours), 4) if workers else 0.0,
+        }
+        for branch_id, branch_name, workers, active_workers, busy_hours in rows
+    ]
+
+
+def _role_utilization(db: Session, window: Tuple[datetime, datetime], capacity_hours: float) -> List[Dict]:
+    start, end = window
+    in_window = and_(Job.start_datetime < end, Job.end_datetime > start)
+    headcount = (
+        select(worker__role.c.role_id, func.count().label("workers"))
+        .group_by(worker__role.c.role_id)
+        .subquery()
+    )
+    demand = (
+        select(job__role.c.role_id, func.count().label("jobs_requiring"))
+        .join(Job, Job.job_id == job__role.c.job_id)
+        .where(in_window)
+        .group_by(job__role.c.role_id)
+        .subquery()
+    )
+    busy = (
+        select(worker__role.c.role_id, func.coalesce(func.sum(_job_hours()), 0.0).label("busy_hours"))
+        .join(worker__job, worker__job.c.worker_id == worker__role.c.worker_id)
+        .join(Job, Job.job_id == worker__job.c.job_id)
+        .where(in_window)
+        .group_by(worker__role.c.role_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            Role.role_id, Role.role_name,
+            func.coalesce(headcount.c.workers, 0),
+            func.coalesce(demand.c.jobs_requiring, 0),
+            func.coalesce(busy.c.busy_hours, 0.0),
+        )
+        .join(headcount, headcount.c.role_id == Role.role_id, isouter=True)
+        .join(demand, demand.c.role_id == Role.role_id, isouter=True)
+        .join(busy, busy.c.role_id == Role.role_id, isouter=True)
+        .order_by(Role.role_name)
+    )
+    return [
+        {
+            "role_id": role_id, "role_name": role_name,
+            "workers": workers, "jobs_requiring": jobs_requiring,
+            "busy_hours": round(busy_hours, 2),
+            "utilization": round(busy_hours / (workers * capacity_hours), 4) if workers else 0.0,
+        }
+        for role_id, role_name, workers, jobs_requiring, busy_hours in rows
+    ]
+
+
+def _item_shortages(db: Session, now: datetime) -> List[Dict]:
+    """Items whose open (not yet finished) jobs require more than is allocated to them."""
+    open_job = or_(Job.end_datetime.is_(None), Job.end_datetime >= now)
+    required = (
+        select(JobItem.item_id, func.sum(func.coalesce(JobItem.required_quantity, 1)).label("required"))
+        .join(Job, Job.job_id == JobItem.job_id)
+        .where(open_job)
+        .group_by(JobItem.item_id)
+        .subquery()
+    )
+    allocated = (
+        select(Stock.fk_item_id.label("item_id"), func.sum(job__stock.c.assigned_quantity).label("allocated"))
+        .join(job__stock, job__stock.c.stock_id == Stock.stock_id)
+        .join(Job, Job.job_id == job__stock.c.job_id)
+        .where(open_job)
+        .group_by(Stock.fk_item_id)
+        .subquery()
+    )
+    allocated_qty = func.coalesce(allocated.c.allocated, 0)
+    rows = db.execute(
+        select(Item.item_id, Item.item_name, required.c.required, allocated_qty)
+        .join(required, required.c.item_id == Item.item_id)
+        .join(allocated, allocated.c.item_id == Item.item_id, isouter=True)
+        .where(required.c.required > allocated_qty)
+        .order_by((required.c.required - allocated_qty).desc())
+    )
+    return [
+        {
+            "item_id": item_id, "item_name": item_name,
+            "required": required_total, "allocated": allocated_total,
+            "shortage": required_total - allocated_total,
+        }
+        for item_id, item_name, required_total, allocated_total in rows
+    ]
+
+
+def _jobs_per_day(db: Session, window: Tuple[datetime, datetime]) -> List[Dict]:
+    start, end = window
+    day = func.date(Job.start_datetime)
+    assigned = select(worker__job.c.job_id).where(worker__job.c.job_id == Job.job_id).exists()
+    rows = db.execute(
+        select(day, func.count(), func.sum(case((assigned, 0), else_=1)))
+        .where(Job.start_datetime >= start, Job.start_datetime < end)
+        .group_by(day)
+        .order_by(day)
+    )
+    return [{"date": date, "jobs": jobs, "unassigned": unassigned or 0} for date, jobs, unassigned in rows]
+
+
+def compute_summary(db: Session, horizon_days: int, now: datetime = None) -> schemas.DashboardSummary:
+    """
+    Compute all dashboard KPIs with aggregate queries.
+
+    Args:
+        db: Database session
+        horizon_days: Days from today covered by utilization and jobs per day
+        now: Reference time (defaults to the current time)
+    """
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    window = (today, today + timedelta(days=horizon_days))
+    capacity_hours = WORK_HOURS_PER_DAY * horizon_days
+
+    # === Counts ===
+    total_jobs = db.scalar(select(func.count()).select_from(Job))
+    assigned_jobs = db.scalar(select(func.count(distinct(worker__job.c.job_id))))
+    total_workers = db.scalar(select(func.count()).select_from(Worker))
+    active_workers = db.scalar(select(func.count(distinct(worker__job.c.worker_id))))
+
+    return schemas.DashboardSummary(
+        generated_at=now,
+        horizon_days=horizon_days,
+        total_jobs=total_jobs,
+        assigned_jobs=assigned_jobs,
+        unassigned_jobs=total_jobs - assigned_jobs,
+        total_workers=total_workers,
+        active_workers=active_workers,
+        upcoming_jobs=_upcoming_jobs(db, now),
+        branch_utilization=_branch_utilization(db, window, capacity_hours),
+        role_utilization=_role_utilization(db, window, capacity_hours),
+        item_shortages=_item_shortages(db, now),
+        jobs_per_day=_jobs_per_day(db, window),
+    )
+
+
+class DashboardCache:
+    """Latest summary per horizon, valid while the underlying versions are unchanged."""
+
+    def __init__(self, ttl_seconds: float = DASHBOARD_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Tuple[Tuple[int, ...], float, schemas.DashboardSummary]] = {}
+
+    def get_summary(self, db: Session, horizon_days: int) -> schemas.DashboardSummary:
+        versions = resource_versions.snapshot(_DEPENDS_ON)
+        with self._lock:
+            entry = self._entries.get(horizon_days)
+        if entry is not None:
+            cached_versions, computed_at, summary = entry
+            if cached_versions == versions and time.monotonic() - computed_at < self.ttl_seconds:
+                return summary
+
+        summary = compute_summary(db, horizon_days)
+        with self._lock:
+            self._entries[horizon_days] = (versions, time.monotonic(), summary)
+        return summary
+
+
+dashboard_cache = DashboardCache()
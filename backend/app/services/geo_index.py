@@ -0,0 +1,125 @@
+"""Spatial queries over the job and branch R*Tree indexes.
+
+The `job_rtree` / `branch_rtree` virtual tables are created and kept in sync
+by triggers (migration 4 in app/core/migrations.py). R*Tree stores 32-bit
+floats and rounds boxes outwards, so every lookup re-checks the exact
+coordinates of the base row.
+"""
+import math
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.planner.util import haversine_distances
+
+# kind -> (base table, id column, name column)
+GEO_KINDS = {
+    "job": ("job", "job_id", "job_name"),
+    "branch": ("branch", "branch_id", "branch_name"),
+}
+
+KM_PER_DEGREE_LAT = 111.32
+
+DEFAULT_CLUSTER_THRESHOLD = 500
+DEFAULT_GRID_SIZE = 32
+
+
+def _bbox_from(kind: str) -> str:
+    table, _, _ = GEO_KINDS[kind]
+    return (
+        f"FROM {table}_rtree r JOIN {table} t ON t.rowid = r.id "
+        f"WHERE r.max_lat >= :min_lat AND r.min_lat <= :max_lat "
+        f"AND r.max_lon >= :min_lon AND r.min_lon <= :max_lon "
+        f"AND t.latitude BETWEEN :min_lat AND :max_lat "
+        f"AND t.longitude BETWEEN :min_lon AND :max_lon"
+    )
+
+
+async def _points_in_bbox(db: AsyncSession, kind: str, bbox: Dict[str, float]) -> List[Dict]:
+    _, id_column, name_column = GEO_KINDS[kind]
+    result = await db.execute(text(
+        f"SELECT t.{id_column}, t.{name_column}, t.latitude, t.longitude {_bbox_from(kind)}"
+    ), bbox)
+    return [
+        {"id": row[0], "name": row[1], "latitude": row[2], "longitude": row[3]}
+        for row in result
+    ]
+
+
+async def query_bbox(db: AsyncSession, kind: str,
+                     min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                     cluster_threshold: int = DEFAULT_CLUSTER_THRESHOLD,
+                     grid_size: int = DEFAULT_GRID_SIZE) -> Dict:
+    """
+    Points of one kind inside a bounding box, clustered when there are many.
+
+    Args:
+        db: Async database session
+        kind: "job" or "branch"
+        min_lat, min_lon, max_lat, max_lon: Bounding box (viewport) in degrees
+        cluster_threshold: Above this many points, return grid clusters instead
+        grid_size: Number of grid cells per side of the bounding box
+
+    Returns:
+        Dict matching schemas.GeoQueryResult
+    """
+    bbox = {"min_lat": min_lat, "max_lat": max_lat, "min_lon": min_lon, "max_lon": max_lon}
+    total = (await db.execute(text(f"SELECT COUNT(*) {_bbox_from(kind)}"), bbox)).scalar_one()
+    if total <= cluster_threshold:
+        return {"total": total, "clustered": False, "points": await _points_in_bbox(db, kind, bbox)}
+
+    # === Grid clustering ===
+    # Cell index per axis; points on the max edge fold into the last cell
+    cell_lat = (max_lat - min_lat) / grid_size or 1.0
+    cell_lon = (max_lon - min_lon) / grid_size or 1.0
+    result = await db.execute(text(
+        f"SELECT MIN(CAST((t.latitude - :min_lat) / :cell_lat AS INTEGER), :last_cell) AS gy, "
+        f"MIN(CAST((t.longitude - :min_lon) / :cell_lon AS INTEGER), :last_cell) AS gx, "
+        f"COUNT(*), AVG(t.latitude), AVG(t.longitude), "
+        f"MIN(t.latitude), MAX(t.latitude), MIN(t.longitude), MAX(t.longitude) "
+        f"{_bbox_from(kind)} GROUP BY gy, gx"
+    ), {**bbox, "cell_lat": cell_lat, "cell_lon": cell_lon, "last_cell": grid_size - 1})
+    clusters = [
+        {
+            "latitude": row[3], "longitude": row[4], "count": row[2],
+            "min_lat": row[5], "max_lat": row[6], "min_lon": row[7], "max_lon": row[8],
+        }
+        for row in result
+    ]
+    return {"total": total, "clustered": True, "clusters": clusters}
+
+
+async def query_radius(db: AsyncSession, kind: str, lat: float, lon: float,
+                       radius_km: float, limit: int = 100) -> List[Dict]:
+    """
+    Points of one kind within `radius_km` of (lat, lon), nearest first.
+
+    The R*Tree narrows the search to the bounding box of the circle; exact
+    great circle distances are computed for those candidates only.
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(lat))
+    dlon = 180.0 if cos_lat < 1e-6 else min(180.0, radius_km / (KM_PER_DEGREE_LAT * cos_lat))
+    candidates = await _points_in_bbox(db, kind, {
+        "min_lat": lat - dlat, "max_lat": lat + dlat,
+        "min_lon": lon - dlon, "max_lon": lon + dlon,
+    })
+    if not candidates:
+        return []
+
+    distances = haversine_distances(
+        lat, lon,
+        np.array([p["latitude"] for p in candidates]),
+        np.array([p["longitude"] for p in candidates]),
+    )
+    order = np.argsort(distances, kind="stable")
+    points = []
+    for index in order[:limit]:
+        if distances[index] > radius_km:
+            break
+        point = candidates[index]
+        point["distance_km"] = round(float(distances[index]), 3)
+        points.append(point)
+    return points
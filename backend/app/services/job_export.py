@@ -0,0 +1,120 @@
+"""Streaming export of jobs with their assignments (NDJSON, CSV).
+
+Jobs are read through a server-side cursor in partitions of `chunk_size`
+rows; workers, roles, items and stock allocations are loaded per partition.
+Memory therefore stays bounded by one partition, whatever the table size.
+"""
+import csv
+import io
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.serialization import dumps
+from app.models.models import Item, Job, JobItem, Role, Stock, job__role, job__stock, worker__job
+from app.services.job_projection import JOB_COLUMNS
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# Streamed responses are flushed in pieces of about this size
+STREAM_BUFFER_BYTES = 64 * 1024
+
+CSV_COLUMNS = JOB_COLUMNS + ("workers", "pinned_workers", "roles", "items", "stocks")
+
+
+def _nested_for(db: Session, job_ids: List[str]) -> Dict[str, Dict[str, List]]:
+    nested: Dict[str, Dict[str, List]] = defaultdict(lambda: defaultdict(list))
+    for job_id, worker_id, pinned in db.execute(
+        select(worker__job.c.job_id, worker__job.c.worker_id, worker__job.c.pinned)
+        .where(worker__job.c.job_id.in_(job_ids))
+    ):
+        nested[job_id]["workers"].append({"worker_id": worker_id, "pinned": bool(pinned)})
+    for job_id, role_id, role_name in db.execute(
+        select(job__role.c.job_id, Role.role_id, Role.role_name)
+        .join(Role, Role.role_id == job__role.c.role_id)
+        .where(job__role.c.job_id.in_(job_ids))
+    ):
+        nested[job_id]["roles"].append({"role_id": role_id, "role_name": role_name})
+    for job_id, item_id, item_name, quantity in db.execute(
+        select(JobItem.job_id, JobItem.item_id, Item.item_name, JobItem.required_quantity)
+        .join(Item, Item.item_id == JobItem.item_id)
+        .where(JobItem.job_id.in_(job_ids))
+    ):
+        nested[job_id]["items"].append({"item_id": item_id, "item_name": item_name, "required_quantity": quantity})
+    for job_id, stock_id, item_id, branch_id, quantity, pinned in db.execute(
+        select(
+            job__stock.c.job_id, job__stock.c.stock_id, Stock.fk_item_id, Stock.fk_branch_id,
+            job__stock.c.assigned_quantity, job__stock.c.pinned,
+        )
+        .join(Stock, Stock.stock_id == job__stock.c.stock_id)
+        .where(job__stock.c.job_id.in_(job_ids))
+    ):
+        nested[job_id]["stocks"].append({
+            "stock_id": stock_id, "item_id": item_id, "branch_id": branch_id,
+            "assigned_quantity": quantity, "pinned": bool(pinned),
+        })
+    return nested
+
+
+def iter_export_rows(db: Session, query: Select, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Yield one dict per job (scalar fields plus workers, roles, items, stocks).
+
+    Args:
+        db: Database session (kept open while the iterator is consumed)
+        query: `select(Job)` with filters applied; it is ordered by job_id here
+        chunk_size: Rows per cursor partition and per nested lookup
+    """
+    columns = [getattr(Job, name) for name in JOB_COLUMNS]
+    result = db.execute(
+        query.with_only_columns(*columns).order_by(Job.job_id)
+        .execution_options(stream_results=True, yield_per=chunk_size)
+    )
+    for partition in result.partitions():
+        rows = [dict(zip(JOB_COLUMNS, row)) for row in partition]
+        nested = _nested_for(db, [row["job_id"] for row in rows])
+        for row in rows:
+            extra = nested.get(row["job_id"], {})
+            for field in ("workers", "roles", "items", "stocks"):
+                row[field] = extra.get(field, [])
+            yield row
+
+
+def to_ndjson(rows: Iterable[Dict]) -> Iterator[bytes]:
+    buffer = bytearray()
+    for row in rows:
+        buffer += dumps(row) + b"\n"
+        if len(buffer) >= STREAM_BUFFER_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _flatten(row: Dict) -> Dict:
+    """One CSV record; collections become ";"-separated lists."""
+    flat = {name: row[name] for name in JOB_COLUMNS}
+    flat["workers"] = ";".join(w["worker_id"] for w in row["workers"])
+    flat["pinned_workers"] = ";".join(w["worker_id"] for w in row["workers"] if w["pinned"])
+    flat["roles"] = ";".join(r["role_name"] or r["role_id"] for r in row["roles"])
+    flat["items"] = ";".join(f"{i['item_id']}:{i['required_quantity']}" for i in row["items"])
+    flat["stocks"] = ";".join(f"{s['stock_id']}:{s['assigned_quantity']}" for s in row["stocks"])
+    return flat
+
+
+def to_csv(rows: Iterable[Dict]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(_flatten(row))
+        if buffer.tell() >= STREAM_BUFFER_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -0,0 +1,259 @@
+"""Bulk job import from NDJSON or CSV.
+
+Rows are parsed and validated one at a time and written in batches with
+Core `executemany` inserts, so large imports neither build ORM objects nor
+commit per job. The planner is triggered once after the whole import.
+
+Row format (NDJSON): the `POST /jobs` body (`schemas.JobCreate`). Roles and
+items may be referenced by id or by name.
+
+Row format (CSV): one column per `JobBase` field plus
+    role_ids    role ids or names separated by ";"
+    items       item ids or names with optional quantity, e.g. "Drill:2;Ladder"
+    worker_ids  pinned worker ids separated by ";"
+"""
+import csv
+import io
+import json
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.models.models import Item, Job, JobItem, Role, Stock, Worker, generate_uuid, job__role, job__stock, worker__job
+from app.services.response_cache import resource_versions
+from app.services.snapshot_cache import planner_snapshot
+
+BULK_BATCH_SIZE = 1000
+# Row errors listed in the response; further errors are only counted
+MAX_REPORTED_ERRORS = 1000
+
+BULK_FORMATS = ("ndjson", "csv")
+
+_JOB_COLUMNS = tuple(schemas.JobBase.model_fields)
+
+
+class _Lookups:
+    """Id/name lookups loaded once per import."""
+
+    def __init__(self, db: Session):
+        self.roles: Dict[str, str] = {}
+        for role_id, role_name in db.query(Role.role_id, Role.role_name):
+            self.roles[role_id] = role_id
+            if role_name:
+                self.roles.setdefault(role_name.strip().lower(), role_id)
+        self.items: Dict[str, str] = {}
+        for item_id, item_name in db.query(Item.item_id, Item.item_name):
+            self.items[item_id] = item_id
+            if item_name:
+                self.items.setdefault(item_name.strip().lower(), item_id)
+        self.worker_ids = {worker_id for (worker_id,) in db.query(Worker.worker_id)}
+        self.stock_ids = {stock_id for (stock_id,) in db.query(Stock.stock_id)}
+
+    @staticmethod
+    def _resolve(table: Dict[str, str], key: str, kind: str) -> str:
+        resolved = table.get(key) or table.get(key.strip().lower())
+        if resolved is None:
+            raise ValueError(f"Unknown {kind} '{key}'")
+        return resolved
+
+    def role(self, key: str) -> str:
+        return self._resolve(self.roles, key, "role")
+
+    def item(self, key: str) -> str:
+        return self._resolve(self.items, key, "item")
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in (value or "").split(";") if part.strip()]
+
+
+def _csv_record(row: Dict[str, str]) -> Dict:
+    record = {key: value for key, value in row.items() if key in _JOB_COLUMNS and value not in (None, "")}
+    record["role_ids"] = _split(row.get("role_ids"))
+    record["worker_ids"] = _split(row.get("worker_ids"))
+    items = []
+    for part in _split(row.get("items")):
+        item_id, _, quantity = part.rpartition(":") if ":" in part else (part, "", "1")
+        items.append({"item_id": item_id.strip(), "required_quantity": quantity.strip() or 1})
+    record["items"] = items
+    return record
+
+
+def iter_records(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, Dict]]:
+    """
+    Yield (row number, raw record) pairs from an NDJSON or CSV byte stream.
+
+    Malformed lines are yielded as ValueError instances so they can be
+    reported per row.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            yield row_number, _csv_record(row)
+        return
+
+    row_number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, ValueError(f"Invalid JSON: {e.msg}")
+            continue
+        if not isinstance(record, dict):
+            record = ValueError("Each line must be a JSON object")
+        yield row_number, record
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+class _Batch:
+    """Rows for one executemany round."""
+
+    def __init__(self):
+        self.row_numbers: List[int] = []
+        self.jobs: List[Dict] = []
+        self.roles: List[Dict] = []
+        self.items: List[Dict] = []
+        self.workers: List[Dict] = []
+        self.stocks: List[Dict] = []
+
+    def add(self, row_number: int, job: schemas.JobCreate, lookups: _Lookups) -> None:
+        # Resolve references first so a bad row adds nothing
+        role_ids = list(dict.fromkeys(lookups.role(role) for role in job.role_ids))
+        quantities: Dict[str, int] = {}
+        for link in job.items:
+            item_id = lookups.item(link.item_id)
+            quantities[item_id] = quantities.get(item_id, 0) + link.required_quantity
+        for worker_id in job.worker_ids:
+            if worker_id not in lookups.worker_ids:
+                raise ValueError(f"Unknown worker '{worker_id}'")
+        stocks = {}
+        for link in job.stocks:
+            if link.stock_id not in lookups.stock_ids:
+                raise ValueError(f"Unknown stock '{link.stock_id}'")
+            if link.assigned_quantity > 0:
+                stocks[link.stock_id] = link.assigned_quantity
+
+        job_id = generate_uuid()
+        self.row_numbers.append(row_number)
+        self.jobs.append({"job_id": job_id, **job.model_dump(include=set(_JOB_COLUMNS))})
+        self.roles.extend({"job_id": job_id, "role_id": role_id} for role_id in role_ids)
+        self.items.extend(
+            {"job_id": job_id, "item_id": item_id, "required_quantity": quantity}
+            for item_id, quantity in quantities.items()
+        )
+        self.workers.extend(
+            {"worker_id": worker_id, "job_id": job_id, "pinned": True}
+            for worker_id in dict.fromkeys(job.worker_ids)
+        )
+        self.stocks.extend(
+            {"job_id": job_id, "stock_id": stock_id, "assigned_quantity": qty, "pinned": True}
+            for stock_id, qty in stocks.items()
+        )
+
+    def split(self) -> Iterator[Tuple[int, "_Batch"]]:
+        """Yield a one-job batch per row, to find the rows a failed batch choked on."""
+        by_job: Dict[str, "_Batch"] = {}
+        for row_number, job in zip(self.row_numbers, self.jobs):
+            single = by_job[job["job_id"]] = _Batch()
+            single.row_numbers.append(row_number)
+            single.jobs.append(job)
+        for name in ("roles", "items", "workers", "stocks"):
+            for row in getattr(self, name):
+                getattr(by_job[row["job_id"]], name).append(row)
+        for single in by_job.values():
+            yield single.row_numbers[0], single
+
+    def write(self, db: Session) -> None:
+        for table, rows in (
+            (Job.__table__, self.jobs),
+            (job__role, self.roles),
+            (JobItem.__table__, self.items),
+            (worker__job, self.workers),
+            (job__stock, self.stocks),
+        ):
+            if rows:
+                db.execute(table.insert(), rows)
+        db.commit()
+
+
+def import_jobs(db: Session, stream: IO[bytes], fmt: str,
+                batch_size: int = BULK_BATCH_SIZE) -> schemas.BulkImportResult:
+    """
+    Validate and insert jobs from an NDJSON or CSV stream.
+
+    Invalid rows are reported and skipped; valid rows are committed batch by
+    batch. A batch that fails in the database is rolled back and retried one
+    row at a time, so only the rows the database rejects are reported.
+
+    Args:
+        db: Database session
+        stream: Binary stream with the request body
+        fmt: "ndjson" or "csv"
+        batch_size: Jobs per executemany round and commit
+
+    Returns:
+        Import summary with per-row errors (the planner is not triggered here)
+    """
+    result = schemas.BulkImportResult()
+    lookups = _Lookups(db)
+
+    def report(row_number: int, error: str) -> None:
+        result.failed += 1
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append(schemas.BulkRowError(row=row_number, error=error))
+        else:
+            result.errors_truncated = True
+
+    def flush(batch: _Batch) -> None:
+        if not batch.jobs:
+            return
+        try:
+            batch.write(db)
+            result.created += len(batch.jobs)
+            return
+        except SQLAlchemyError:
+            db.rollback()
+        # Retry row by row so only the offending rows are reported
+        for row_number, single in batch.split():
+            try:
+                single.write(db)
+                result.created += 1
+            except SQLAlchemyError as e:
+                db.rollback()
+                report(row_number, f"Database error: {e.__class__.__name__}: {getattr(e, 'orig', e)}")
+
+    batch = _Batch()
+    for row_number, record in iter_records(stream, fmt):
+        result.total_rows += 1
+        if isinstance(record, Exception):
+            report(row_number, str(record))
+            continue
+        try:
+            batch.add(row_number, schemas.JobCreate.model_validate(record), lookups)
+        except ValidationError as e:
+            report(row_number, _format_validation_error(e))
+            continue
+        except ValueError as e:
+            report(row_number, str(e))
+            continue
+        if len(batch.jobs) >= batch_size:
+            flush(batch)
+            batch = _Batch()
+    flush(batch)
+
+    if result.created:
+        # Core inserts bypass the ORM events the snapshot listens to
+        planner_snapshot.invalidate_all()
+        resource_versions.bump("job")
+    return result
@@ -0,0 +1,270 @@
+"""Feasibility preview of an unsaved job: candidates, stock, conflicts and a trial assignment.
+
+Everything is computed from the cached planner snapshot and the stock
+ledger; nothing is written. The trial assignment is a small CP-SAT solve
+over the new job alone, with the candidates that are free and the stock
+that is projected to be on hand, while every other job keeps its current
+assignment (workers busy then are pruned via the availability index). A full planner run may still do better by moving other jobs.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.core.config import env_float
+from app.models.models import Job, Worker, worker__job
+from app.planner.models import PlannerInput, Job as PlannerJob, Stock as PlannerStock
+from app.planner.planner import compute_plan
+from app.planner.util import haversine_distances, naive_utc
+from app.services.availability_service import availability_cache
+from app.services.snapshot_cache import planner_snapshot
+from app.services.stock_ledger import stock_ledger
+
+PREVIEW_MAX_TIME_SECONDS = env_float("PREVIEW_MAX_TIME_SECONDS", 0.5)
+# Same cut-off as compute_plan: workers further away are never assigned
+MAX_WORKER_DISTANCE_KM = 200.0
+AVG_SPEED_KMH = 50.0
+
+PREVIEW_JOB_ID = "preview"
+
+
+def _conflicting_jobs(snapshot: PlannerInput, latitude: float, longitude: float,
+                      start: datetime, end: datetime) -> List[Dict]:
+    """
+    Jobs a worker of the new job could not also do: overlapping in time, or
+    with less time in between than the trip takes (as in build_conflict_pairs).
+    """
+    timed = [job for job in snapshot.jobs if job.start_datetime is not None and job.end_datetime is not None]
+    if not timed:
+        return []
+    starts = np.array([job.start_datetime.timestamp() for job in timed]) / 3600.0
+    ends = np.array([job.end_datetime.timestamp() for job in timed]) / 3600.0
+    travel = haversine_distances(
+        latitude, longitude,
+        np.array([job.latitude for job in timed], dtype=float),
+        np.array([job.longitude for job in timed], dtype=float)
+    ) / AVG_SPEED_KMH
+    new_start, new_end = start.timestamp() / 3600.0, end.timestamp() / 3600.0
+
+    overlap = (starts < new_end) & (ends > new_start)
+    reachable = (new_end + travel <= starts) | (ends + travel <= new_start)
+    return [
+        {
+            "job_id": timed[i].job_id,
+            "start_datetime": timed[i].start_datetime,
+            "end_datetime": timed[i].end_datetime,
+            "reason": "overlap" if overlap[i] else "travel",
+        }
+        for i in np.flatnonzero(overlap | ~reachable)
+    ]
+
+
+def _required(job: schemas.JobCreate, role_map: Dict[str, str]) -> Dict[str, int]:
+    unknown = [role_id for role_id in job.role_ids if role_id not in role_map]
+    if unknown:
+        raise ValueError(f"Unknown roles: {', '.join(unknown)}")
+    # Counted per role name, as the planner matches on names
+    required_roles: Dict[str, int] = {}
+    for role_id in dict.fromkeys(job.role_ids):
+        required_roles[role_map[role_id]] = required_roles.get(role_map[role_id], 0) + 1
+    return required_roles
+
+
+def preview_job(db: Session, job: schemas.JobCreate) -> schemas.JobPreview:
+    """
+    Check whether an unsaved job can be staffed and supplied.
+
+    Args:
+        db: Database session (read only)
+        job: Job as it would be submitted to POST /jobs
+
+    Returns:
+        Candidates per role, stock per item, conflicting jobs and a trial assignment
+
+    Raises:
+        ValueError: If the job has no valid time window or references unknown roles
+    """
+    if job.start_datetime is None or job.end_datetime is None:
+        raise ValueError("start_datetime and end_datetime are required for a preview")
+    # Same naive convention as the stored job times, before any comparison with them
+    job = job.model_copy(update={
+        "start_datetime": naive_utc(job.start_datetime),
+        "end_datetime": naive_utc(job.end_datetime),
+    })
+    if job.end_datetime <= job.start_datetime:
+        raise ValueError("end_datetime must be after start_datetime")
+
+    snapshot = planner_snapshot.get_planner_input(db)
+    role_map = planner_snapshot.get_role_map(db)
+    required_roles = _required(job, role_map)
+    required_items: Dict[str, int] = {}
+    for link in job.items:
+        required_items[link.item_id] = required_items.get(link.item_id, 0) + link.required_quantity
+
+    # === Conflicts and the workers they make unavailable ===
+    conflicts = _conflicting_jobs(snapshot, job.latitude, job.longitude, job.start_datetime, job.end_datetime)
+    conflict_ids = [conflict["job_id"] for conflict in conflicts]
+    assigned: Dict[str, List[str]] = {}
+    names: Dict[str, Optional[str]] = {}
+    if conflict_ids:
+        for job_id, worker_id in db.execute(
+            select(worker__job.c.job_id, worker__job.c.worker_id).where(worker__job.c.job_id.in_(conflict_ids))
+        ):
+            assigned.setdefault(job_id, []).append(worker_id)
+        names = dict(db.execute(select(Job.job_id, Job.job_name).where(Job.job_id.in_(conflict_ids))).all())
+    busy = {worker_id for worker_ids in assigned.values() for worker_id in worker_ids}
+    for conflict in conflicts:
+        conflict["job_name"] = names.get(conflict["job_id"])
+        conflict["worker_ids"] = sorted(assigned.get(conflict["job_id"], []))
+
+    # === Candidate workers per role, nearest first ===
+    pinned_workers = set(job.worker_ids)
+    workers = [w for w in snapshot.workers if w.roles or w.worker_id in pinned_workers]
+    distances = haversine_distances(
+        job.latitude, job.longitude,
+        np.array([w.latitude for w in workers], dtype=float),
+        np.array([w.longitude for w in workers], dtype=float)
+    ) if workers else np.empty(0)
+    in_reach = {
+        w.worker_id: round(float(distance), 3)
+        for w, distance in zip(workers, distances)
+        if distance < MAX_WORKER_DISTANCE_KM or w.worker_id in pinned_workers
+    }
+    worker_names = {}
+    if in_reach:
+        worker_names = {
+            worker_id: (first, last) for worker_id, first, last in db.execute(
+                select(Worker.worker_id, Worker.worker_first_name, Worker.worker_last_name)
+                .where(Worker.worker_id.in_(list(in_reach)))
+            )
+        }
+
+    name_to_id = {name: role_id for role_id, name in role_map.items()}
+    roles = []
+    for role_name, count in required_roles.items():
+        candidates = [
+            schemas.PreviewCandidate(
+                worker_id=w.worker_id,
+                worker_first_name=worker_names.get(w.worker_id, (None, None))[0],
+                worker_last_name=worker_names.get(w.worker_id, (None, None))[1],
+                branch_id=w.branch_id,
+                distance_km=in_reach[w.worker_id],
+                available=w.worker_id not in busy,
+                pinned=w.worker_id in pinned_workers,
+            )
+            for w in workers
+            if role_name in w.roles and w.worker_id in in_reach
+        ]
+        candidates.sort(key=lambda c: (not c.pinned, not c.available, c.distance_km, c.worker_id))
+        roles.append(schemas.PreviewRole(
+            role_id=name_to_id.get(role_name, role_name),
+            role_name=role_name,
+            required=count,
+            available=sum(1 for c in candidates if c.available),
+            candidates=candidates,
+        ))
+
+    # === Stock per item: projected on hand during the job, nearest first ===
+    items = []
+    trial_stocks = []
+    for item_id, quantity in required_items.items():
+        series = stock_ledger.series_for_item(db, item_id)
+        on_hand = {
+            branch_id: max(0, s.min_level(job.start_datetime, job.end_datetime))
+            for branch_id, s in series.items()
+        }
+        stocks = [s for s in snapshot.stocks if s.item_id == item_id]
+        stock_distances = haversine_distances(
+            job.latitude, job.longitude,
+            np.array([s.latitude for s in stocks], dtype=float),
+            np.array([s.longitude for s in stocks], dtype=float)
+        ) if stocks else np.empty(0)
+        entries = []
+        for stock, distance in sorted(zip(stocks, stock_distances), key=lambda pair: (pair[1], pair[0].stock_id)):
+            # Stock rows of the same branch share the branch's projected level
+            available = min(stock.quantity, on_hand.get(stock.branch_id, 0))
+            on_hand[stock.branch_id] = on_hand.get(stock.branch_id, 0) - available
+            entries.append(schemas.PreviewStock(
+                stock_id=stock.stock_id,
+                branch_id=stock.branch_id,
+                distance_km=round(float(distance), 3),
+                available=available,
+            ))
+            if available > 0:
+                trial_stocks.append(PlannerStock(
+                    stock_id=stock.stock_id, item_id=item_id, branch_id=stock.branch_id,
+                    latitude=stock.latitude, longitude=stock.longitude, quantity=available,
+                ))
+        items.append(schemas.PreviewItem(
+            item_id=item_id,
+            required=quantity,
+            available=sum(entry.available for entry in entries),
+            stocks=entries,
+        ))
+
+    # === Trial assignment: the new job alone against the current plan ===
+    free_workers = [
+        w for w in workers
+        if w.worker_id in pinned_workers
+        or (w.worker_id in in_reach and w.worker_id not in busy and required_roles.keys() & set(w.roles))
+    ]
+    pinned_stocks = {s.stock_id: s.assigned_quantity for s in job.stocks if s.assigned_quantity > 0}
+    # Pinned stock is kept even if none is projected to be on hand
+    trial_ids = {s.stock_id for s in trial_stocks}
+    trial_stocks += [
+        PlannerStock(stock_id=s.stock_id, item_id=s.item_id, branch_id=s.branch_id,
+                     latitude=s.latitude, longitude=s.longitude, quantity=0)
+        for s in snapshot.stocks if s.stock_id in pinned_stocks and s.stock_id not in trial_ids
+    ]
+    trial_job = PlannerJob(
+        job_id=PREVIEW_JOB_ID,
+        latitude=job.latitude,
+        longitude=job.longitude,
+        start_datetime=job.start_datetime,
+        end_datetime=job.end_datetime,
+        required_roles=required_roles,
+        required_items=required_items,
+        pinned_workers=[w.worker_id for w in free_workers if w.worker_id in pinned_workers],
+        pinned_stocks=pinned_stocks,
+    )
+    used_branches = {w.branch_id for w in free_workers} | {s.branch_id for s in trial_stocks}
+    trial_input = PlannerInput(
+        jobs=[trial_job],
+        workers=free_workers,
+        stocks=trial_stocks,
+        branches=[b for b in snapshot.branches if b.branch_id in used_branches],
+    )
+    # Empty hints: no warm start, and the planner's warm-start cache is left alone.
+    # The availability index holds committed assignments only, none of them
+    # to the unsaved job, so it prunes workers busy elsewhere during the window.
+    result = compute_plan(trial_input, max_time_seconds=PREVIEW_MAX_TIME_SECONDS, hints={},
+                          availability=availability_cache.index(db))
+    planned = result.get("jobs", {}).get(PREVIEW_JOB_ID, {"workers": [], "stocks": []})
+
+    planned_workers = set(planned["workers"])
+    stock_items = {s.stock_id: s.item_id for s in trial_stocks}
+    staffed = all(
+        sum(1 for w in free_workers if w.worker_id in planned_workers and role in w.roles) >= count
+        for role, count in required_roles.items()
+    )
+    supplied = all(
+        sum(s["quantity"] for s in planned["stocks"] if stock_items.get(s["stock_id"]) == item_id) >= quantity
+        for item_id, quantity in required_items.items()
+    )
+    assignment = schemas.PreviewAssignment(
+        status=result.get("status", "UNKNOWN"),
+        feasible=staffed and supplied,
+        workers=planned["workers"],
+        stocks=[schemas.SimulatedStockAssignment(**s) for s in planned["stocks"]],
+        solve_time=result.get("solve_time", 0.0),
+    )
+
+    return schemas.JobPreview(
+        roles=roles,
+        items=items,
+        conflicts=[schemas.PreviewConflict(**conflict) for conflict in conflicts],
+        assignment=assignment,
+    )
@@ -0,0 +1,159 @@
+"""Build `schemas.Job`-shaped dicts for job lists straight from projection queries.
+
+Validating thousands of nested ORM objects through pydantic dominates the
+latency of GET /jobs. Here every part of a page (jobs, workers with branch
+and roles, item links, roles) is fetched with one column query each and
+assembled into plain dicts with the same JSON shape as `schemas.Job`.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.models.models import Branch, Item, Job, JobItem, Role, Worker, job__role, worker__job, worker__role
+
+# Scalar job fields in `schemas.Job` order
+JOB_COLUMNS = (
+    "job_name", "job_description", "longitude", "latitude", "country", "city",
+    "house_number", "street", "postal_code", "start_datetime", "end_datetime", "job_id",
+)
+NESTED_FIELDS = ("workers", "item_links", "roles")
+JOB_FIELDS = JOB_COLUMNS + NESTED_FIELDS
+
+# Columns the keyset cursor needs, selected even when not requested
+_KEY_COLUMNS = ("start_datetime", "job_id")
+
+# Defaults of the `schemas.Item` stock fields, which nested items do not compute
+_NESTED_ITEM_DEFAULTS = {"total_stock": 0, "reserved_stock": 0, "free_stock": 0, "stock_by_branch": []}
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Parse a `?fields=` sparse fieldset into job fields in canonical order.
+
+    Raises:
+        ValueError: If a field is unknown
+    """
+    if not fields:
+        return JOB_FIELDS
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(JOB_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in JOB_FIELDS if field in requested)
+
+
+async def _roles_by_worker(db: AsyncSession, worker_ids: Sequence[str]) -> Dict[str, List[Dict]]:
+    result = await db.execute(
+        select(worker__role.c.worker_id, Role.role_name, Role.role_description, Role.role_id)
+        .join(Role, Role.role_id == worker__role.c.role_id)
+        .where(worker__role.c.worker_id.in_(worker_ids))
+    )
+    roles = defaultdict(list)
+    for worker_id, role_name, role_description, role_id in result:
+        roles[worker_id].append({"role_name": role_name, "role_description": role_description, "role_id": role_id})
+    return roles
+
+
+async def _workers_by_job(db: AsyncSession, job_ids: Sequence[str]) -> Dict[str, List[Dict]]:
+    result = await db.execute(
+        select(
+            worker__job.c.job_id, Worker.worker_id, Worker.worker_first_name, Worker.worker_last_name,
+            Worker.worker_phone_number, Worker.fk_branch_id,
+            Branch.branch_id, Branch.branch_name, Branch.latitude, Branch.longitude,
+        )
+        .join(Worker, Worker.worker_id == worker__job.c.worker_id)
+        .join(Branch, Branch.branch_id == Worker.fk_branch_id, isouter=True)
+        .where(worker__job.c.job_id.in_(job_ids))
+    )
+    rows = result.all()
+    roles = await _roles_by_worker(db, list({row.worker_id for row in rows})) if rows else {}
+
+    workers = defaultdict(list)
+    for row in rows:
+        branch = None
+        if row.branch_id is not None:
+            branch = {
+                "branch_id": row.branch_id, "branch_name": row.branch_name,
+                "latitude": row.latitude, "longitude": row.longitude,
+            }
+        workers[row.job_id].append({
+            "worker_id": row.worker_id,
+            "worker_first_name": row.worker_first_name,
+            "worker_last_name": row.worker_last_name,
+            "worker_phone_number": row.worker_phone_number,
+            "fk_branch_id": row.fk_branch_id,
+            "branch": branch,
+            "roles": roles.get(row.worker_id, []),
+        })
+    return workers
+
+
+async def _item_links_by_job(db: AsyncSession, job_ids: Sequence[str]) -> Dict[str, List[Dict]]:
+    result = await db.execute(
+        select(
+            JobItem.job_id, JobItem.item_id, JobItem.required_quantity,
+            Item.item_name, Item.item_description, Item.fk_branch_id,
+        )
+        .join(Item, Item.item_id == JobItem.item_id)
+        .where(JobItem.job_id.in_(job_ids))
+    )
+    links = defaultdict(list)
+    for job_id, item_id, required_quantity, item_name, item_description, fk_branch_id in result:
+        links[job_id].append({
+            "item_id": item_id,
+            "required_quantity": required_quantity,
+            "item": {
+                "item_name": item_name, "item_description": item_description,
+                "item_id": item_id, "fk_branch_id": fk_branch_id,
+                **_NESTED_ITEM_DEFAULTS,
+            },
+        })
+    return links
+
+
+async def _roles_by_job(db: AsyncSession, job_ids: Sequence[str]) -> Dict[str, List[Dict]]:
+    result = await db.execute(
+        select(job__role.c.job_id, Role.role_name, Role.role_description, Role.role_id)
+        .join(Role, Role.role_id == job__role.c.role_id)
+        .where(job__role.c.job_id.in_(job_ids))
+    )
+    roles = defaultdict(list)
+    for job_id, role_name, role_description, role_id in result:
+        roles[job_id].append({"role_name": role_name, "role_description": role_description, "role_id": role_id})
+    return roles
+
+
+async def fetch_job_rows(db: AsyncSession, query: Select, fields: Sequence[str] = JOB_FIELDS) -> List[Dict]:
+    """
+    Run a job query (filters, ordering and limit applied) as a projection.
+
+    Args:
+        db: Async database session
+        query: `select(Job)` with where/order_by/limit clauses
+        fields: Job fields to include, from `parse_fields`
+
+    Returns:
+        One dict per job with the requested fields, plus the cursor key columns
+    """
+    columns = [name for name in JOB_COLUMNS if name in fields or name in _KEY_COLUMNS]
+    result = await db.execute(query.with_only_columns(*(getattr(Job, name) for name in columns)))
+    rows = [dict(zip(columns, row)) for row in result]
+    if not rows:
+        return rows
+
+    job_ids = [row["job_id"] for row in rows]
+    loaders = {"workers": _workers_by_job, "item_links": _item_links_by_job, "roles": _roles_by_job}
+    for field, loader in loaders.items():
+        if field in fields:
+            nested = await loader(db, job_ids)
+            for row in rows:
+                row[field] = nested.get(row["job_id"], [])
+    return rows
+
+
+def select_fields(rows: List[Dict], fields: Sequence[str]) -> List[Dict]:
+    """Drop key columns that were only selected for the cursor and order keys like `schemas.Job`."""
+    return [{field: row[field] for field in fields} for row in rows]
@@ -0,0 +1,66 @@
+"""Reusable job filters and keyset ordering for list queries."""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.sql import Select
+
+from app.models.models import Job, JobItem, job__role, worker__job
+
+
+def apply_job_filters(query: Select,
+                      from_datetime: Optional[datetime] = None,
+                      to_datetime: Optional[datetime] = None,
+                      city: Optional[str] = None,
+                      assigned: Optional[bool] = None,
+                      role_id: Optional[str] = None,
+                      item_id: Optional[str] = None) -> Select:
+    """
+    Restrict a job query (the `filterJobs` capability).
+
+    Args:
+        from_datetime, to_datetime: Keep jobs whose time window overlaps this range
+        city: Exact city match
+        assigned: True = at least one worker assigned, False = none
+        role_id: Jobs requiring this role
+        item_id: Jobs requiring this item
+    """
+    if from_datetime is not None:
+        query = query.where(Job.end_datetime >= from_datetime)
+    if to_datetime is not None:
+        query = query.where(Job.start_datetime <= to_datetime)
+    if city is not None:
+        query = query.where(Job.city == city)
+    if assigned is not None:
+        has_workers = exists(select(worker__job.c.job_id).where(worker__job.c.job_id == Job.job_id))
+        query = query.where(has_workers if assigned else ~has_workers)
+    if role_id is not None:
+        query = query.where(exists(select(job__role.c.job_id).where(
+            job__role.c.job_id == Job.job_id, job__role.c.role_id == role_id
+        )))
+    if item_id is not None:
+        query = query.where(exists(select(JobItem.job_id).where(
+            JobItem.job_id == Job.job_id, JobItem.item_id == item_id
+        )))
+    return query
+
+
+def order_jobs_after(query: Select, start: Optional[datetime] = None,
+                     job_id: Optional[str] = None) -> Select:
+    """
+    Order jobs by (start_datetime, job_id) and continue after a keyset cursor.
+
+    Jobs without start time sort first, as SQLite orders NULLs first.
+    """
+    query = query.order_by(Job.start_datetime, Job.job_id)
+    if job_id is None:
+        return query
+    if start is None:
+        return query.where(or_(
+            and_(Job.start_datetime.is_(None), Job.job_id > job_id),
+            Job.start_datetime.is_not(None)
+        ))
+    return query.where(or_(
+        Job.start_datetime > start,
+        and_(Job.start_datetime == start, Job.job_id > job_id)
+    ))
@@ -0,0 +1,102 @@
+"""Pluggable async LLM clients for /ask.
+
+The provider is chosen with LLM_PROVIDER ("gemini" by default, "stub" for a
+local fake that needs no API key). One client is created per process and
+reused by every request. Tests can also override the `get_llm_client`
+dependency directly.
+"""
+import asyncio
+import os
+from typing import AsyncIterator, List, Optional, Protocol
+
+from app.core.config import env_float, env_str
+
+LLM_PROVIDER = env_str("LLM_PROVIDER", "gemini")
+GEMINI_MODEL = env_str("GEMINI_MODEL", "gemini-2.5-flash")
+
+# Simulated model behaviour of the stub client
+LLM_STUB_LATENCY_MS = env_float("LLM_STUB_LATENCY_MS", 0.0)
+LLM_STUB_TOKEN_DELAY_MS = env_float("LLM_STUB_TOKEN_DELAY_MS", 0.0)
+
+
+class LLMClient(Protocol):
+    async def generate(self, prompt: str) -> str:
+        """Return the model's answer to a complete prompt."""
+        ...
+
+    def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield the answer in pieces as the model produces them."""
+        ...
+
+
+class GeminiClient:
+    """Google Gemini through the async API of the google-genai SDK."""
+
+    def __init__(self, model: str = GEMINI_MODEL):
+        self.model = model
+        self._client = None
+
+    def _models(self):
+        # Created on first use so the app starts without an API key
+        if self._client is None:
+            from google import genai
+
+            api_key = os.getenv("UV_GOOGLE_API_KEY")
+            if not api_key:
+                raise ValueError("UV_GOOGLE_API_KEY not set in environment")
+            self._client = genai.Client(api_key=api_key)
+        return self._client.aio.models
+
+    async def generate(self, prompt: str) -> str:
+        response = await self._models().generate_content(model=self.model, contents=prompt)
+        return response.text if response and hasattr(response, 'text') else "No response from model."
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        async for chunk in await self._models().generate_content_stream(model=self.model, contents=prompt):
+            if chunk.text:
+                yield chunk.text
+
+
+class StubLLMClient:
+    """
+    Offline fake: answers with the size of the prompt it was given.
+
+    Args:
+        latency_ms: Delay before the first token, like a model round-trip
+        token_delay_ms: Delay between streamed tokens
+    """
+
+    def __init__(self, latency_ms: float = LLM_STUB_LATENCY_MS, token_delay_ms: float = LLM_STUB_TOKEN_DELAY_MS):
+        self.latency_ms = latency_ms
+        self.token_delay_ms = token_delay_ms
+        self.prompts: List[str] = []
+
+    def _answer(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return f"[stub] Received a prompt of {len(prompt)} characters."
+
+    async def generate(self, prompt: str) -> str:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self._answer(prompt)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        await asyncio.sleep(self.latency_ms / 1000)
+        for index, word in enumerate(self._answer(prompt).split(" ")):
+            if index:
+                await asyncio.sleep(self.token_delay_ms / 1000)
+            yield word if index == 0 else " " + word
+
+
+_CLIENTS = {"gemini": GeminiClient, "stub": StubLLMClient}
+_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """FastAPI dependency returning the process-wide LLM client."""
+    global _client
+    if _client is None:
+        try:
+            _client = _CLIENTS[LLM_PROVIDER]()
+        except KeyError:
+            raise ValueError(f"Unknown LLM_PROVIDER '{LLM_PROVIDER}' (expected one of {', '.join(_CLIENTS)})")
+    return _client
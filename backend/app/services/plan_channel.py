@@ -0,0 +1,95 @@
+"""In-memory channel that fans planner events out to streaming clients.
+
+Events carry a sequence number (the SSE event id). The most recent events
+are kept so a reconnecting client can resume after the last id it saw.
+"""
+import asyncio
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class PlanChannel:
+    """
+    Thread-safe publish/subscribe channel for planner progress events.
+
+    The planner publishes from its solver thread; subscribers are asyncio
+    queues owned by request handlers, so events are handed over with
+    `call_soon_threadsafe`. Slow subscribers lose their oldest events
+    instead of blocking the solver. Queues receive (sequence, event) pairs.
+    """
+
+    def __init__(self, max_queue_size: int = 100, replay_size: int = 200):
+        self._lock = threading.Lock()
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._latest: Optional[Dict] = None
+        self._max_queue_size = max_queue_size
+        self._sequence = 0
+        self._recent: Deque[Tuple[int, Dict]] = deque(maxlen=replay_size)
+
+    @property
+    def latest(self) -> Optional[Dict]:
+        """Most recently published event, if any."""
+        return self._latest
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the most recently published event (0 = none yet)."""
+        return self._sequence
+
+    def events_since(self, sequence: int) -> Optional[List[Tuple[int, Dict]]]:
+        """
+        Buffered events published after `sequence`.
+
+        Returns:
+            (sequence, event) pairs, or None if some of them were already
+            dropped from the buffer (the client has to resynchronize)
+        """
+        with self._lock:
+            if sequence == self._sequence:
+                return []
+            # Ids from before a restart are unknown, as are dropped ones
+            if sequence > self._sequence or not self._recent or self._recent[0][0] > sequence + 1:
+                return None
+            return [(seq, event) for seq, event in self._recent if seq > sequence]
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a queue on the running event loop that receives new events."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._max_queue_size)
+        with self._lock:
+            self._subscribers.append((loop, queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers = [(l, q) for l, q in self._subscribers if q is not queue]
+
+    def publish(self, event: Dict) -> None:
+        """Publish an event to every subscriber. Safe to call from any thread."""
+        with self._lock:
+            self._sequence += 1
+            entry = (self._sequence, event)
+            self._recent.append(entry)
+            self._latest = event
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, entry)
+            except RuntimeError:
+                # Event loop already closed; drop the stale subscriber
+                self.unsubscribe(queue)
+
+
+def _offer(queue: asyncio.Queue, entry: Tuple[int, Dict]) -> None:
+    """Put an event on a bounded queue, dropping the oldest one when full."""
+    if queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(entry)
+
+
+# Process-wide channel used by the planner service and the streaming endpoint
+plan_channel = PlanChannel()
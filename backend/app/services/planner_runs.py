@@ -0,0 +1,136 @@
+"""Registry of planner runs: state, timings, progress and cancellation.
+
+Every run of `_execute_planner` is registered here under its run id (the
+same id the plan channel events carry). The most recent
+PLANNER_RUN_HISTORY runs are kept in memory.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+from app.core.config import env_int
+
+PLANNER_RUN_HISTORY = env_int("PLANNER_RUN_HISTORY", 100)
+
+# Run states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class RunNotFoundError(KeyError):
+    """Raised when a run id is unknown (or no longer kept)."""
+
+
+class RunFinishedError(Exception):
+    """Raised when cancelling a run that has already finished."""
+
+
+@dataclass
+class PlannerRun:
+    run_id: str
+    max_time_seconds: float
+    state: str = QUEUED
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    jobs: int = 0
+    solver_status: Optional[str] = None
+    objective: Optional[float] = None
+    best_bound: Optional[float] = None
+    incumbents: int = 0
+    solve_time: Optional[float] = None
+    # Assignment changes of the run against the plan it started from
+    jobs_changed: int = 0
+    workers_added: int = 0
+    workers_removed: int = 0
+    stocks_changed: int = 0
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    stop_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return ((self.finished_at or datetime.now()) - self.started_at).total_seconds()
+
+    def start(self, jobs: int) -> None:
+        self.state = RUNNING
+        self.started_at = datetime.now()
+        self.jobs = jobs
+
+    def record_incumbent(self, incumbent: dict) -> None:
+        self.incumbents = incumbent.get("solution_index", self.incumbents + 1)
+        self.objective = incumbent.get("objective")
+        self.best_bound = incumbent.get("best_bound")
+
+    def record_changes(self, changes: List[dict]) -> None:
+        self.jobs_changed = len(changes)
+        self.workers_added = sum(len(change["workers_added"]) for change in changes)
+        self.workers_removed = sum(len(change["workers_removed"]) for change in changes)
+        self.stocks_changed = sum(len(change["stocks"]) for change in changes)
+
+    def finish(self, state: str, error: Optional[str] = None) -> None:
+        self.state = state
+        self.error = error
+        self.finished_at = datetime.now()
+
+
+class PlannerRunRegistry:
+    """Thread-safe, bounded registry of planner runs (newest last)."""
+
+    def __init__(self, history: int = PLANNER_RUN_HISTORY):
+        self.history = history
+        self._lock = threading.Lock()
+        self._runs: "OrderedDict[str, PlannerRun]" = OrderedDict()
+
+    def create(self, max_time_seconds: float) -> PlannerRun:
+        run = PlannerRun(run_id=uuid.uuid4().hex, max_time_seconds=max_time_seconds)
+        with self._lock:
+            self._runs[run.run_id] = run
+            # Drop the oldest finished runs beyond the history size
+            for run_id in [r.run_id for r in self._runs.values() if r.state in FINISHED_STATES]:
+                if len(self._runs) <= self.history:
+                    break
+                del self._runs[run_id]
+        return run
+
+    def get(self, run_id: str) -> PlannerRun:
+        with self._lock:
+            run = self._runs.get(run_id)
+        if run is None:
+            raise RunNotFoundError(run_id)
+        return run
+
+    def list(self, state: Optional[str] = None, limit: int = 20) -> List[PlannerRun]:
+        """Most recent runs first, optionally only those in `state`."""
+        with self._lock:
+            runs = list(reversed(self._runs.values()))
+        if state is not None:
+            runs = [run for run in runs if run.state == state]
+        return runs[:limit]
+
+    def cancel(self, run_id: str) -> PlannerRun:
+        """
+        Request cancellation: the search is stopped and nothing more is committed.
+
+        Raises:
+            RunNotFoundError: If the run is unknown
+            RunFinishedError: If the run has already finished
+        """
+        run = self.get(run_id)
+        if run.state in FINISHED_STATES:
+            raise RunFinishedError(f"Run {run_id} has already {run.state}")
+        run.cancel_requested = True
+        run.stop_event.set()
+        return run
+
+
+planner_runs = PlannerRunRegistry()
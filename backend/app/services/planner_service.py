@@ -1,32 +1,41 @@
 """Service layer for running the planner and updating database."""
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
 from sqlalchemy.orm import Session
 from datetime import datetime
 import threading
+import time
 
-from app.models.models import (
-    Job, Worker, Branch, Stock, Item, Role,
-    worker__job, job__stock, worker__role
-)
+from sqlalchemy import bindparam, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.models.models import worker__job, job__stock
 from app.planner.planner import compute_plan, format_for_database
-from app.planner.models import (
-    PlannerInput,
-    Job as PlannerJob,
-    Worker as PlannerWorker,
-    Stock as PlannerStock,
-    Branch as PlannerBranch
-)
+from app.planner.models import PlannerInput
 from app.core.database import SessionLocal
+from app.services.plan_channel import plan_channel
+from app.services.planner_runs import CANCELLED, FAILED, SUCCEEDED, PlannerRun, planner_runs
+from app.services.response_cache import resource_versions
+from app.services.snapshot_cache import invalidate_on_commit, planner_snapshot
+from app.services.stock_ledger import stock_ledger
+
+# Default throttle for committing intermediate solutions of background runs
+INCUMBENT_COMMIT_INTERVAL_SECONDS = 5.0
 
 
-def _run_planner_internal(max_time_seconds: float = 30.0, debug: bool = False) -> Dict:
+def _run_planner_internal(max_time_seconds: float = 30.0, debug: bool = False,
+                          commit_interval_seconds: Optional[float] = None,
+                          run: Optional[PlannerRun] = None) -> Dict:
     """
     Internal function that runs the planner with its own database session.
     Used by background thread.
     """
     db = SessionLocal()
     try:
-        return _execute_planner(db, max_time_seconds, debug)
+        return _execute_planner(db, max_time_seconds, debug, commit_interval_seconds, run)
+    except Exception as e:
+        # Nobody awaits the thread; the error is kept on the run instead
+        print(f"Planner run error: {e}")
+        return {"status": "ERROR", "message": str(e), "jobs": {}}
     finally:
         db.close()
 
@@ -36,10 +45,10 @@ def fetch_and_run_planner(db: Session, max_time_seconds: float = 30.0, debug: bo
     Fetch all data from database, run planner, and update assignments.
     
     Steps:
-    1. Fetch all workers, branches, items, stocks, jobs from DB
-    2. Convert to planner format
-    3. Run planner
-    4. Update worker__job and job__stock tables with results
+    1. Read workers, branches, stocks, jobs in planner format from the
+       snapshot cache (only entities changed since the last run are re-read)
+    2. Run planner
+    3. Update worker__job and job__stock tables with results
     
     Args:
         db: Database session
@@ -52,24 +61,30 @@ def fetch_and_run_planner(db: Session, max_time_seconds: float = 30.0, debug: bo
     return _execute_planner(db, max_time_seconds, debug)
 
 
-def fetch_and_run_planner_async(max_time_seconds: float = 30.0, debug: bool = False) -> Dict:
+def fetch_and_run_planner_async(max_time_seconds: float = 30.0, debug: bool = False,
+                                commit_interval_seconds: Optional[float] = INCUMBENT_COMMIT_INTERVAL_SECONDS) -> Dict:
     """
     Run planner in background thread and return immediately.
     
     This function starts the planner in a daemon thread and returns immediately
     without waiting for completion. Useful for API endpoints that need to respond quickly.
+    Improving solutions are published on the plan channel while the solver runs.
     
     Args:
         max_time_seconds: Max solver time
         debug: If True, print detailed logs to console
+        commit_interval_seconds: If set, commit improving incumbents to the
+            database at most this often (None = commit only the final plan)
     
     Returns:
-        Status dictionary indicating the planner was started
+        Status dictionary indicating the planner was started, with the run id
+        to follow it under GET /planner/runs/{run_id}
     """
+    run = planner_runs.create(max_time_seconds)
     # Start planner in background thread
     thread = threading.Thread(
         target=_run_planner_internal,
-        args=(max_time_seconds, debug),
+        args=(max_time_seconds, debug, commit_interval_seconds, run),
         daemon=True
     )
     thread.start()
@@ -77,11 +92,310 @@ def fetch_and_run_planner_async(max_time_seconds: float = 30.0, debug: bool = Fa
     return {
         "status": "STARTED",
         "message": "Planner started in background",
-        "thread_id": thread.ident
+        "thread_id": thread.ident,
+        "run_id": run.run_id
     }
 
 
-def _execute_planner(db: Session, max_time_seconds: float, debug: bool) -> Dict:
+# Serializes the read-diff-write of plan commits: concurrent runs (every job
+# write starts one) and their incumbent commits would otherwise insert the
+# same rows from stale reads
+_assignment_write_lock = threading.Lock()
+
+
+def _write_assignments(db: Session, job_ids: List[str], result: Dict,
+                       pinned: Optional[Set[Tuple[str, str, str]]] = None):
+    """
+    Replace the planner-owned worker__job and job__stock rows of the given jobs
+    with a plan result. Pinned rows are left untouched.
+    
+    Only the difference to the stored rows is written: rows the plan no
+    longer contains are deleted, new ones inserted and changed stock
+    quantities updated. Unchanged assignments (and the worker_schedule
+    rows derived from them) are not touched.
+    
+    Args:
+        pinned: ('worker', worker_id, job_id) / ('stock', stock_id, job_id) keys
+            that are already stored as pinned rows and must not be re-inserted
+    
+    Returns:
+        Tuple of (worker_job_records, job_stock_records) that were inserted
+    """
+    with _assignment_write_lock:
+        return _write_assignment_diff(db, job_ids, result, pinned or set())
+
+
+def _write_assignment_diff(db: Session, job_ids: List[str], result: Dict,
+                           pinned: Set[Tuple[str, str, str]]):
+    """Body of `_write_assignments`; the caller holds the write lock."""
+    worker_job_records, job_stock_records = format_for_database(result)
+    planned_workers = {
+        (r["worker_id"], r["job_id"]) for r in worker_job_records
+        if ('worker', r["worker_id"], r["job_id"]) not in pinned
+    }
+    planned_stocks = {
+        (r["stock_id"], r["job_id"]): r["assigned_quantity"] for r in job_stock_records
+        if ('stock', r["stock_id"], r["job_id"]) not in pinned
+    }
+    
+    # Current planner-owned rows of these jobs
+    stored_workers = set(db.execute(
+        select(worker__job.c.worker_id, worker__job.c.job_id)
+        .where(worker__job.c.job_id.in_(job_ids), worker__job.c.pinned.is_(False))
+    ).all())
+    stored_stocks = {
+        (stock_id, job_id): quantity for stock_id, job_id, quantity in db.execute(
+            select(job__stock.c.stock_id, job__stock.c.job_id, job__stock.c.assigned_quantity)
+            .where(job__stock.c.job_id.in_(job_ids), job__stock.c.pinned.is_(False))
+        )
+    }
+    
+    # Delete what the plan dropped
+    stale_workers = stored_workers - planned_workers
+    if stale_workers:
+        db.execute(
+            worker__job.delete().where(
+                worker__job.c.worker_id == bindparam("b_worker_id"),
+                worker__job.c.job_id == bindparam("b_job_id"),
+                worker__job.c.pinned.is_(False)
+            ),
+            [{"b_worker_id": worker_id, "b_job_id": job_id} for worker_id, job_id in stale_workers]
+        )
+    stale_stocks = stored_stocks.keys() - planned_stocks.keys()
+    if stale_stocks:
+        db.execute(
+            job__stock.delete().where(
+                job__stock.c.stock_id == bindparam("b_stock_id"),
+                job__stock.c.job_id == bindparam("b_job_id"),
+                job__stock.c.pinned.is_(False)
+            ),
+            [{"b_stock_id": stock_id, "b_job_id": job_id} for stock_id, job_id in stale_stocks]
+        )
+    changed_stocks = [
+        {"b_stock_id": stock_id, "b_job_id": job_id, "b_quantity": quantity}
+        for (stock_id, job_id), quantity in planned_stocks.items()
+        if (stock_id, job_id) in stored_stocks and stored_stocks[(stock_id, job_id)] != quantity
+    ]
+    if changed_stocks:
+        db.execute(
+            job__stock.update().where(
+                job__stock.c.stock_id == bindparam("b_stock_id"),
+                job__stock.c.job_id == bindparam("b_job_id"),
+                job__stock.c.pinned.is_(False)
+            ).values(assigned_quantity=bindparam("b_quantity")),
+            changed_stocks
+        )
+    
+    # Insert what is new
+    worker_job_records = [
+        {"worker_id": worker_id, "job_id": job_id}
+        for worker_id, job_id in planned_workers - stored_workers
+    ]
+    job_stock_records = [
+        {"job_id": job_id, "stock_id": stock_id, "assigned_quantity": quantity}
+        for (stock_id, job_id), quantity in planned_stocks.items()
+        if (stock_id, job_id) not in stored_stocks
+    ]
+    
+    # Rows written since the read (by another process) are kept, not
+    # duplicated; pinned rows are never overwritten
+    if worker_job_records:
+        db.execute(sqlite_insert(worker__job).on_conflict_do_nothing(), worker_job_records)
+    
+    if job_stock_records:
+        stock_insert = sqlite_insert(job__stock)
+        db.execute(
+            stock_insert.on_conflict_do_update(
+                index_elements=[job__stock.c.job_id, job__stock.c.stock_id],
+                set_={"assigned_quantity": stock_insert.excluded.assigned_quantity},
+                where=job__stock.c.pinned.is_(False)
+            ),
+            job_stock_records
+        )
+    
+    db.commit()
+    resource_versions.bump("plan")
+    return worker_job_records, job_stock_records
+
+
+def _assignment_state(db: Session, job_ids: List[str]) -> Dict[str, Dict]:
+    """Workers and stock quantities currently assigned to the given jobs."""
+    state: Dict[str, Dict] = {job_id: {"workers": set(), "stocks": {}} for job_id in job_ids}
+    for job_id, worker_id in db.execute(
+        select(worker__job.c.job_id, worker__job.c.worker_id).where(worker__job.c.job_id.in_(job_ids))
+    ):
+        state[job_id]["workers"].add(worker_id)
+    for job_id, stock_id, quantity in db.execute(
+        select(job__stock.c.job_id, job__stock.c.stock_id, job__stock.c.assigned_quantity)
+        .where(job__stock.c.job_id.in_(job_ids))
+    ):
+        state[job_id]["stocks"][stock_id] = quantity or 0
+    return state
+
+
+def assignment_diff(before: Dict[str, Dict], after: Dict[str, Dict]) -> List[Dict]:
+    """
+    Per-job changes between two `_assignment_state` results.
+
+    Returns:
+        One entry per changed job with added/removed workers and the new
+        quantity of every changed stock (0 = allocation removed)
+    """
+    changes = []
+    for job_id, new in after.items():
+        old = before.get(job_id, {"workers": set(), "stocks": {}})
+        stocks = {
+            stock_id: new["stocks"].get(stock_id, 0)
+            for stock_id in old["stocks"].keys() | new["stocks"].keys()
+            if old["stocks"].get(stock_id, 0) != new["stocks"].get(stock_id, 0)
+        }
+        added = sorted(new["workers"] - old["workers"])
+        removed = sorted(old["workers"] - new["workers"])
+        if added or removed or stocks:
+            changes.append({
+                "job_id": job_id,
+                "workers": sorted(new["workers"]),
+                "workers_added": added,
+                "workers_removed": removed,
+                "stocks": stocks,
+            })
+    return changes
+
+
+def _commit_plan(db: Session, run: PlannerRun, job_ids: List[str], result: Dict,
+                 pinned: Set[Tuple[str, str, str]], final: bool, baseline: Dict[str, Dict]):
+    """
+    Write a plan with `_write_assignments` and publish a `committed` event
+    with the per-job assignment changes.
+
+    Args:
+        baseline: Assignment state the run started from; the run's diff
+            counts are measured against it
+
+    Returns:
+        Tuple of (worker_job_records, job_stock_records) that were inserted
+    """
+    before = _assignment_state(db, job_ids)
+    records = _write_assignments(db, job_ids, result, pinned)
+    after = _assignment_state(db, job_ids)
+    changes = assignment_diff(before, after)
+    stock_ledger.apply_changes(changes)
+    run.record_changes(assignment_diff(baseline, after))
+    plan_channel.publish({
+        "type": "committed",
+        "run_id": run.run_id,
+        "final": final,
+        "objective": result.get("objective"),
+        "changes": changes,
+    })
+    return records
+
+
+def pinned_assignment_keys(planner_input: PlannerInput) -> Set[Tuple[str, str, str]]:
+    """Collect the pinned assignments of a planner input as warm-start style keys."""
+    pinned = set()
+    for job in planner_input.jobs:
+        for worker_id in job.pinned_workers:
+            pinned.add(('worker', worker_id, job.job_id))
+        for stock_id in job.pinned_stocks:
+            pinned.add(('stock', stock_id, job.job_id))
+    return pinned
+
+
+def set_pinned_assignments(db: Session, job_id: str, worker_ids: List[str],
+                           stocks: Optional[Dict[str, int]] = None) -> None:
+    """
+    Store dispatcher-chosen workers (and stock quantities) of a job as pinned rows.
+    
+    Previous pins of the job are replaced; planner rows for the same pairs are
+    taken over. Does not commit.
+    
+    Args:
+        db: Database session
+        job_id: Job to pin assignments for
+        worker_ids: Workers to pin
+        stocks: {stock_id: quantity} to pin
+    """
+    stocks = stocks or {}
+    db.execute(worker__job.delete().where(
+        worker__job.c.job_id == job_id,
+        worker__job.c.pinned | worker__job.c.worker_id.in_(worker_ids)
+    ))
+    db.execute(job__stock.delete().where(
+        job__stock.c.job_id == job_id,
+        job__stock.c.pinned | job__stock.c.stock_id.in_(list(stocks))
+    ))
+    if worker_ids:
+        db.execute(worker__job.insert(), [
+            {"worker_id": worker_id, "job_id": job_id, "pinned": True}
+            for worker_id in dict.fromkeys(worker_ids)
+        ])
+    if stocks:
+        db.execute(job__stock.insert(), [
+            {"job_id": job_id, "stock_id": stock_id, "assigned_quantity": qty, "pinned": True}
+            for stock_id, qty in stocks.items()
+        ])
+    # Applied by the after_commit listener, so a rollback leaves the snapshot alone
+    invalidate_on_commit(db, "job", job_id)
+
+
+def _make_incumbent_handler(run: PlannerRun, job_ids: List[str], pinned: Set[Tuple[str, str, str]],
+                            commit_interval_seconds: Optional[float], debug: bool,
+                            baseline: Dict[str, Dict]):
+    """
+    Build the solution callback for compute_plan.
+    
+    Every incumbent is published on the plan channel. If a commit interval is
+    given, incumbents are also written to the database (in a separate session,
+    since the callback runs on the solver thread) at most once per interval.
+    Nothing is committed once the run has been cancelled.
+    """
+    last_commit = time.monotonic()
+    
+    def on_solution(incumbent: Dict):
+        nonlocal last_commit
+        run.record_incumbent(incumbent)
+        plan_channel.publish({"type": "incumbent", "run_id": run.run_id, **incumbent})
+        
+        if commit_interval_seconds is None or run.cancel_requested:
+            return
+        now = time.monotonic()
+        if now - last_commit < commit_interval_seconds:
+            return
+        last_commit = now
+        
+        session = SessionLocal()
+        try:
+            _commit_plan(session, run, job_ids, incumbent, pinned, final=False, baseline=baseline)
+            if debug:
+                print(f"  → Committed incumbent #{incumbent['solution_index']} (objective {incumbent['objective']:.0f})")
+        except Exception as e:
+            session.rollback()
+            print(f"Incumbent commit error: {e}")
+        finally:
+            session.close()
+    
+    return on_solution
+
+
+def load_current_plan(db: Session) -> Dict:
+    """
+    Read the committed assignments in warm-start format for compute_plan hints.
+    
+    Returns:
+        Dictionary keyed by ('worker', worker_id, job_id) / ('stock', stock_id, job_id)
+    """
+    current_plan = {}
+    for row in db.execute(worker__job.select()):
+        current_plan[('worker', row.worker_id, row.job_id)] = 1
+    for row in db.execute(job__stock.select()):
+        current_plan[('stock', row.stock_id, row.job_id)] = row.assigned_quantity or 0
+    return current_plan
+
+
+def _execute_planner(db: Session, max_time_seconds: float, debug: bool,
+                     commit_interval_seconds: Optional[float] = None,
+                     run: Optional[PlannerRun] = None) -> Dict:
     """
     Core planner execution logic.
     
@@ -89,176 +403,104 @@ def _execute_planner(db: Session, max_time_seconds: float, debug: bool) -> Dict:
         db: Database session
         max_time_seconds: Max solver time
         debug: If True, print detailed logs to console
+        commit_interval_seconds: If set, throttle-commit improving incumbents
+        run: Registry entry to report to (a new one is registered if omitted)
     
     Returns:
         Planner result dictionary
     """
+    run = run or planner_runs.create(max_time_seconds)
+    try:
+        return _execute_run(db, run, max_time_seconds, debug, commit_interval_seconds)
+    except Exception as e:
+        run.finish(FAILED, error=str(e))
+        plan_channel.publish({"type": "failed", "run_id": run.run_id, "error": str(e)})
+        raise
+
+
+def _execute_run(db: Session, run: PlannerRun, max_time_seconds: float, debug: bool,
+                 commit_interval_seconds: Optional[float]) -> Dict:
+    """Steps of `_execute_planner` for a registered run."""
     start_time = datetime.now()
     if debug:
         print(f"\n{'='*60}")
         print(f"[PLANNER SERVICE] Started at {start_time.strftime('%H:%M:%S.%f')[:-3]}")
         print(f"{'='*60}")
     
-    # === Step 1: Fetch all data ===
+    # === Step 1: Read planner input from the snapshot cache ===
     if debug:
-        print("[STEP 1] Fetching data from database...")
+        print("[STEP 1] Reading planner snapshot (refreshing changed entities)...")
     
-    db_branches = db.query(Branch).all()
-    db_workers = db.query(Worker).all()
-    db_stocks = db.query(Stock).all()
-    db_jobs = db.query(Job).all()
-    db_roles = db.query(Role).all()
+    planner_input = planner_snapshot.get_planner_input(db)
     
     if debug:
-        print(f"  → Fetched {len(db_jobs)} jobs, {len(db_workers)} workers, {len(db_stocks)} stocks, {len(db_branches)} branches")
+        print(f"  → {len(planner_input.jobs)} jobs, {len(planner_input.workers)} workers, {len(planner_input.stocks)} stocks, {len(planner_input.branches)} branches")
     
-    if not db_jobs:
+    if not planner_input.jobs:
         if debug:
             print("[WARNING] No jobs to plan. Exiting.")
+        run.solver_status = "NO_JOBS"
+        run.finish(SUCCEEDED)
         return {
             "status": "NO_JOBS",
             "message": "No jobs to plan",
             "jobs": {}
         }
     
-    # === Step 2: Convert to planner format ===
-    if debug:
-        print("[STEP 2] Converting data to planner format...")
-    
-    # Build branch lookup
-    branch_map = {b.branch_id: b for b in db_branches}
-    
-    # Build role lookup (role_id -> role_name)
-    role_map = {r.role_id: r.role_name for r in db_roles}
-    
-    # Convert branches
-    planner_branches = [
-        PlannerBranch(
-            branch_id=b.branch_id,
-            latitude=b.latitude or 0.0,
-            longitude=b.longitude or 0.0
-        )
-        for b in db_branches
-    ]
-    
-    # Convert workers
-    planner_workers = []
-    for w in db_workers:
-        branch = branch_map.get(w.fk_branch_id)
-        if not branch:
-            continue
-        
-        # Get worker's role names from worker__role table
-        worker_role_ids = [
-            wr.role_id for wr in 
-            db.execute(worker__role.select().where(worker__role.c.worker_id == w.worker_id))
-        ]
-        worker_role_names = [role_map.get(rid, "") for rid in worker_role_ids if rid in role_map]
-        
-        planner_workers.append(
-            PlannerWorker(
-                worker_id=w.worker_id,
-                branch_id=w.fk_branch_id,
-                latitude=branch.latitude or 0.0,
-                longitude=branch.longitude or 0.0,
-                roles=worker_role_names
-            )
-        )
-    
-    # Convert stocks
-    planner_stocks = []
-    for s in db_stocks:
-        branch = branch_map.get(s.fk_branch_id)
-        if not branch:
-            continue
-        
-        planner_stocks.append(
-            PlannerStock(
-                stock_id=s.stock_id,
-                item_id=s.fk_item_id,
-                branch_id=s.fk_branch_id,
-                latitude=branch.latitude or 0.0,
-                longitude=branch.longitude or 0.0,
-                quantity=s.quantity
-            )
-        )
-    
-    # Convert jobs
-    planner_jobs = []
-    for j in db_jobs:
-        # Get required roles from job__role table
-        required_roles = {}
-        job_roles = db.execute(
-            db.query(Role.role_id, Role.role_name)
-            .join(Job.roles)
-            .filter(Job.job_id == j.job_id)
-        ).all()
-        for role_id, role_name in job_roles:
-            required_roles[role_name] = required_roles.get(role_name, 0) + 1
-        
-        # Get required items from job__item table
-        required_items = {}
-        for item_link in j.item_links:
-            item_id = item_link.item_id
-            quantity = item_link.required_quantity or 0
-            required_items[item_id] = required_items.get(item_id, 0) + quantity
-        
-        planner_jobs.append(
-            PlannerJob(
-                job_id=j.job_id,
-                latitude=j.latitude or 0.0,
-                longitude=j.longitude or 0.0,
-                start_datetime=j.start_datetime,
-                end_datetime=j.end_datetime,
-                required_roles=required_roles,
-                required_items=required_items
-            )
-        )
-    
-    # Create planner input
-    planner_input = PlannerInput(
-        jobs=planner_jobs,
-        workers=planner_workers,
-        stocks=planner_stocks,
-        branches=planner_branches
-    )
-    
-    if debug:
-        print(f"  → Converted {len(planner_jobs)} jobs, {len(planner_workers)} workers, {len(planner_stocks)} stocks")
-    
-    # === Step 3: Run planner ===
+    # === Step 2: Run planner ===
     if debug:
-        print(f"[STEP 3] Running OR-Tools CP-SAT solver (max {max_time_seconds}s)...")
+        print(f"[STEP 2] Running OR-Tools CP-SAT solver (max {max_time_seconds}s)...")
     planner_start_time = datetime.now()
     
-    result = compute_plan(planner_input, max_time_seconds=max_time_seconds)
+    job_ids = [j.job_id for j in planner_input.jobs]
+    pinned = pinned_assignment_keys(planner_input)
+    baseline = _assignment_state(db, job_ids)
+    run.start(len(job_ids))
+    plan_channel.publish({
+        "type": "started",
+        "run_id": run.run_id,
+        "jobs": len(job_ids),
+        "max_time_seconds": max_time_seconds,
+    })
+    on_solution = _make_incumbent_handler(run, job_ids, pinned, commit_interval_seconds, debug, baseline)
+    result = compute_plan(planner_input, max_time_seconds=max_time_seconds, on_solution=on_solution,
+                          stop_event=run.stop_event)
+    run.solver_status = result.get("status")
+    run.solve_time = result.get("solve_time")
     
     planner_end_time = datetime.now()
     solver_duration = (planner_end_time - planner_start_time).total_seconds()
     if debug:
         print(f"  → Solver completed in {solver_duration:.2f}s")
         print(f"  → Status: {result.get('status')}")
-        print(f"  → Jobs assigned: {len([j for j in result.get('jobs', {}).values() if j.get('workers')])}/{len(planner_jobs)}")
-    
-    # === Step 4: Update database tables ===
-    if debug:
-        print("[STEP 4] Updating database tables...")
-    
-    # Clear existing assignments (for all jobs)
-    job_ids = [j.job_id for j in db_jobs]
-    db.execute(worker__job.delete().where(worker__job.c.job_id.in_(job_ids)))
-    db.execute(job__stock.delete().where(job__stock.c.job_id.in_(job_ids)))
-    
-    # Insert new assignments
-    worker_job_records, job_stock_records = format_for_database(result)
-    
-    if worker_job_records:
-        db.execute(worker__job.insert(), worker_job_records)
+        print(f"  → Jobs assigned: {len([j for j in result.get('jobs', {}).values() if j.get('workers')])}/{len(planner_input.jobs)}")
     
-    if job_stock_records:
-        db.execute(job__stock.insert(), job_stock_records)
+    if run.cancel_requested:
+        # Cancelled runs commit nothing (earlier incumbent commits stay)
+        if debug:
+            print("[PLANNER SERVICE] Run cancelled, skipping commit")
+        run.finish(CANCELLED)
+        plan_channel.publish({"type": "cancelled", "run_id": run.run_id})
+        return result
     
-    db.commit()
+    # === Step 3: Update database tables ===
+    if debug:
+        print("[STEP 3] Updating database tables...")
+    
+    worker_job_records, job_stock_records = _commit_plan(db, run, job_ids, result, pinned, final=True,
+                                                         baseline=baseline)
+    if "objective" in result:
+        run.objective = result["objective"]
+    run.finish(SUCCEEDED)
+    
+    plan_channel.publish({
+        "type": "completed",
+        "run_id": run.run_id,
+        "status": result.get("status"),
+        "objective": result.get("objective"),
+        "solve_time": result.get("solve_time"),
+        "jobs": result.get("jobs", {})
+    })
     
     if debug:
         print(f"  → Inserted {len(worker_job_records)} worker assignments")
@@ -0,0 +1,157 @@
+"""Resource versions, ETags and an in-process cache for GET responses.
+
+Every mutation bumps the version of the resources it changed (after its
+commit). A GET route declares which resources its response is built from;
+the ETag is derived from the route, its query parameters and those
+versions. A matching `If-None-Match` is answered with 304 before the route
+touches the database, and unchanged responses are served from the cache.
+"""
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from pydantic import TypeAdapter
+
+from app.core.compression import ENCODINGS, encoded_etag
+from app.core.config import env_int
+from app.core.pagination import NEXT_CURSOR_HEADER
+
+# Resources with their own version counter. "plan" covers the worker and
+# stock assignments written by the planner.
+RESOURCES = ("job", "worker", "item", "role", "plan")
+
+RESPONSE_CACHE_MAX_ENTRIES = env_int("RESPONSE_CACHE_MAX_ENTRIES", 256)
+# Larger bodies are not cached (ETags still apply)
+RESPONSE_CACHE_MAX_BYTES = env_int("RESPONSE_CACHE_MAX_BYTES", 2 * 1024 * 1024)
+
+# Headers of a list/detail response that have to be replayed from the cache
+_CACHED_HEADERS = ("ETag", NEXT_CURSOR_HEADER)
+
+
+class ResourceVersions:
+    """Monotonic per-resource version counters (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {resource: 0 for resource in RESOURCES}
+        # Versions restart with the process; the epoch keeps old ETags from matching
+        self.epoch = uuid.uuid4().hex
+
+    def bump(self, *resources: str) -> None:
+        with self._lock:
+            for resource in resources:
+                self._versions[resource] += 1
+
+    def snapshot(self, resources: Tuple[str, ...]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions[resource] for resource in resources)
+
+
+class ResponseCache:
+    """Small LRU of serialized response bodies keyed by (route, params, versions)."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[bytes, Dict[str, str]]]" = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple, body: bytes, headers: Dict[str, str]) -> None:
+        if len(body) > RESPONSE_CACHE_MAX_BYTES or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (body, headers)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+resource_versions = ResourceVersions()
+response_cache = ResponseCache()
+
+
+def _etag_match(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """Return the If-None-Match entry matching `etag`, plain or with an encoding suffix."""
+    if not if_none_match:
+        return None
+    forms = {etag} | {encoded_etag(etag, encoding) for encoding in ENCODINGS}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate in forms:
+            return candidate
+    return None
+
+
+@dataclass
+class CachedView:
+    """Cache key and ETag of one GET request, resolved by `conditional_get`."""
+    key: Tuple
+    etag: str
+
+    def hit(self) -> Optional[Response]:
+        """The cached response for this request, if any."""
+        entry = response_cache.get(self.key)
+        if entry is None:
+            return None
+        body, headers = entry
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def store(self, adapter: TypeAdapter, content: Any, response: Response) -> Response:
+        """
+        Serialize `content` with the route's response model, cache and return it.
+
+        Args:
+            adapter: TypeAdapter of the route's response model
+            content: ORM objects or schema instances returned by the route
+            response: The route's response (its ETag / cursor headers are kept)
+        """
+        body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+        return self.store_body(body, response)
+
+    def store_body(self, body: bytes, response: Response) -> Response:
+        """Cache and return an already encoded JSON body."""
+        headers = {name: response.headers[name] for name in _CACHED_HEADERS if name in response.headers}
+        response_cache.put(self.key, body, headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+def conditional_get(*resources: str):
+    """
+    Dependency factory for cacheable GET routes.
+
+    Answers a matching `If-None-Match` with 304 (raised before the route
+    runs) and sets the ETag on the response otherwise.
+
+    Args:
+        resources: Resources (see RESOURCES) the response is built from
+    """
+    def dependency(request: Request, response: Response) -> CachedView:
+        key = (
+            request.url.path,
+            tuple(sorted(request.query_params.multi_items())),
+            resource_versions.snapshot(resources),
+        )
+        digest = hashlib.sha1(f"{resource_versions.epoch}:{key!r}".encode()).hexdigest()
+        etag = f'"{digest}"'
+        matched = _etag_match(request.headers.get("if-none-match"), etag)
+        if matched:
+            # Echo the form the client holds, so a compressed copy stays valid
+            raise HTTPException(status_code=304, headers={"ETag": matched})
+        response.headers["ETag"] = etag
+        return CachedView(key=key, etag=etag)
+
+    return dependency
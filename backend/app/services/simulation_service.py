@@ -0,0 +1,198 @@
+"""What-if planning: run the planner on a modified snapshot without committing."""
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
+
+from app import schemas
+from app.core.config import env_int
+from app.core.database import SessionLocal
+from app.planner.models import (
+    PlannerInput,
+    Job as PlannerJob,
+    Worker as PlannerWorker,
+    Stock as PlannerStock
+)
+from app.planner.planner import compute_plan
+from app.services.planner_service import load_current_plan
+from app.services.snapshot_cache import planner_snapshot
+
+# Concurrent scenarios (each CP-SAT solve uses several search workers itself)
+SIMULATION_MAX_WORKERS = env_int("SIMULATION_MAX_WORKERS", 2)
+# Scenarios allowed to wait for a free worker before new ones are rejected
+SIMULATION_MAX_PENDING = env_int("SIMULATION_MAX_PENDING", 8)
+SIMULATION_MAX_TIME_SECONDS = 30.0
+
+_executor = ThreadPoolExecutor(max_workers=SIMULATION_MAX_WORKERS, thread_name_prefix="simulation")
+_pending = threading.BoundedSemaphore(SIMULATION_MAX_PENDING)
+
+
+class SimulationBusyError(Exception):
+    """Raised when too many simulations are already queued."""
+
+
+class ScenarioError(ValueError):
+    """Raised when a scenario references unknown entities."""
+
+
+def submit_simulation(request: schemas.SimulationRequest) -> Future:
+    """
+    Queue a what-if scenario on the bounded simulation pool.
+
+    Returns:
+        Future resolving to a SimulationResult
+
+    Raises:
+        SimulationBusyError: if the pending queue is full
+    """
+    if not _pending.acquire(blocking=False):
+        raise SimulationBusyError("Too many simulations in progress")
+    future = _executor.submit(run_simulation, request)
+    future.add_done_callback(lambda _: _pending.release())
+    return future
+
+
+def run_simulation(request: schemas.SimulationRequest) -> schemas.SimulationResult:
+    """
+    Apply the scenario deltas to the planner snapshot and solve it.
+
+    The committed plan is used as solution hints so the result shows how the
+    current assignments would change. Nothing is written to the database.
+    """
+    db = SessionLocal()
+    try:
+        snapshot = planner_snapshot.get_planner_input(db)
+        role_map = planner_snapshot.get_role_map(db)
+        current_plan = load_current_plan(db)
+    finally:
+        db.close()
+
+    scenario_input = apply_scenario(snapshot, role_map, request)
+    max_time = min(request.max_time_seconds, SIMULATION_MAX_TIME_SECONDS)
+    result = compute_plan(scenario_input, max_time_seconds=max_time, hints=current_plan)
+
+    return _summarize(result, scenario_input, current_plan)
+
+
+def apply_scenario(snapshot: PlannerInput, role_map: Dict[str, str],
+                   request: schemas.SimulationRequest) -> PlannerInput:
+    """Return a new PlannerInput with the scenario deltas applied (snapshot is not modified)."""
+    branch_map = {b.branch_id: b for b in snapshot.branches}
+    offline = set(request.offline_branch_ids)
+
+    def branch_for(branch_id: str):
+        branch = branch_map.get(branch_id)
+        if branch is None:
+            raise ScenarioError(f"Unknown branch: {branch_id}")
+        return branch
+
+    def role_names(role_ids: List[str]) -> List[str]:
+        unknown = [rid for rid in role_ids if rid not in role_map]
+        if unknown:
+            raise ScenarioError(f"Unknown roles: {', '.join(unknown)}")
+        return [role_map[rid] for rid in role_ids]
+
+    # Jobs
+    jobs = {j.job_id: j for j in snapshot.jobs}
+    for job_id in request.remove_job_ids:
+        jobs.pop(job_id, None)
+    for job in request.jobs:
+        if job.start_datetime is None or job.end_datetime is None:
+            raise ScenarioError("Scenario jobs need start_datetime and end_datetime")
+        required_roles = {}
+        for name in role_names(job.role_ids):
+            required_roles[name] = required_roles.get(name, 0) + 1
+        required_items = {}
+        for link in job.items:
+            required_items[link.item_id] = required_items.get(link.item_id, 0) + link.required_quantity
+        job_id = job.job_id or f"scenario-{uuid.uuid4()}"
+        # A modified job keeps the dispatcher's pins (removed workers/stock are skipped by the planner)
+        existing = jobs.get(job_id)
+        jobs[job_id] = PlannerJob(
+            job_id=job_id,
+            latitude=job.latitude,
+            longitude=job.longitude,
+            start_datetime=job.start_datetime,
+            end_datetime=job.end_datetime,
+            required_roles=required_roles,
+            required_items=required_items,
+            pinned_workers=list(existing.pinned_workers) if existing else [],
+            pinned_stocks=dict(existing.pinned_stocks) if existing else {}
+        )
+
+    # Workers
+    workers = {w.worker_id: w for w in snapshot.workers}
+    for worker_id in request.remove_worker_ids:
+        workers.pop(worker_id, None)
+    for worker in request.workers:
+        branch = branch_for(worker.fk_branch_id)
+        worker_id = worker.worker_id or f"scenario-{uuid.uuid4()}"
+        workers[worker_id] = PlannerWorker(
+            worker_id=worker_id,
+            branch_id=branch.branch_id,
+            latitude=branch.latitude,
+            longitude=branch.longitude,
+            roles=role_names(worker.role_ids)
+        )
+
+    # Stocks
+    stocks = {s.stock_id: s for s in snapshot.stocks}
+    for stock_id in request.remove_stock_ids:
+        stocks.pop(stock_id, None)
+    for stock in request.stocks:
+        branch = branch_for(stock.fk_branch_id)
+        stock_id = stock.stock_id or f"scenario-{uuid.uuid4()}"
+        stocks[stock_id] = PlannerStock(
+            stock_id=stock_id,
+            item_id=stock.fk_item_id,
+            branch_id=branch.branch_id,
+            latitude=branch.latitude,
+            longitude=branch.longitude,
+            quantity=stock.quantity
+        )
+
+    return PlannerInput(
+        jobs=list(jobs.values()),
+        workers=[w for w in workers.values() if w.branch_id not in offline],
+        stocks=[s for s in stocks.values() if s.branch_id not in offline],
+        branches=[b for b in snapshot.branches if b.branch_id not in offline]
+    )
+
+
+def _summarize(result: Dict, scenario_input: PlannerInput, current_plan: Dict) -> schemas.SimulationResult:
+    """Turn a compute_plan result into a SimulationResult with per-job worker diffs."""
+    current_workers: Dict[str, set] = {}
+    for kind, entity_id, job_id in current_plan:
+        if kind == 'worker':
+            current_workers.setdefault(job_id, set()).add(entity_id)
+
+    simulated_jobs = []
+    unassigned = []
+    changed = 0
+    planned = result.get("jobs", {})
+    for job in scenario_input.jobs:
+        assignment = planned.get(job.job_id, {"workers": [], "stocks": []})
+        new_workers = set(assignment["workers"])
+        old_workers = current_workers.get(job.job_id, set())
+        if not new_workers:
+            unassigned.append(job.job_id)
+        if new_workers != old_workers:
+            changed += 1
+        simulated_jobs.append(schemas.SimulatedJob(
+            job_id=job.job_id,
+            workers=assignment["workers"],
+            stocks=[schemas.SimulatedStockAssignment(**s) for s in assignment["stocks"]],
+            added_workers=sorted(new_workers - old_workers),
+            removed_workers=sorted(old_workers - new_workers)
+        ))
+
+    return schemas.SimulationResult(
+        status=result.get("status", "UNKNOWN"),
+        objective=result.get("objective"),
+        solve_time=result.get("solve_time", 0.0),
+        total_jobs=len(scenario_input.jobs),
+        jobs_assigned=len(scenario_input.jobs) - len(unassigned),
+        jobs_changed=changed,
+        unassigned_job_ids=unassigned,
+        jobs=simulated_jobs
+    )
@@ -0,0 +1,305 @@
+"""Process-wide cache of the planner input, kept current by change invalidation."""
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.models.models import (
+    Job, Worker, Branch, Stock, Role, JobItem,
+    job__role, worker__role, worker__job, job__stock
+)
+from app.planner.models import (
+    PlannerInput,
+    Job as PlannerJob,
+    Worker as PlannerWorker,
+    Stock as PlannerStock,
+    Branch as PlannerBranch
+)
+
+# Entity kinds in refresh order: later kinds depend on earlier ones
+KINDS = ("role", "branch", "worker", "stock", "job")
+
+# Maps ORM classes to (kind, function returning the affected entity id)
+_TRACKED = {
+    Role: ("role", lambda o: o.role_id),
+    Branch: ("branch", lambda o: o.branch_id),
+    Worker: ("worker", lambda o: o.worker_id),
+    Stock: ("stock", lambda o: o.stock_id),
+    Job: ("job", lambda o: o.job_id),
+    JobItem: ("job", lambda o: o.job_id),
+}
+
+
+class PlannerSnapshotCache:
+    """
+    In-memory copy of branches, roles, workers, stocks and jobs in planner form.
+
+    The full data set is loaded on first use. Afterwards writes only mark
+    entity IDs as stale (see `invalidate`), and the next read reloads just
+    those rows. Cached planner objects are shared between readers and must be
+    treated as immutable.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._roles: Dict[str, str] = {}  # role_id -> role_name
+        self._branches: Dict[str, PlannerBranch] = {}
+        self._workers: Dict[str, PlannerWorker] = {}
+        self._stocks: Dict[str, PlannerStock] = {}
+        self._jobs: Dict[str, PlannerJob] = {}
+        self._stale: Dict[str, Set[str]] = {kind: set() for kind in KINDS}
+
+    def invalidate(self, kind: str, entity_id: str) -> None:
+        """Mark one entity as changed; it is reloaded on the next read."""
+        with self._lock:
+            if self._loaded:
+                self._stale[kind].add(entity_id)
+
+    def invalidate_all(self) -> None:
+        """Drop everything; the next read performs a full load."""
+        with self._lock:
+            self._loaded = False
+            for ids in self._stale.values():
+                ids.clear()
+
+    def get_planner_input(self, db: Session) -> PlannerInput:
+        """Return the current planner input, refreshing stale entities from the database."""
+        with self._lock:
+            self._sync(db)
+            return PlannerInput(
+                jobs=list(self._jobs.values()),
+                workers=list(self._workers.values()),
+                stocks=list(self._stocks.values()),
+                branches=list(self._branches.values())
+            )
+
+    def get_role_map(self, db: Session) -> Dict[str, str]:
+        """Return role_id -> role_name."""
+        with self._lock:
+            self._sync(db)
+            return dict(self._roles)
+
+    def _sync(self, db: Session) -> None:
+        if not self._loaded:
+            self._load_all(db)
+            return
+        refreshers = {
+            "role": self._refresh_roles,
+            "branch": self._refresh_branches,
+            "worker": self._refresh_workers,
+            "stock": self._refresh_stocks,
+            "job": self._refresh_jobs,
+        }
+        for kind in KINDS:
+            ids = self._stale[kind]
+            if ids:
+                self._stale[kind] = set()
+                refreshers[kind](db, ids)
+
+    def _load_all(self, db: Session) -> None:
+        self._roles = {r.role_id: r.role_name for r in db.query(Role).all()}
+        self._branches = {b.branch_id: b for b in _load_branches(db)}
+        self._workers = {w.worker_id: w for w in _load_workers(db, self._branches, self._roles)}
+        self._stocks = {s.stock_id: s for s in _load_stocks(db, self._branches)}
+        self._jobs = {j.job_id: j for j in _load_jobs(db, self._roles)}
+        for ids in self._stale.values():
+            ids.clear()
+        self._loaded = True
+
+    def _refresh_roles(self, db: Session, ids: Set[str]) -> None:
+        rows = db.query(Role).filter(Role.role_id.in_(ids)).all()
+        for role_id in ids:
+            self._roles.pop(role_id, None)
+        self._roles.update({r.role_id: r.role_name for r in rows})
+        # Planner workers and jobs refer to roles by name
+        self._stale["worker"].update(self._workers)
+        self._stale["job"].update(self._jobs)
+
+    def _refresh_branches(self, db: Session, ids: Set[str]) -> None:
+        fresh = {b.branch_id: b for b in _load_branches(db, ids)}
+        _replace(self._branches, ids, fresh)
+        # Workers and stocks carry their branch coordinates
+        self._stale["worker"].update(w.worker_id for w in self._workers.values() if w.branch_id in ids)
+        self._stale["stock"].update(s.stock_id for s in self._stocks.values() if s.branch_id in ids)
+
+    def _refresh_workers(self, db: Session, ids: Set[str]) -> None:
+        fresh = {w.worker_id: w for w in _load_workers(db, self._branches, self._roles, ids)}
+        _replace(self._workers, ids, fresh)
+
+    def _refresh_stocks(self, db: Session, ids: Set[str]) -> None:
+        fresh = {s.stock_id: s for s in _load_stocks(db, self._branches, ids)}
+        _replace(self._stocks, ids, fresh)
+
+    def _refresh_jobs(self, db: Session, ids: Set[str]) -> None:
+        fresh = {j.job_id: j for j in _load_jobs(db, self._roles, ids)}
+        _replace(self._jobs, ids, fresh)
+
+
+def _replace(target: Dict, ids: Iterable[str], fresh: Dict) -> None:
+    """Drop `ids` from `target` and insert the freshly loaded entries (deleted rows stay gone)."""
+    for entity_id in ids:
+        target.pop(entity_id, None)
+    target.update(fresh)
+
+
+def _load_branches(db: Session, ids: Optional[Set[str]] = None) -> List[PlannerBranch]:
+    query = db.query(Branch.branch_id, Branch.latitude, Branch.longitude)
+    if ids is not None:
+        query = query.filter(Branch.branch_id.in_(ids))
+    return [
+        PlannerBranch(branch_id=branch_id, latitude=lat or 0.0, longitude=lon or 0.0)
+        for branch_id, lat, lon in query
+    ]
+
+
+def _load_workers(db: Session, branches: Dict[str, PlannerBranch], roles: Dict[str, str],
+                  ids: Optional[Set[str]] = None) -> List[PlannerWorker]:
+    worker_query = db.query(Worker.worker_id, Worker.fk_branch_id)
+    role_query = select(worker__role.c.worker_id, worker__role.c.role_id)
+    if ids is not None:
+        worker_query = worker_query.filter(Worker.worker_id.in_(ids))
+        role_query = role_query.where(worker__role.c.worker_id.in_(ids))
+
+    worker_roles: Dict[str, List[str]] = {}
+    for worker_id, role_id in db.execute(role_query):
+        if role_id in roles:
+            worker_roles.setdefault(worker_id, []).append(roles[role_id])
+
+    planner_workers = []
+    for worker_id, branch_id in worker_query:
+        branch = branches.get(branch_id)
+        if not branch:
+            continue
+        planner_workers.append(
+            PlannerWorker(
+                worker_id=worker_id,
+                branch_id=branch_id,
+                latitude=branch.latitude,
+                longitude=branch.longitude,
+                roles=worker_roles.get(worker_id, [])
+            )
+        )
+    return planner_workers
+
+
+def _load_stocks(db: Session, branches: Dict[str, PlannerBranch],
+                 ids: Optional[Set[str]] = None) -> List[PlannerStock]:
+    query = db.query(Stock.stock_id, Stock.fk_item_id, Stock.fk_branch_id, Stock.quantity)
+    if ids is not None:
+        query = query.filter(Stock.stock_id.in_(ids))
+
+    planner_stocks = []
+    for stock_id, item_id, branch_id, quantity in query:
+        branch = branches.get(branch_id)
+        if not branch:
+            continue
+        planner_stocks.append(
+            PlannerStock(
+                stock_id=stock_id,
+                item_id=item_id,
+                branch_id=branch_id,
+                latitude=branch.latitude,
+                longitude=branch.longitude,
+                quantity=quantity
+            )
+        )
+    return planner_stocks
+
+
+def _load_jobs(db: Session, roles: Dict[str, str],
+               ids: Optional[Set[str]] = None) -> List[PlannerJob]:
+    job_query = db.query(Job.job_id, Job.latitude, Job.longitude, Job.start_datetime, Job.end_datetime)
+    role_query = select(job__role.c.job_id, job__role.c.role_id)
+    item_query = db.query(JobItem.job_id, JobItem.item_id, JobItem.required_quantity)
+    pinned_worker_query = select(worker__job.c.job_id, worker__job.c.worker_id).where(worker__job.c.pinned)
+    pinned_stock_query = select(
+        job__stock.c.job_id, job__stock.c.stock_id, job__stock.c.assigned_quantity
+    ).where(job__stock.c.pinned)
+    if ids is not None:
+        job_query = job_query.filter(Job.job_id.in_(ids))
+        role_query = role_query.where(job__role.c.job_id.in_(ids))
+        item_query = item_query.filter(JobItem.job_id.in_(ids))
+        pinned_worker_query = pinned_worker_query.where(worker__job.c.job_id.in_(ids))
+        pinned_stock_query = pinned_stock_query.where(job__stock.c.job_id.in_(ids))
+
+    # Required roles are counted per role name, as the planner matches on names
+    required_roles: Dict[str, Dict[str, int]] = {}
+    for job_id, role_id in db.execute(role_query):
+        if role_id in roles:
+            counts = required_roles.setdefault(job_id, {})
+            counts[roles[role_id]] = counts.get(roles[role_id], 0) + 1
+
+    required_items: Dict[str, Dict[str, int]] = {}
+    for job_id, item_id, quantity in item_query:
+        counts = required_items.setdefault(job_id, {})
+        counts[item_id] = counts.get(item_id, 0) + (quantity or 0)
+
+    pinned_workers: Dict[str, List[str]] = {}
+    for job_id, worker_id in db.execute(pinned_worker_query):
+        pinned_workers.setdefault(job_id, []).append(worker_id)
+
+    pinned_stocks: Dict[str, Dict[str, int]] = {}
+    for job_id, stock_id, quantity in db.execute(pinned_stock_query):
+        pinned_stocks.setdefault(job_id, {})[stock_id] = quantity or 0
+
+    return [
+        PlannerJob(
+            job_id=job_id,
+            latitude=lat or 0.0,
+            longitude=lon or 0.0,
+            start_datetime=start,
+            end_datetime=end,
+            required_roles=required_roles.get(job_id, {}),
+            required_items=required_items.get(job_id, {}),
+            pinned_workers=pinned_workers.get(job_id, []),
+            pinned_stocks=pinned_stocks.get(job_id, {})
+        )
+        for job_id, lat, lon, start, end in job_query
+    ]
+
+
+# Process-wide snapshot used by the planner service and simulations
+planner_snapshot = PlannerSnapshotCache()
+
+
+# === Change tracking on ORM sessions ===
+# Entities written in a flush are collected on the session and only
+# invalidated once the transaction commits, so rollbacks leave the cache alone.
+
+_PENDING_KEY = "planner_snapshot_pending"
+
+
+# Only column changes of these matter; their collections are back-references
+_SCALAR_ONLY = (Role, Branch)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    dirty = [
+        obj for obj in session.dirty
+        if not isinstance(obj, _SCALAR_ONLY) or session.is_modified(obj, include_collections=False)
+    ]
+    for obj in (*session.new, *dirty, *session.deleted):
+        tracked = _TRACKED.get(type(obj))
+        if tracked:
+            kind, get_id = tracked
+            pending.add((kind, get_id(obj)))
+
+
+def invalidate_on_commit(session: Session, kind: str, entity_id: str) -> None:
+    """Queue an invalidation for writes the ORM does not see (Core statements)."""
+    session.info.setdefault(_PENDING_KEY, set()).add((kind, entity_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session: Session) -> None:
+    for kind, entity_id in session.info.pop(_PENDING_KEY, ()):
+        planner_snapshot.invalidate(kind, entity_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changes(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
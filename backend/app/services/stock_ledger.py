@@ -0,0 +1,260 @@
+"""Time-phased stock ledger: projected on-hand quantity per (branch, item).
+
+Stock allocated to a job (job__stock) leaves its branch when the job starts
+and is back when the job ends. For every (branch, item) the ledger keeps the
+times at which the on-hand quantity changes and the quantity from each of
+those times on, as sorted cumulative arrays, so the level at a time is one
+binary search and the lowest level over a window one slice.
+
+The ledger is loaded once and then updated incrementally on planner commits
+(`apply_changes`, only the touched series are rebuilt). Job and item
+changes (new jobs, dates, deletions, pins) reload it. Allocations of jobs
+without dates count as out at all times.
+"""
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.models import Branch, Job, Stock, job__stock
+from app.planner.util import naive_utc
+from app.services.response_cache import resource_versions
+
+# "plan" last: planner commits are applied incrementally, see apply_changes
+_DEPENDS_ON = ("job", "item", "plan")
+
+SeriesKey = Tuple[str, str]  # (branch_id, item_id)
+
+
+def _datetime64(value: datetime) -> np.datetime64:
+    # numpy would drop an offset silently (with a warning); convert explicitly
+    return np.datetime64(naive_utc(value), "us")
+
+
+class StockSeries:
+    """
+    On-hand quantity of one item at one branch over time.
+
+    Args:
+        quantity: Stock of the item at the branch
+        allocations: (job_id, stock_id) -> allocated quantity
+        job_dates: job_id -> (start, end)
+    """
+
+    def __init__(self, quantity: int, allocations: Dict[Tuple[str, str], int],
+                 job_dates: Dict[str, Tuple[Optional[datetime], Optional[datetime]]]):
+        self.quantity = quantity
+        self.allocations = allocations
+
+        undated = 0
+        times, deltas = [], []
+        for (job_id, _), allocated in allocations.items():
+            start, end = job_dates.get(job_id, (None, None))
+            if start is None or end is None:
+                undated += allocated
+                continue
+            times += [start, end]
+            deltas += [-allocated, allocated]
+
+        # Level before the first change
+        self.base = quantity - undated
+        if not times:
+            self.times = np.empty(0, dtype="datetime64[us]")
+            self.levels = np.empty(0, dtype=np.int64)
+            return
+        times = np.array(times, dtype="datetime64[us]")
+        deltas = np.array(deltas, dtype=np.int64)
+        order = np.argsort(times, kind="stable")
+        times, deltas = times[order], deltas[order]
+        # One entry per distinct time: the level once all changes at that time are applied
+        self.times, first = np.unique(times, return_index=True)
+        self.levels = self.base + np.add.reduceat(deltas, first).cumsum()
+
+    def level_at(self, at: datetime) -> int:
+        i = int(np.searchsorted(self.times, _datetime64(at), side="right")) - 1
+        return int(self.levels[i]) if i >= 0 else self.base
+
+    def _window(self, start: datetime, end: datetime) -> slice:
+        """Changes strictly after `start` and before `end`."""
+        return slice(int(np.searchsorted(self.times, _datetime64(start), side="right")),
+                     int(np.searchsorted(self.times, _datetime64(end), side="left")))
+
+    def min_level(self, start: datetime, end: datetime) -> int:
+        """Lowest on-hand quantity during [start, end)."""
+        window = self.levels[self._window(start, end)]
+        level = self.level_at(start)
+        return min(level, int(window.min())) if window.size else level
+
+    def steps(self, start: datetime, end: datetime) -> List[Tuple[datetime, int]]:
+        """(time, on-hand from then on) at `start` and at every change before `end`."""
+        window = self._window(start, end)
+        return [(start, self.level_at(start))] + [
+            (at.item(), int(level)) for at, level in zip(self.times[window], self.levels[window])
+        ]
+
+
+class StockLedger:
+    """Process-wide projected stock levels, reloaded when jobs or items change."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key: Optional[Tuple[int, ...]] = None
+        self._series: Dict[SeriesKey, StockSeries] = {}
+        self._stocks: Dict[str, SeriesKey] = {}
+        self._jobs: Dict[str, Tuple[Optional[datetime], Optional[datetime]]] = {}
+        self._branch_names: Dict[str, Optional[str]] = {}
+
+    @staticmethod
+    def _load(db: Session):
+        branch_names = dict(db.execute(select(Branch.branch_id, Branch.branch_name)).all())
+        stocks: Dict[str, SeriesKey] = {}
+        quantities: Dict[SeriesKey, int] = {}
+        for stock_id, branch_id, item_id, quantity in db.execute(
+            select(Stock.stock_id, Stock.fk_branch_id, Stock.fk_item_id, Stock.quantity)
+        ):
+            stocks[stock_id] = (branch_id, item_id)
+            quantities[(branch_id, item_id)] = quantities.get((branch_id, item_id), 0) + (quantity or 0)
+
+        jobs = {}
+        allocations: Dict[SeriesKey, Dict[Tuple[str, str], int]] = {key: {} for key in quantities}
+        for job_id, stock_id, allocated, start, end in db.execute(
+            select(job__stock.c.job_id, job__stock.c.stock_id, job__stock.c.assigned_quantity,
+                   Job.start_datetime, Job.end_datetime)
+            .join(Job, Job.job_id == job__stock.c.job_id)
+        ):
+            jobs[job_id] = (start, end)
+            if stock_id in stocks and allocated:
+                allocations[stocks[stock_id]][(job_id, stock_id)] = allocated
+        # Dates of jobs without allocations yet, for planner commits that add some
+        jobs.update({
+            job_id: (start, end)
+            for job_id, start, end in db.execute(select(Job.job_id, Job.start_datetime, Job.end_datetime))
+            if job_id not in jobs
+        })
+
+        series = {key: StockSeries(quantities[key], allocations[key], jobs) for key in quantities}
+        return series, stocks, jobs, branch_names
+
+    def _ensure(self, db: Session) -> None:
+        key = resource_versions.snapshot(_DEPENDS_ON)
+        with self._lock:
+            if self._key == key:
+                return
+        series, stocks, jobs, branch_names = self._load(db)
+        with self._lock:
+            self._key = key
+            self._series, self._stocks, self._jobs, self._branch_names = series, stocks, jobs, branch_names
+
+    def apply_changes(self, changes: Iterable[Dict]) -> None:
+        """
+        Apply the stock part of a committed plan (`assignment_diff` entries).
+
+        Only valid right after that commit's plan version bump: if anything
+        else changed in between, the ledger is reloaded on next use instead.
+        """
+        current = resource_versions.snapshot(_DEPENDS_ON)
+        with self._lock:
+            if self._key is None or self._key == current:
+                return
+            if self._key != current[:-1] + (current[-1] - 1,):
+                self._key = None
+                return
+
+            updated: Dict[SeriesKey, Dict[Tuple[str, str], int]] = {}
+            for change in changes:
+                job_id = change["job_id"]
+                for stock_id, allocated in change["stocks"].items():
+                    key = self._stocks.get(stock_id)
+                    if key is None or job_id not in self._jobs:
+                        self._key = None
+                        return
+                    allocations = updated.setdefault(key, dict(self._series[key].allocations))
+                    if allocated:
+                        allocations[(job_id, stock_id)] = allocated
+                    else:
+                        allocations.pop((job_id, stock_id), None)
+
+            # Series are replaced, never mutated, so readers need no lock
+            series = dict(self._series)
+            for key, allocations in updated.items():
+                series[key] = StockSeries(series[key].quantity, allocations, self._jobs)
+            self._series = series
+            self._key = current
+
+    def series_for_item(self, db: Session, item_id: str) -> Dict[str, StockSeries]:
+        """branch_id -> series of the item at every branch that stocks it."""
+        self._ensure(db)
+        return {branch_id: series for (branch_id, key_item), series in self._series.items() if key_item == item_id}
+
+    def branch_name(self, branch_id: str) -> Optional[str]:
+        return self._branch_names.get(branch_id)
+
+
+stock_ledger = StockLedger()
+
+
+def item_availability(db: Session, item_id: str, start: datetime, end: datetime,
+                      branch_id: Optional[str] = None) -> List[Dict]:
+    """
+    Projected on-hand quantity of an item per branch over [start, end).
+
+    Returns:
+        One dict per branch (`schemas.BranchStockProjection` fields), ordered by branch id
+    """
+    start, end = naive_utc(start), naive_utc(end)
+    if end <= start:
+        raise ValueError("to_datetime must be after from_datetime")
+    branches = stock_ledger.series_for_item(db, item_id)
+    return [
+        {
+            "branch_id": key,
+            "branch_name": stock_ledger.branch_name(key),
+            "quantity": series.quantity,
+            "min_on_hand": series.min_level(start, end),
+            "levels": [{"at": at, "on_hand": level} for at, level in series.steps(start, end)],
+        }
+        for key, series in sorted(branches.items())
+        if branch_id is None or key == branch_id
+    ]
+
+
+def check_shortages(db: Session, start: datetime, end: datetime, required_items: Dict[str, int],
+                    branch_ids: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Items a job in [start, end) would be short of, given current allocations.
+
+    An item's available quantity is, summed over branches, the lowest
+    projected on-hand quantity during the window. This is a pre-check: the
+    planner may still move allocations of other jobs to cover a job.
+
+    Args:
+        db: Database session
+        start, end: Time window of the job
+        required_items: item_id -> required quantity
+        branch_ids: Only count stock at these branches (default: all)
+
+    Returns:
+        One dict per short item: {"item_id", "required", "available", "shortage"}
+    """
+    start, end = naive_utc(start), naive_utc(end)
+    if end <= start:
+        raise ValueError("end_datetime must be after start_datetime")
+    branch_ids = set(branch_ids) if branch_ids is not None else None
+    shortages = []
+    for item_id, required in required_items.items():
+        available = sum(
+            max(0, series.min_level(start, end))
+            for branch_id, series in stock_ledger.series_for_item(db, item_id).items()
+            if branch_ids is None or branch_id in branch_ids
+        )
+        if available < required:
+            shortages.append({
+                "item_id": item_id,
+                "required": required,
+                "available": available,
+                "shortage": required - available,
+            })
+    return shortages
@@ -0,0 +1,69 @@
+"""Aggregated stock figures per item: totals, per-branch breakdown, reserved vs. free."""
+from typing import Dict, Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Branch, Stock, job__stock
+
+
+def stock_by_branch_query(item_ids: Iterable[str]):
+    # Reserved units per stock row, as assigned to jobs by the planner or pinned
+    reserved = (
+        select(
+            job__stock.c.stock_id,
+            func.coalesce(func.sum(job__stock.c.assigned_quantity), 0).label("reserved"),
+        )
+        .group_by(job__stock.c.stock_id)
+        .subquery()
+    )
+    return (
+        select(
+            Stock.fk_item_id,
+            Stock.fk_branch_id,
+            Branch.branch_name,
+            func.sum(Stock.quantity).label("quantity"),
+            func.coalesce(func.sum(reserved.c.reserved), 0).label("reserved"),
+        )
+        .join(Branch, Branch.branch_id == Stock.fk_branch_id, isouter=True)
+        .join(reserved, reserved.c.stock_id == Stock.stock_id, isouter=True)
+        .where(Stock.fk_item_id.in_(list(item_ids)))
+        .group_by(Stock.fk_item_id, Stock.fk_branch_id, Branch.branch_name)
+        .order_by(Stock.fk_item_id, Stock.fk_branch_id)
+    )
+
+
+async def load_stock_summaries(db: AsyncSession, item_ids: Iterable[str]) -> Dict[str, Dict]:
+    """
+    Stock figures for a set of items in a single GROUP BY query.
+
+    Args:
+        db: Async database session
+        item_ids: Items to summarize (typically one page of /items)
+
+    Returns:
+        Dict item_id -> {"total_stock", "reserved_stock", "free_stock", "stock_by_branch"};
+        items without stock are absent
+    """
+    item_ids = list(item_ids)
+    if not item_ids:
+        return {}
+
+    summaries: Dict[str, Dict] = {}
+    result = await db.execute(stock_by_branch_query(item_ids))
+    for item_id, branch_id, branch_name, quantity, reserved in result:
+        summary = summaries.setdefault(item_id, {
+            "total_stock": 0, "reserved_stock": 0, "free_stock": 0, "stock_by_branch": []
+        })
+        free = max(0, quantity - reserved)
+        summary["total_stock"] += quantity
+        summary["reserved_stock"] += reserved
+        summary["free_stock"] += free
+        summary["stock_by_branch"].append({
+            "branch_id": branch_id,
+            "branch_name": branch_name,
+            "quantity": quantity,
+            "reserved": reserved,
+            "free": free,
+        })
+    return summaries
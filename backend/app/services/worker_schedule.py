@@ -0,0 +1,56 @@
+"""Reads of the materialized per-worker schedule.
+
+`worker_schedule` holds one row per worker assignment with the job fields a
+calendar needs. It is created and kept in sync by triggers (migration 5 in
+app/core/migrations.py), so a worker's schedule for a time window is a
+single range scan of the (worker_id, start_datetime) index instead of joins
+over job, worker__job and the job's relationships.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import Boolean, Column, DateTime, Float, MetaData, String, Table, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Not part of Base.metadata: the table and its triggers come from the migration
+worker_schedule = Table(
+    "worker_schedule",
+    MetaData(),
+    Column("worker_id", String(36), nullable=False),
+    Column("job_id", String(36), nullable=False),
+    Column("start_datetime", DateTime),
+    Column("end_datetime", DateTime),
+    Column("job_name", String),
+    Column("city", String),
+    Column("street", String),
+    Column("house_number", String),
+    Column("postal_code", String),
+    Column("latitude", Float),
+    Column("longitude", Float),
+    Column("pinned", Boolean, nullable=False, default=False),
+)
+
+_ENTRY_COLUMNS = tuple(column for column in worker_schedule.c if column.name != "worker_id")
+
+
+async def fetch_schedule(db: AsyncSession, worker_id: str, from_datetime: Optional[datetime] = None,
+                         to_datetime: Optional[datetime] = None) -> List[Dict]:
+    """
+    Assignments of a worker ordered by start time.
+
+    Args:
+        db: Async database session
+        worker_id: Worker to read the schedule of
+        from_datetime: Only jobs starting at or after this time
+        to_datetime: Only jobs starting before this time
+
+    Returns:
+        One dict per assignment (`schemas.ScheduleEntry` fields)
+    """
+    query = select(*_ENTRY_COLUMNS).where(worker_schedule.c.worker_id == worker_id)
+    if from_datetime is not None:
+        query = query.where(worker_schedule.c.start_datetime >= from_datetime)
+    if to_datetime is not None:
+        query = query.where(worker_schedule.c.start_datetime < to_datetime)
+    result = await db.execute(query.order_by(worker_schedule.c.start_datetime, worker_schedule.c.job_id))
+    return [dict(row._mapping) for row in result]
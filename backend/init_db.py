@@ -1,20 +1,29 @@
+import argparse
 import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
 from app.core.database import Base, engine
+from app.core.migrations import run_migrations
 from app.models import models
 from seed.seed import seed_database
 
-def init_db():
+def init_db(seed: bool = True, run_planner: bool = True):
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
     print("Database initialized successfully!")
     
+    if not seed:
+        return
     print("\nSeeding database with initial data...")
-    seed_database()
+    seed_database(run_planner=run_planner)
     print("Database seeding completed!")
 
 if __name__ == "__main__":
-    init_db()
+    parser = argparse.ArgumentParser(description="Create the database schema and seed initial data.")
+    parser.add_argument("--no-seed", action="store_true", help="only create tables and apply migrations")
+    parser.add_argument("--no-plan", action="store_true", help="seed without the initial planner run")
+    args = parser.parse_args()
+    init_db(seed=not args.no_seed, run_planner=not args.no_plan)
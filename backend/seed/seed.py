@@ -10,8 +10,13 @@ from seed.stocks_seed import seed_stocks
 from seed.jobs_seed import seed_jobs, seed_job_items
 
 
-def seed_database():
-    """Seed all tables with initial data in correct dependency order"""
+def seed_database(run_planner: bool = True):
+    """
+    Seed all tables with initial data in correct dependency order.
+
+    Args:
+        run_planner: Assign workers and stock to the seeded jobs with a full planner run
+    """
     db = SessionLocal()
     
     try:
@@ -86,9 +91,10 @@ def seed_database():
         print("="*60)
         
         # 6. Run planner to assign workers to jobs
-        print("\nRunning planner to assign workers to jobs...")
-        fetch_and_run_planner(db, debug=True)
-        print("Planner completed successfully!")
+        if run_planner:
+            print("\nRunning planner to assign workers to jobs...")
+            fetch_and_run_planner(db, debug=True)
+            print("Planner completed successfully!")
         
     except Exception as e:
         print(f"\nError seeding database: {e}")
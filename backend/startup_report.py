@@ -0,0 +1,94 @@
+"""Startup report: import times of the app and time until the API answers.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter and
+lists the slowest imports, then starts uvicorn and measures the time until
+GET /health answers.
+
+    python startup_report.py [--top 20] [--no-serve]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Imported on first use only; seeing them at startup is a regression
+LAZY_MODULES = ("ortools", "google.genai", "pandas")
+
+READINESS_TIMEOUT_SECONDS = 30.0
+
+
+def import_times() -> List[Tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) of every module imported by `import app.main`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        env={**os.environ, "SEED_ON_STARTUP": "0"},
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def time_to_ready() -> float:
+    """Seconds from launching uvicorn until GET /health returns 200."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env={**os.environ, "SEED_ON_STARTUP": "0"},
+    )
+    try:
+        while time.perf_counter() - started < READINESS_TIMEOUT_SECONDS:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"API not ready after {READINESS_TIMEOUT_SECONDS}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=20, help="number of slowest imports to list")
+    parser.add_argument("--no-serve", action="store_true", help="skip the uvicorn readiness check")
+    args = parser.parse_args()
+
+    rows = import_times()
+    total = next(cumulative for name, _, cumulative in rows if name == "app.main")
+    print(f"import app.main: {total / 1000:.0f} ms, {len(rows)} modules\n")
+
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name}")
+
+    imported = {name for name, _, _ in rows}
+    eager = [module for module in LAZY_MODULES if module in imported]
+    print()
+    if eager:
+        print(f"WARNING: imported at startup but meant to be lazy: {', '.join(eager)}")
+    else:
+        print(f"Not imported at startup: {', '.join(LAZY_MODULES)}")
+
+    if not args.no_serve:
+        print(f"Ready (uvicorn start to GET /health): {time_to_ready() * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
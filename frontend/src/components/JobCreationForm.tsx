@@ -26,7 +26,7 @@ import { LocalizationProvider } from '@mui/x-date-pickers/LocalizationProvider';
 import { AdapterDayjs } from '@mui/x-date-pickers/AdapterDayjs';
 import { DateTimePicker } from '@mui/x-date-pickers/DateTimePicker';
 import dayjs, { Dayjs } from 'dayjs';
-import { fetchRoles, fetchItems, createItem, createRole, createJob, updateJob, fetchJob, type Role, type Item } from '../services/api';
+import { fetchRoles, fetchItems, createItem, createRole, createJob, previewJob, updateJob, fetchJob, type Role, type Item } from '../services/api';
 import { useNavigate } from 'react-router-dom';
 
 const libraries: ("places")[] = ["places"];
@@ -76,7 +76,7 @@ const JobCreationForm: React.FC<JobCreationFormProps> = ({ jobId }) => {
     const [newRoleDesc, setNewRoleDesc] = useState('');
 
     // Feedback state
-    const [snackbar, setSnackbar] = useState<{ open: boolean; message: string; severity: 'success' | 'error' }>({
+    const [snackbar, setSnackbar] = useState<{ open: boolean; message: string; severity: 'success' | 'warning' | 'error' }>({
         open: false,
         message: '',
         severity: 'success'
@@ -273,8 +273,20 @@ const JobCreationForm: React.FC<JobCreationFormProps> = ({ jobId }) => {
                 await updateJob(jobId, jobData);
                 showSnackbar("Job updated successfully!", "success");
             } else {
+                // Advisory only: the job is created either way
+                let note = '';
+                if (jobData.end_datetime) {
+                    try {
+                        const preview = await previewJob(jobData);
+                        if (!preview.assignment.feasible) {
+                            note = ' It cannot be fully staffed or supplied with the current plan.';
+                        }
+                    } catch (error) {
+                        console.error("Failed to preview job", error);
+                    }
+                }
                 await createJob(jobData);
-                showSnackbar("Job created successfully!", "success");
+                showSnackbar(`Job created successfully!${note}`, note ? "warning" : "success");
                 // Reset form only on create
                 setJobName('');
                 setDescription('');
@@ -298,7 +310,7 @@ const JobCreationForm: React.FC<JobCreationFormProps> = ({ jobId }) => {
         }
     };
 
-    const showSnackbar = (message: string, severity: 'success' | 'error') => {
+    const showSnackbar = (message: string, severity: 'success' | 'warning' | 'error') => {
         setSnackbar({ open: true, message, severity });
     };
 
@@ -3,13 +3,13 @@ import { Box, Paper, Typography, Grid, IconButton, Card, CardContent } from '@mu
 import { ChevronLeft, ChevronRight, AccessTime, LocationOn } from '@mui/icons-material';
 import dayjs from 'dayjs';
 import isoWeek from 'dayjs/plugin/isoWeek';
-import type { Job } from '../services/api';
+import type { ScheduleEntry } from '../services/api';
 import { useNavigate } from 'react-router-dom';
 
 dayjs.extend(isoWeek);
 
 interface WorkerCalendarProps {
-    jobs: Job[];
+    jobs: ScheduleEntry[];
 }
 
 const WorkerCalendar: React.FC<WorkerCalendarProps> = ({ jobs }) => {
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Link as RouterLink } from 'react-router-dom';
-import { fetchJobs, fetchWorkers, askAI, type Job, type Worker } from '../services/api';
+import { fetchJobs, fetchDashboardSummary, askAIStream, type DashboardSummary, type Job } from '../services/api';
 import dayjs from 'dayjs';
 import {
     Box,
@@ -33,17 +33,17 @@ const Dashboard: React.FC = () => {
     const [aiAnswer, setAiAnswer] = useState<string>('');
     const [isAiLoading, setIsAiLoading] = useState(false);
     const [jobs, setJobs] = useState<Job[]>([]);
-    const [workers, setWorkers] = useState<Worker[]>([]);
+    const [summary, setSummary] = useState<DashboardSummary | null>(null);
 
     useEffect(() => {
         const loadData = async () => {
             try {
-                const [jobsData, workersData] = await Promise.all([
+                const [jobsData, summaryData] = await Promise.all([
                     fetchJobs(),
-                    fetchWorkers()
+                    fetchDashboardSummary()
                 ]);
                 setJobs(jobsData);
-                setWorkers(workersData);
+                setSummary(summaryData);
             } catch (error) {
                 console.error("Failed to load dashboard data", error);
             }
@@ -57,39 +57,13 @@ const Dashboard: React.FC = () => {
 
         setIsAiLoading(true);
         
-        // Build page context from current state
-        const pageContext = JSON.stringify({
-            totalJobs: jobs.length,
-            totalWorkers: workers.length,
-            activeWorkers: activeWorkersCount,
-            unassignedJobs: unassignedJobsCount,
-            upcomingJobs: upcomingJobs.map(j => ({
-                name: j.job_name,
-                time: j.start_datetime,
-                workers: j.workers?.map(w => `${w.worker_first_name} ${w.worker_last_name}`).join(', ') || 'Unassigned'
-            })),
-            jobs: jobs.map(j => ({
-                id: j.job_id,
-                name: j.job_name,
-                location: `${j.street || ''} ${j.city || ''}`.trim(),
-                startTime: j.start_datetime,
-                assignedWorkers: j.workers?.length || 0,
-                roles: j.roles?.map(r => r.role_name).join(', ') || 'None'
-            })),
-            workers: workers.map(w => ({
-                id: w.worker_id,
-                name: `${w.worker_first_name || ''} ${w.worker_last_name || ''}`.trim(),
-                branch: w.branch?.branch_name || 'Unknown',
-                roles: w.roles?.map(r => r.role_name).join(', ') || 'None'
-            }))
-        }, null, 2);
-
         try {
-            const response = await askAI({
-                pageContext,
+            // The backend builds the data context for the question itself
+            setAiAnswer('');
+            await askAIStream({
+                pageContext: 'dashboard',
                 question: aiInput
-            });
-            setAiAnswer(response.answer);
+            }, setAiAnswer);
             setAiInput('');
         } catch (error) {
             console.error('AI request failed:', error);
@@ -99,18 +73,13 @@ const Dashboard: React.FC = () => {
         }
     };
 
-    // Filter and sort upcoming jobs
-    const upcomingJobs = jobs
-        .filter(job => job.start_datetime && dayjs(job.start_datetime).isAfter(dayjs()))
-        .sort((a, b) => dayjs(a.start_datetime).diff(dayjs(b.start_datetime)))
-        .slice(0, 3);
-
-    // Calculate overall assignment status
-    const unassignedJobsCount = jobs.filter(job => !job.workers || job.workers.length === 0).length;
-    const allJobsAssigned = jobs.length > 0 && unassignedJobsCount === 0;
-
-    // Calculate active workers (assigned to at least one job)
-    const activeWorkersCount = new Set(jobs.flatMap(job => job.workers ? job.workers.map(w => w.worker_id) : [])).size;
+    // KPIs are computed by the backend (GET /dashboard/summary)
+    const upcomingJobs = summary?.upcoming_jobs ?? [];
+    const unassignedJobsCount = summary?.unassigned_jobs ?? 0;
+    const totalJobsCount = summary?.total_jobs ?? 0;
+    const allJobsAssigned = totalJobsCount > 0 && unassignedJobsCount === 0;
+    const activeWorkersCount = summary?.active_workers ?? 0;
+    const totalWorkersCount = summary?.total_workers ?? 0;
 
     return (
         <Box sx={{ height: '100vh', display: 'flex', flexDirection: 'column', p: 3, color: 'var(--text)', overflow: 'hidden' }}>
@@ -157,9 +126,9 @@ const Dashboard: React.FC = () => {
             {/* Stats Cards */}
             <Grid container spacing={2} sx={{ mb: 2, flexShrink: 0 }}>
                 {[
-                    { title: 'Active Fleet', value: `${activeWorkersCount}/${workers.length}`, icon: <LocalShipping />, color: 'var(--primary)' },
+                    { title: 'Active Fleet', value: `${activeWorkersCount}/${totalWorkersCount}`, icon: <LocalShipping />, color: 'var(--primary)' },
                     { title: 'On-Time Rate', value: '98.5%', icon: <CheckCircle />, color: 'var(--success)' },
-                    { title: 'Pending Jobs', value: `${jobs.length}`, icon: <AccessTime />, color: 'var(--warning)' },
+                    { title: 'Pending Jobs', value: `${totalJobsCount}`, icon: <AccessTime />, color: 'var(--warning)' },
                     { title: 'Fuel Efficiency', value: '+12%', icon: <TrendingUp />, color: 'var(--info)' },
                 ].map((stat, index) => (
                     <Grid size={{ xs: 12, sm: 6, md: 3 }} key={index}>
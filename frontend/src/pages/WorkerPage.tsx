@@ -1,15 +1,15 @@
 import React, { useEffect, useState } from 'react'
 import { Typography, Box, Card, CardContent, Link as MuiLink, Stack, Chip } from '@mui/material'
 import { useParams, Link } from 'react-router-dom';
-import { fetchJobsByWorkerId, fetchWorker } from '../services/api';
-import type { Job, Worker } from '../services/api';
+import { fetchWorkerSchedule, fetchWorker } from '../services/api';
+import type { ScheduleEntry, Worker } from '../services/api';
 import WorkerCalendar from '../components/WorkerCalendar';
 
 const WorkerPage: React.FC = () => {
 
   const { id } = useParams<{ id: string }>();
   const [worker, setWorker] = useState<Worker | null>(null);
-  const [jobs, setJobs] = useState<Job[]>([]);
+  const [jobs, setJobs] = useState<ScheduleEntry[]>([]);
 
   useEffect(() => {
     if (id) {
@@ -29,8 +29,8 @@ const WorkerPage: React.FC = () => {
 
   const loadJobsByWorkerId = async (workerId: string) => {
     try {
-      const data = await fetchJobsByWorkerId(workerId);
-      // Sort jobs by start_datetime
+      const data = await fetchWorkerSchedule(workerId);
+      // Jobs without a start time last
       const sortedJobs = data.sort((a, b) => {
         if (!a.start_datetime) return 1;
         if (!b.start_datetime) return -1;
@@ -23,12 +23,27 @@ export interface Worker {
     roles?: Role[];
 }
 
+export interface AvailableWorker extends Worker {
+    distance_km?: number | null;
+}
+
+export interface ItemBranchStock {
+    branch_id: string;
+    branch_name?: string;
+    quantity: number;
+    reserved: number;
+    free: number;
+}
+
 export interface Item {
     item_id: string;
     item_name?: string;
     item_description?: string;
     fk_branch_id?: string;
     total_stock?: number;
+    reserved_stock?: number;
+    free_stock?: number;
+    stock_by_branch?: ItemBranchStock[];
 }
 
 export interface Role {
@@ -93,6 +108,45 @@ export const fetchJobsByWorkerId = async (workerId: string): Promise<Job[]> => {
     return response.data;
 };
 
+export interface ScheduleEntry {
+    job_id: string;
+    job_name?: string;
+    start_datetime?: string;
+    end_datetime?: string;
+    city?: string;
+    street?: string;
+    house_number?: string;
+    postal_code?: string;
+    latitude?: number;
+    longitude?: number;
+    pinned: boolean;
+}
+
+// Jobs of a worker ordered by start; optionally only those starting in [from, to)
+export const fetchWorkerSchedule = async (workerId: string, from?: string, to?: string): Promise<ScheduleEntry[]> => {
+    const response = await api.get(`/workers/${workerId}/schedule`, {
+        params: { from_datetime: from, to_datetime: to }
+    });
+    return response.data;
+};
+
+export const fetchAvailableWorkers = async (
+    from: string,
+    to: string,
+    filters: { roleId?: string; branchId?: string; radiusKm?: number } = {}
+): Promise<AvailableWorker[]> => {
+    const response = await api.get('/workers/available', {
+        params: {
+            from_datetime: from,
+            to_datetime: to,
+            role_id: filters.roleId,
+            branch_id: filters.branchId,
+            radius_km: filters.radiusKm,
+        }
+    });
+    return response.data;
+};
+
 export const fetchItems = async (): Promise<Item[]> => {
     const response = await api.get('/items');
     return response.data;
@@ -103,6 +157,39 @@ export const fetchItem = async (itemId: string): Promise<Item> => {
     return response.data;
 };
 
+export interface StockLevel {
+    at: string;
+    on_hand: number;
+}
+
+export interface BranchStockProjection {
+    branch_id: string;
+    branch_name?: string | null;
+    quantity: number;
+    min_on_hand: number;
+    levels: StockLevel[];
+}
+
+export interface ItemAvailability {
+    item_id: string;
+    from_datetime: string;
+    to_datetime: string;
+    min_available: number;
+    branches: BranchStockProjection[];
+}
+
+export const fetchItemAvailability = async (
+    itemId: string,
+    from?: string,
+    to?: string,
+    branchId?: string
+): Promise<ItemAvailability> => {
+    const response = await api.get(`/items/${itemId}/availability`, {
+        params: { from_datetime: from, to_datetime: to, branch_id: branchId }
+    });
+    return response.data;
+};
+
 export const fetchJobsByItemId = async (itemId: string): Promise<Job[]> => {
     const response = await api.get(`/item/${itemId}/jobs`);
     return response.data;
@@ -138,6 +225,65 @@ export const createJob = async (job: JobCreate) => {
     return response.data;
 };
 
+export interface PreviewCandidate {
+    worker_id: string;
+    worker_first_name?: string | null;
+    worker_last_name?: string | null;
+    branch_id?: string | null;
+    distance_km: number;
+    available: boolean;
+    pinned: boolean;
+}
+
+export interface PreviewRole {
+    role_id: string;
+    role_name: string;
+    required: number;
+    available: number;
+    candidates: PreviewCandidate[];
+}
+
+export interface PreviewStock {
+    stock_id: string;
+    branch_id: string;
+    distance_km: number;
+    available: number;
+}
+
+export interface PreviewItem {
+    item_id: string;
+    required: number;
+    available: number;
+    stocks: PreviewStock[];
+}
+
+export interface PreviewConflict {
+    job_id: string;
+    job_name?: string | null;
+    start_datetime: string;
+    end_datetime: string;
+    reason: 'overlap' | 'travel';
+    worker_ids: string[];
+}
+
+export interface JobPreview {
+    roles: PreviewRole[];
+    items: PreviewItem[];
+    conflicts: PreviewConflict[];
+    assignment: {
+        status: string;
+        feasible: boolean;
+        workers: string[];
+        stocks: { stock_id: string; quantity: number }[];
+        solve_time: number;
+    };
+}
+
+export const previewJob = async (job: JobCreate): Promise<JobPreview> => {
+    const response = await api.post('/jobs/preview', job);
+    return response.data;
+};
+
 export const updateJob = async (jobId: string, job: JobCreate) => {
     const response = await api.put(`/jobs/${jobId}`, job);
     return response.data;
@@ -148,8 +294,34 @@ export const deleteJob = async (jobId: string) => {
     return response.data;
 };
 
+export interface DashboardWorker {
+    worker_id: string;
+    worker_first_name?: string;
+    worker_last_name?: string;
+}
+
+export interface DashboardSummary {
+    generated_at: string;
+    horizon_days: number;
+    total_jobs: number;
+    assigned_jobs: number;
+    unassigned_jobs: number;
+    total_workers: number;
+    active_workers: number;
+    upcoming_jobs: { job_id: string; job_name?: string; start_datetime?: string; city?: string; workers: DashboardWorker[] }[];
+    branch_utilization: { branch_id: string; branch_name?: string; workers: number; active_workers: number; busy_hours: number; utilization: number }[];
+    role_utilization: { role_id: string; role_name: string; workers: number; jobs_requiring: number; busy_hours: number; utilization: number }[];
+    item_shortages: { item_id: string; item_name?: string; required: number; allocated: number; shortage: number }[];
+    jobs_per_day: { date: string; jobs: number; unassigned: number }[];
+}
+
+export const fetchDashboardSummary = async (horizonDays: number = 14): Promise<DashboardSummary> => {
+    const response = await api.get('/dashboard/summary', { params: { horizon_days: horizonDays } });
+    return response.data;
+};
+
 export interface AskRequest {
-    pageContext: string;
+    pageContext?: string;
     question: string;
 }
 
@@ -160,4 +332,137 @@ export interface AskResponse {
 export const askAI = async (request: AskRequest): Promise<AskResponse> => {
     const response = await api.post('/ask', request);
     return response.data;
-};
\ No newline at end of file
+};
+
+// Streams the answer; onPiece receives the text received so far
+export const askAIStream = async (request: AskRequest, onPiece: (answer: string) => void): Promise<string> => {
+    const response = await fetch(`${API_URL}/ask/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(request),
+    });
+    if (!response.ok || !response.body) {
+        throw new Error(`Ask failed with status ${response.status}`);
+    }
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let answer = '';
+    for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        answer += decoder.decode(value, { stream: true });
+        onPiece(answer);
+    }
+    return answer;
+};
+
+export interface JobAssignmentChange {
+    job_id: string;
+    workers: string[];
+    workers_added: string[];
+    workers_removed: string[];
+    stocks: Record<string, number>;  // new quantity per changed stock, 0 = removed
+}
+
+export interface PlanStreamEvent {
+    type: 'started' | 'incumbent' | 'committed' | 'completed' | 'cancelled' | 'failed' | 'resync';
+    run_id?: string;
+    objective?: number;
+    best_bound?: number;
+    wall_time?: number;
+    solution_index?: number;
+    status?: string;
+    final?: boolean;
+    error?: string;
+    changes?: JobAssignmentChange[];
+    jobs?: Record<string, { workers: string[]; stocks: { stock_id: string; quantity: number }[] }> | number;
+}
+
+// EventSource reconnects by itself and resumes after the last event id it saw
+export const subscribePlanStream = (onEvent: (event: PlanStreamEvent) => void): (() => void) => {
+    const source = new EventSource(`${API_URL}/planner/stream`);
+    const handler = (message: MessageEvent) => onEvent(JSON.parse(message.data));
+    for (const type of ['started', 'incumbent', 'committed', 'completed', 'cancelled', 'failed', 'resync']) {
+        source.addEventListener(type, handler);
+    }
+    return () => source.close();
+};
+
+export interface PlannerRun {
+    run_id: string;
+    state: 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled';
+    max_time_seconds: number;
+    created_at: string;
+    started_at?: string;
+    finished_at?: string;
+    duration_seconds?: number;
+    jobs: number;
+    solver_status?: string;
+    objective?: number;
+    best_bound?: number;
+    incumbents: number;
+    solve_time?: number;
+    jobs_changed: number;
+    workers_added: number;
+    workers_removed: number;
+    stocks_changed: number;
+    error?: string;
+    cancel_requested: boolean;
+}
+
+export const fetchPlannerRuns = async (state?: PlannerRun['state']): Promise<PlannerRun[]> => {
+    const response = await api.get('/planner/runs', { params: { state } });
+    return response.data;
+};
+
+export const fetchPlannerRun = async (runId: string): Promise<PlannerRun> => {
+    const response = await api.get(`/planner/runs/${runId}`);
+    return response.data;
+};
+
+export const cancelPlannerRun = async (runId: string): Promise<PlannerRun> => {
+    const response = await api.delete(`/planner/runs/${runId}`);
+    return response.data;
+};
+
+export interface GeoPoint {
+    id: string;
+    name?: string;
+    latitude: number;
+    longitude: number;
+    distance_km?: number;
+}
+
+export interface GeoCluster {
+    latitude: number;
+    longitude: number;
+    count: number;
+    min_lat: number;
+    max_lat: number;
+    min_lon: number;
+    max_lon: number;
+}
+
+export interface GeoQueryResult {
+    total: number;
+    clustered: boolean;
+    points: GeoPoint[];
+    clusters: GeoCluster[];
+}
+
+export interface Bounds {
+    min_lat: number;
+    min_lon: number;
+    max_lat: number;
+    max_lon: number;
+}
+
+export const fetchJobsInBounds = async (bounds: Bounds): Promise<GeoQueryResult> => {
+    const response = await api.get('/geo/jobs', { params: bounds });
+    return response.data;
+};
+
+export const fetchBranchesNearby = async (lat: number, lon: number, radius_km: number): Promise<GeoPoint[]> => {
+    const response = await api.get('/geo/branches/nearby', { params: { lat, lon, radius_km } });
+    return response.data;
+};